@@ -0,0 +1,8 @@
+"""
+Export benchmarks for NamaCut
+
+Generates synthetic test media with FFmpeg's lavfi sources and times
+every export path. Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --help
+"""
@@ -0,0 +1,82 @@
+# --------------------------------------------------
+# Deterministic synthetic test media (lavfi testsrc2 + sine)
+# --------------------------------------------------
+import os
+import subprocess
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class MediaSpec:
+    name: str
+    width: int
+    height: int
+    duration: float
+    extension: str
+    video_args: Tuple[str, ...]
+    audio_args: Tuple[str, ...]
+    rate: int = 30
+
+    @property
+    def filename(self):
+        return f"{self.name}{self.extension}"
+
+
+# VC-1 has no FFmpeg encoder; WMV2 takes the same is_vc1 export path
+SOURCES = {
+    spec.name: spec for spec in (
+        MediaSpec("h264-1080p-30s", 1920, 1080, 30.0, ".mp4",
+                  ("-c:v", "libx264", "-preset", "veryfast", "-g", "60", "-pix_fmt", "yuv420p"),
+                  ("-c:a", "aac", "-b:a", "192k")),
+        MediaSpec("h264-720p-10s", 1280, 720, 10.0, ".mp4",
+                  ("-c:v", "libx264", "-preset", "veryfast", "-g", "60", "-pix_fmt", "yuv420p"),
+                  ("-c:a", "aac", "-b:a", "128k")),
+        MediaSpec("hevc-2160p-10s", 3840, 2160, 10.0, ".mp4",
+                  ("-c:v", "libx265", "-preset", "ultrafast", "-x265-params", "keyint=60:log-level=error",
+                   "-pix_fmt", "yuv420p", "-tag:v", "hvc1"),
+                  ("-c:a", "aac", "-b:a", "192k")),
+        MediaSpec("vp9-720p-20s", 1280, 720, 20.0, ".webm",
+                  ("-c:v", "libvpx-vp9", "-deadline", "realtime", "-cpu-used", "8", "-b:v", "2M", "-g", "60"),
+                  ("-c:a", "libopus", "-b:a", "128k")),
+        MediaSpec("wmv2-480p-20s", 854, 480, 20.0, ".wmv",
+                  ("-c:v", "wmv2", "-b:v", "2M", "-g", "60"),
+                  ("-c:a", "wmav2", "-b:a", "128k")),
+        MediaSpec("wmv2-480p-180s", 854, 480, 180.0, ".wmv",
+                  ("-c:v", "wmv2", "-b:v", "2M", "-g", "60"),
+                  ("-c:a", "wmav2", "-b:a", "128k")),
+    )
+}
+
+
+def generation_command(spec, output_path, ffmpeg_path="ffmpeg"):
+    """FFmpeg command that renders spec; bitexact flags keep the output identical between runs"""
+    return [
+        ffmpeg_path, "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={spec.width}x{spec.height}:rate={spec.rate}:duration={spec.duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:beep_factor=4:sample_rate=48000:duration={spec.duration}",
+        "-map", "0:v", "-map", "1:a",
+        *spec.video_args, *spec.audio_args,
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+        "-map_metadata", "-1",
+        output_path
+    ]
+
+
+def ensure_media(spec, media_dir, ffmpeg_path="ffmpeg"):
+    """Return the path of spec's file in media_dir, generating it on first use"""
+    os.makedirs(media_dir, exist_ok=True)
+    output_path = os.path.join(media_dir, spec.filename)
+    if os.path.exists(output_path):
+        return output_path
+
+    temp_path = os.path.join(media_dir, f"{spec.name}.part{spec.extension}")
+    print(f"Generating {spec.filename} ({spec.width}x{spec.height}, {spec.duration:g}s)")
+    try:
+        subprocess.run(generation_command(spec, temp_path, ffmpeg_path), check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise RuntimeError(f"cannot generate {spec.filename}: {e}")
+    os.replace(temp_path, output_path)
+    return output_path
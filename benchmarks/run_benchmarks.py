@@ -0,0 +1,402 @@
+# --------------------------------------------------
+# Export benchmark runner
+# --------------------------------------------------
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass, asdict, field
+from typing import Optional
+
+from core.batch import HeadlessExporter, job_from_entry
+from core.ffmpeg_caps import capability_registry
+from core.utils import set_debug_output
+from benchmarks.media import SOURCES, ensure_media
+
+DEFAULT_MEDIA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".media")
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Seconds a GUI launch may take before the startup case fails
+STARTUP_TIMEOUT = 60
+
+# A case slower than the baseline by more than this fraction is reported as a regression
+DEFAULT_THRESHOLD = 0.10
+# ...unless it is also within this many seconds, which is timer and process start noise
+MIN_REGRESSION_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    name: str
+    source: str
+    entry: dict
+    settings: dict = field(default_factory=dict)
+
+
+# Entries use the batch manifest fields, so the same command builders run as in real exports
+CASES = (
+    BenchmarkCase("copy", "h264-1080p-30s", {"format": "original", "in": 5, "out": 25}),
+    BenchmarkCase("smart-cut", "h264-1080p-30s", {"format": "original", "in": 5.5, "out": 24.5, "smart_cut": True}),
+    BenchmarkCase("h264", "h264-1080p-30s", {"format": "mp4", "codec": "h264", "in": 5, "out": 25}),
+    BenchmarkCase("h264-parallel", "h264-1080p-30s", {"format": "mp4", "codec": "h264"}, {"parallel_export": True}),
+    BenchmarkCase("h265", "h264-720p-10s", {"format": "mp4", "codec": "h265"}),
+    BenchmarkCase("vp9", "h264-720p-10s", {"format": "webm"}),
+    BenchmarkCase("hevc-4k-to-1080p", "hevc-2160p-10s", {"format": "mp4", "codec": "h264", "resolution": "1080p"}),
+    BenchmarkCase("vp9-source-to-h264", "vp9-720p-20s", {"format": "mp4", "codec": "h264", "in": 2, "out": 18}),
+    BenchmarkCase("vc1-path", "wmv2-480p-20s", {"format": "mp4", "codec": "h264", "in": 2, "out": 18}),
+    # Seek cost should not grow with the cut position
+    BenchmarkCase("vc1-late-cut", "wmv2-480p-180s", {"format": "mp4", "codec": "h264", "in": 170, "out": 175}),
+    BenchmarkCase("crop-rotate", "h264-720p-10s", {"format": "mp4", "crop": "960:540:160:90", "rotate": 90}),
+    BenchmarkCase("copy-crop", "h264-720p-10s", {"format": "original", "crop": "960:540:160:90", "hflip": True}),
+    BenchmarkCase("audio-mp3", "h264-1080p-30s", {"format": "mp3"}),
+    BenchmarkCase("audio-aac", "h264-1080p-30s", {"format": "aac"}),
+    BenchmarkCase("audio-flac", "h264-1080p-30s", {"format": "flac"}),
+)
+
+
+@dataclass(frozen=True)
+class StartupCase:
+    name: str
+    source: str = ""
+    milestone: str = "first paint"
+
+
+# Time from the start of main() to a --profile-startup milestone; needs a display
+STARTUP_CASES = (
+    StartupCase("startup"),
+    StartupCase("startup-open-file", "h264-720p-10s", "media loaded"),
+)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    source: str
+    media_duration: float
+    wall_time: float
+    cpu_time: Optional[float]
+    peak_rss_mb: Optional[float]
+    output_size: int
+    runs: int
+    error: str = ""
+
+    @property
+    def realtime_factor(self):
+        return self.media_duration / self.wall_time if self.wall_time > 0 else 0.0
+
+    def to_dict(self):
+        data = asdict(self)
+        data["realtime_factor"] = round(self.realtime_factor, 3)
+        return data
+
+
+# --------------------------------------------------
+# Measured export
+# --------------------------------------------------
+def _exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class MeasuringExporter(HeadlessExporter):
+    """HeadlessExporter that adds up CPU time and peak RSS of every FFmpeg process it runs.
+
+    Resource usage comes from os.wait4, so it is only available on POSIX
+    systems; elsewhere the CPU and memory columns stay empty.
+    """
+
+    def __init__(self):
+        super().__init__(log=None)
+        self.cpu_time = 0.0
+        self.peak_rss = 0
+        self._usage_lock = threading.Lock()
+
+    def _run_step(self, step):
+        if not hasattr(os, "wait4"):
+            return super()._run_step(step)
+
+        cmd = [step.cmd[0], "-hide_banner", "-nostats", "-loglevel", "error"] + step.cmd[1:]
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=stderr_file)
+            except OSError as e:
+                return -1, str(e)
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = _exit_code(status)
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors="replace")
+
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        with self._usage_lock:
+            self.cpu_time += usage.ru_utime + usage.ru_stime
+            self.peak_rss = max(self.peak_rss, rss)
+
+        error = ""
+        if process.returncode != 0:
+            lines = [line for line in stderr.splitlines() if line.strip()]
+            error = " | ".join(lines[-5:]) or f"{step.label} failed"
+        return process.returncode, error
+
+
+def run_case(case, media_dir, repeat=1):
+    """Export case repeat times and return the median wall time with its resource usage"""
+    source_path = ensure_media(SOURCES[case.source], media_dir)
+    samples = []
+    error = ""
+    media_duration = 0.0
+    output_size = 0
+
+    for _ in range(repeat):
+        output_dir = tempfile.mkdtemp(prefix="namacut-bench-")
+        try:
+            job = job_from_entry(dict(case.entry, file=source_path), output_dir=output_dir)
+            job.settings.update(case.settings)
+            media_duration = job.duration
+            exporter = MeasuringExporter()
+            result = exporter.export(job)
+            if not result.success:
+                error = result.error
+                break
+            output_size = os.path.getsize(job.output_path)
+            samples.append((result.wall_time, exporter.cpu_time, exporter.peak_rss))
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    if not samples:
+        return BenchmarkResult(case.name, case.source, media_duration, 0.0, None, None, 0, 0, error or "no runs")
+
+    wall_time = statistics.median(sample[0] for sample in samples)
+    cpu_time = statistics.median(sample[1] for sample in samples) if hasattr(os, "wait4") else None
+    peak_rss = max(sample[2] for sample in samples) / (1024 * 1024) if hasattr(os, "wait4") else None
+    return BenchmarkResult(case.name, case.source, media_duration, round(wall_time, 3),
+                           round(cpu_time, 3) if cpu_time is not None else None,
+                           round(peak_rss, 1) if peak_rss is not None else None,
+                           output_size, len(samples), error)
+
+
+# --------------------------------------------------
+# Measured startup
+# --------------------------------------------------
+def has_display():
+    """False on Linux without an X11 or Wayland display, where the GUI cannot start"""
+    if not sys.platform.startswith("linux"):
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def _read_trace(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Not written yet, or still being written
+        return None
+
+
+def profile_startup(file_path=None, timeout=STARTUP_TIMEOUT):
+    """Launch the GUI with --profile-startup and return (trace, error) once the trace is written.
+
+    The window is closed as soon as the trace exists. It runs with a
+    fresh home directory, so the user's settings and queued exports
+    neither slow it down nor get started.
+    """
+    work_dir = tempfile.mkdtemp(prefix="namacut-startup-")
+    trace_path = os.path.join(work_dir, "startup.json")
+    cmd = [sys.executable, MAIN_SCRIPT]
+    if file_path:
+        cmd.append(file_path)
+    cmd.append(f"--profile-startup={trace_path}")
+    env = dict(os.environ, HOME=work_dir, XDG_CACHE_HOME=os.path.join(work_dir, "cache"))
+
+    try:
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                           stderr=stderr_file, env=env)
+            except OSError as e:
+                return None, str(e)
+
+            trace = None
+            deadline = time.monotonic() + timeout
+            while trace is None and process.poll() is None and time.monotonic() < deadline:
+                time.sleep(0.05)
+                trace = _read_trace(trace_path)
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            if trace is None:
+                trace = _read_trace(trace_path)
+
+            if trace is not None:
+                return trace, ""
+            stderr_file.seek(0)
+            lines = [line for line in stderr_file.read().decode(errors="replace").splitlines() if line.strip()]
+            reason = "timed out" if process.returncode in (-15, -9) else f"exit {process.returncode}"
+            return None, " | ".join(lines[-3:]) or f"no startup profile written ({reason})"
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def milestone_time(trace, name):
+    """Seconds from the start of main() to the trace event called name, or None"""
+    for event in trace.get("traceEvents", []):
+        if event.get("name") == name:
+            return (event["ts"] + event.get("dur", 0)) / 1e6
+    return None
+
+
+def run_startup_case(case, media_dir, repeat=1):
+    """Launch the GUI repeat times and return the median time to case.milestone"""
+    source_path = ensure_media(SOURCES[case.source], media_dir) if case.source else None
+    samples = []
+    error = ""
+    for _ in range(repeat):
+        trace, error = profile_startup(source_path)
+        elapsed = milestone_time(trace, case.milestone) if trace else None
+        if elapsed is None:
+            error = error or f"no '{case.milestone}' event in the startup profile"
+            break
+        samples.append(elapsed)
+
+    if not samples:
+        return BenchmarkResult(case.name, case.source or "-", 0.0, 0.0, None, None, 0, 0, error or "no runs")
+    return BenchmarkResult(case.name, case.source or "-", 0.0, round(statistics.median(samples), 3),
+                           None, None, 0, len(samples), "")
+
+
+# --------------------------------------------------
+# Reporting and baselines
+# --------------------------------------------------
+def environment_info():
+    caps = capability_registry.capabilities()
+    return {
+        "ffmpeg": caps.version if caps else "",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {case["name"]: case for case in data.get("cases", [])}
+
+
+def compare(result, baseline, threshold):
+    """Return (wall time change as a fraction, regressed) against the baseline entry, if any"""
+    previous = baseline.get(result.name) if baseline else None
+    if not previous or result.error or not previous.get("wall_time"):
+        return None, False
+    change = result.wall_time / previous["wall_time"] - 1
+    regressed = change > threshold and result.wall_time - previous["wall_time"] > MIN_REGRESSION_SECONDS
+    return change, regressed
+
+
+def format_row(result, change=None, regressed=False):
+    if result.error:
+        return f"{result.name:<20} FAILED: {result.error}"
+    cpu = f"{result.cpu_time:8.2f}" if result.cpu_time is not None else f"{'-':>8}"
+    rss = f"{result.peak_rss_mb:8.1f}" if result.peak_rss_mb is not None else f"{'-':>8}"
+    realtime = f"{result.realtime_factor:8.1f}x" if result.media_duration else f"{'-':>9}"
+    size = f"{result.output_size / (1024 * 1024):9.2f}" if result.output_size else f"{'-':>9}"
+    row = f"{result.name:<20} {result.wall_time:8.2f} {realtime} {cpu} {rss} {size}"
+    if change is not None:
+        row += f"  {change * 100:+6.1f}%"
+        if regressed:
+            row += "  SLOWER"
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run_benchmarks",
+        description="Time NamaCut export paths on generated lavfi media"
+    )
+    parser.add_argument("cases", nargs="*", help="Case names to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="List cases and exit")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is reported (default: 3)")
+    parser.add_argument("--media-dir", default=DEFAULT_MEDIA_DIR, help="Where generated sources are kept")
+    parser.add_argument("--output", help="Write results as JSON (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="Compare against a JSON file written with --output")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown fraction reported as a regression (default: 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on any regression")
+    parser.add_argument("--verbose", action="store_true", help="Show FFmpeg commands and debug output")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in CASES:
+            print(f"{case.name:<20} {case.source:<16} {case.entry}")
+        for case in STARTUP_CASES:
+            print(f"{case.name:<20} {case.source or '-':<16} time to {case.milestone}")
+        return 0
+
+    by_name = {case.name: case for case in CASES + STARTUP_CASES}
+    unknown = [name for name in args.cases if name not in by_name]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    if args.cases:
+        cases = [by_name[name] for name in args.cases]
+    elif has_display():
+        cases = list(CASES + STARTUP_CASES)
+    else:
+        print("No display found, skipping the startup cases")
+        cases = list(CASES)
+
+    if capability_registry.capabilities() is None:
+        print(f"ERROR: missing {', '.join(capability_registry.missing)}")
+        return 2
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    set_debug_output(args.verbose)
+
+    print(f"{'case':<20} {'wall s':>8} {'realtime':>9} {'cpu s':>8} {'rss MB':>8} {'size MB':>9}")
+    results = []
+    regressions = []
+    for case in cases:
+        try:
+            if isinstance(case, StartupCase):
+                result = run_startup_case(case, args.media_dir, max(1, args.repeat))
+            else:
+                result = run_case(case, args.media_dir, max(1, args.repeat))
+        except RuntimeError as e:
+            result = BenchmarkResult(case.name, case.source, 0.0, 0.0, None, None, 0, 0, str(e))
+        change, regressed = compare(result, baseline, args.threshold)
+        if regressed:
+            regressions.append(case.name)
+        results.append(result)
+        print(format_row(result, change, regressed), flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment_info(), "cases": [r.to_dict() for r in results]}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    failed = [r.name for r in results if r.error]
+    if regressions:
+        print(f"\nSlower than baseline by more than {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+    if failed:
+        print(f"\nFailed: {', '.join(failed)}")
+    if failed or (regressions and args.fail_on_regression):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,31 +3,126 @@ Core module for NamaCut Video Editor
 
 This module contains the core functionality including:
 - Video processing and export
+- Persistent export job queue
 - Video transformations (rotate, flip, crop)
 - Settings management
+- Cached media probing and keyframe indexing
+- Background scene-change detection
+- Silence detection for auto-trim and auto-split
+- Background preview proxies
+- Headless batch export engine
+- Export telemetry log
+- Sample-encode size and time estimates
+- Multi-range segment lists
+- Checkpoint journal for resumable exports
 - Utility functions
+
+Exports are imported on first access. VideoProcessor and ExportScheduler
+need PyQt5, so the command builders and batch engine still work without Qt.
 """
 
+import importlib
+
+# The media_cache instance shares its name with its module, which would
+# replace a lazy attribute as soon as any service imports the module; it is
+# small, so it is bound here
+from .media_cache import MediaCache, media_cache
 
-from .video_processor import VideoProcessor
-from .video_transformer import VideoTransformer
-from .settings_manager import SettingsManager
-from .utils import (
-    seconds_to_hmsms,
-    hmsms_str,
-    hmsms_to_seconds,
-    get_file_type,
-    is_video_file,
-    get_output_directory,
-    unique_output_path,
-    cleanup_incomplete_files,
-    parse_ffmpeg_progress
-)
+# Everything else is imported on first access, so importing one core module
+# (as the main window does at startup) does not load all the others
+_EXPORTS = {
+    '.video_processor': ('VideoProcessor',),
+    '.job_queue': ('ExportScheduler',),
+    '.export_job': ('ExportJob', 'JobStore'),
+    '.ffmpeg_commands': ('FFmpegCommandBuilder',),
+    '.ffmpeg_progress': ('FFmpegProgressParser', 'ProgressEvent'),
+    '.batch': ('HeadlessExporter', 'JobResult', 'load_manifest', 'run_batch'),
+    '.video_transformer': ('VideoTransformer',),
+    '.settings_manager': ('SettingsManager',),
+    '.media_probe': ('MediaProbe', 'ProbeResult', 'StreamInfo', 'probe_media'),
+    '.keyframe_index': ('FrameTable', 'KeyframeIndex', 'KeyframeIndexer', 'keyframe_indexer'),
+    '.scene_index': ('SceneDetector', 'SceneIndex', 'scene_detector'),
+    '.silence': ('SilenceAnalyzer', 'SilenceMap', 'silence_analyzer'),
+    '.thumbnails': ('ThumbnailCache', 'thumbnail_cache'),
+    '.waveform': ('WaveformBuilder', 'WaveformPeaks', 'waveform_builder'),
+    '.proxy': ('ProxyInfo', 'ProxyManager', 'proxy_manager'),
+    '.media_loader': ('LoadedMedia', 'MediaLoader', 'media_loader'),
+    '.ffmpeg_caps': ('CapabilityRegistry', 'FFmpegCapabilities', 'capability_registry'),
+    '.startup_profile': ('StartupProfiler', 'startup_profiler'),
+    '.telemetry': ('ExportTelemetry', 'TelemetryLog', 'aggregate', 'telemetry_log'),
+    '.size_estimator': ('SizeEstimate', 'SizeEstimator', 'size_estimator'),
+    '.segments': ('Segment', 'SegmentList'),
+    '.export_journal': ('ExportJournal',),
+    '.utils': (
+        'seconds_to_hmsms',
+        'hmsms_str',
+        'hmsms_to_seconds',
+        'get_file_type',
+        'is_video_file',
+        'get_output_directory',
+        'unique_output_path',
+        'cleanup_incomplete_files'
+    ),
+}
+
+_EXPORT_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
 
 __all__ = [
     'VideoProcessor',
+    'FFmpegCommandBuilder',
+    'FFmpegProgressParser',
+    'ProgressEvent',
+    'ExportJob',
+    'ExportScheduler',
+    'JobStore',
+    'HeadlessExporter',
+    'JobResult',
+    'load_manifest',
+    'run_batch',
     'VideoTransformer', 
     'SettingsManager',
+    'MediaCache',
+    'media_cache',
+    'MediaProbe',
+    'ProbeResult',
+    'StreamInfo',
+    'probe_media',
+    'FrameTable',
+    'KeyframeIndex',
+    'KeyframeIndexer',
+    'keyframe_indexer',
+    'SceneDetector',
+    'SceneIndex',
+    'scene_detector',
+    'SilenceAnalyzer',
+    'SilenceMap',
+    'silence_analyzer',
+    'ThumbnailCache',
+    'thumbnail_cache',
+    'WaveformBuilder',
+    'WaveformPeaks',
+    'waveform_builder',
+    'ProxyInfo',
+    'ProxyManager',
+    'proxy_manager',
+    'LoadedMedia',
+    'MediaLoader',
+    'media_loader',
+    'CapabilityRegistry',
+    'FFmpegCapabilities',
+    'capability_registry',
+    'StartupProfiler',
+    'startup_profiler',
+    'ExportTelemetry',
+    'TelemetryLog',
+    'aggregate',
+    'telemetry_log',
+    'SizeEstimate',
+    'SizeEstimator',
+    'size_estimator',
+    'Segment',
+    'SegmentList',
+    'ExportJournal',
     'seconds_to_hmsms',
     'hmsms_str',
     'hmsms_to_seconds',
@@ -35,6 +130,18 @@ __all__ = [
     'is_video_file',
     'get_output_directory',
     'unique_output_path',
-    'cleanup_incomplete_files',
-    'parse_ffmpeg_progress'
+    'cleanup_incomplete_files'
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORT_MODULES:
+        module = importlib.import_module(_EXPORT_MODULES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
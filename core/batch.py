@@ -0,0 +1,431 @@
+# --------------------------------------------------
+# Headless export engine (no Qt event loop)
+# --------------------------------------------------
+import os
+import csv
+import json
+import time
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, asdict
+from .export_job import ExportJob
+from .ffmpeg_commands import FFmpegCommandBuilder
+from .export_plan import single_step_plan
+from .media_probe import probe_media
+from .telemetry import ExportTelemetry, telemetry_log
+from .utils import get_output_directory, sanitize_filename
+from .video_transformer import VideoTransformer
+
+# Manifest format name -> (settings, output extension); None keeps the input extension
+VIDEO_FORMATS = {
+    "original": ({"format_index": 0}, None),
+    "copy": ({"format_index": 0}, None),
+    "mp4": ({"format_index": 1, "container": "MP4 (.mp4)"}, ".mp4"),
+    "mkv": ({"format_index": 2, "container": "Matroska (.mkv)"}, ".mkv"),
+    "webm": ({"format_index": 3, "container": "WebM (.webm)", "video_codec": "VP9"}, ".webm"),
+}
+AUDIO_FORMATS = {"mp3": ".mp3", "aac": ".m4a", "flac": ".flac"}
+CODECS = {"h264": "H264", "x264": "H264", "h265": "H265", "hevc": "H265", "x265": "H265", "vp9": "VP9"}
+
+DEFAULT_SETTINGS = {
+    "format_index": 0,
+    "video_codec": "H264",
+    "resolution": "Original",
+    "crf_value": 23,
+    "video_audio_format": "AAC",
+    "video_audio_bitrate": "192",
+    "audio_output_format": "none",
+    "audio_quality": "192",
+    "cut_mode": "keyframe",
+    # Batch runs already keep every core busy with whole jobs
+    "parallel_export": False,
+}
+
+# Lines of FFmpeg stderr kept for the error column of a failed job
+ERROR_TAIL_LINES = 5
+
+
+class ManifestError(ValueError):
+    pass
+
+
+@dataclass
+class JobResult:
+    job_id: str
+    input_path: str
+    output_path: str
+    exit_code: int
+    wall_time: float
+    media_duration: float
+    error: str = ""
+
+    @property
+    def success(self):
+        return self.exit_code == 0
+
+    @property
+    def realtime_factor(self):
+        if not self.success or self.wall_time <= 0:
+            return 0.0
+        return self.media_duration / self.wall_time
+
+    def to_dict(self):
+        data = asdict(self)
+        data["success"] = self.success
+        data["realtime_factor"] = round(self.realtime_factor, 3)
+        data["wall_time"] = round(self.wall_time, 3)
+        return data
+
+
+# --------------------------------------------------
+# Manifest parsing
+# --------------------------------------------------
+def parse_time_value(value):
+    """Parse seconds given as 12.5, '75', '01:15' or '00:01:15.500'"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def load_manifest(path):
+    """Yield one dict per clip from a JSON or CSV manifest, with defaults applied"""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {key.strip(): value.strip() for key, value in row.items() if key and value not in (None, "")}
+        return
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        defaults = data.get("defaults", {})
+        entries = data.get("jobs", [])
+    else:
+        defaults, entries = {}, data
+    for entry in entries:
+        yield {**defaults, **entry}
+
+
+def build_video_filters(entry):
+    """Turn manifest crop/rotate/flip fields into an FFmpeg filter string"""
+    transformer = VideoTransformer()
+    crop = entry.get("crop")
+    if crop:
+        parts = [int(float(v)) for v in str(crop).replace("x", ":").split(":")]
+        if len(parts) != 4:
+            raise ManifestError(f"crop must be w:h:x:y, got {crop!r}")
+        w, h, x, y = parts
+        transformer.set_crop_rect(x, y, w, h)
+        transformer.crop_mode = True
+    rotate = int(float(entry.get("rotate", 0) or 0)) % 360
+    if rotate not in (0, 90, 180, 270):
+        raise ManifestError(f"rotate must be 0, 90, 180 or 270, got {rotate}")
+    transformer.current_rotation = rotate
+    transformer.flip_horizontal = parse_bool(entry.get("hflip", False))
+    transformer.flip_vertical = parse_bool(entry.get("vflip", False))
+    return transformer.build_video_filter_for_ffmpeg()
+
+
+def job_from_entry(entry, base_dir="", output_dir=None, reserved=None):
+    """Build an ExportJob from one manifest entry; relative paths resolve against base_dir"""
+    input_path = entry.get("file") or entry.get("input")
+    if not input_path:
+        raise ManifestError("entry has no 'file'")
+    input_path = os.path.abspath(os.path.join(base_dir, os.path.expanduser(input_path)))
+
+    segments = []
+    for pair in entry.get("segments") or []:
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            raise ManifestError(f"segments must be [in, out] pairs, got {pair!r}")
+        segment_start, segment_end = parse_time_value(pair[0]), parse_time_value(pair[1])
+        if segment_start is None or segment_end is None or segment_start >= segment_end:
+            raise ManifestError(f"segment in must be before out, got {pair!r}")
+        segments.append([segment_start, segment_end])
+
+    start_time = parse_time_value(entry.get("in", entry.get("start"))) or 0.0
+    end_time = parse_time_value(entry.get("out", entry.get("end")))
+    if segments:
+        start_time = min(start for start, _ in segments)
+        end_time = max(end for _, end in segments)
+    if end_time is None:
+        probe = probe_media(input_path)
+        if not probe or probe.duration <= 0:
+            raise ManifestError(f"cannot determine duration of {input_path}")
+        end_time = probe.duration
+    if start_time >= end_time:
+        raise ManifestError(f"in ({start_time}) must be before out ({end_time})")
+
+    settings = dict(DEFAULT_SETTINGS)
+    settings["input_path"] = input_path
+    fmt = str(entry.get("format", "original")).lower()
+    audio_only = fmt in AUDIO_FORMATS
+    if audio_only:
+        settings["audio_output_format"] = fmt
+        ext = AUDIO_FORMATS[fmt]
+    elif fmt in VIDEO_FORMATS:
+        format_settings, ext = VIDEO_FORMATS[fmt]
+        settings.update(format_settings)
+        ext = ext or os.path.splitext(input_path)[1]
+    else:
+        raise ManifestError(f"unknown format {fmt!r}")
+
+    if entry.get("codec"):
+        codec = str(entry["codec"]).lower()
+        if codec not in CODECS:
+            raise ManifestError(f"unknown codec {codec!r}")
+        settings["video_codec"] = CODECS[codec]
+    if entry.get("crf") not in (None, ""):
+        settings["crf_value"] = int(entry["crf"])
+    if entry.get("resolution"):
+        settings["resolution"] = entry["resolution"]
+    if entry.get("audio_bitrate"):
+        settings["video_audio_bitrate"] = str(entry["audio_bitrate"])
+        settings["audio_quality"] = str(entry["audio_bitrate"])
+    if parse_bool(entry.get("smart_cut", False)):
+        settings["cut_mode"] = "smart"
+    if parse_bool(entry.get("resumable", False)):
+        settings["resumable_export"] = True
+
+    video_filters = None if audio_only else build_video_filters(entry)
+
+    output_path = entry.get("output")
+    if output_path:
+        output_path = os.path.abspath(os.path.join(base_dir, os.path.expanduser(output_path)))
+    else:
+        if output_dir is None:
+            output_dir = get_output_directory("original" if fmt in ("original", "copy") else fmt)
+        stem = sanitize_filename(os.path.splitext(os.path.basename(input_path))[0])
+        output_path = os.path.join(output_dir, f"{stem}{ext}")
+        i = 1
+        while os.path.exists(output_path) or (reserved is not None and output_path in reserved):
+            output_path = os.path.join(output_dir, f"{stem}({i}){ext}")
+            i += 1
+    if reserved is not None:
+        reserved.add(output_path)
+
+    return ExportJob(
+        input_path=input_path,
+        output_path=output_path,
+        start_time=start_time,
+        end_time=end_time,
+        settings=settings,
+        video_filters=video_filters,
+        audio_only=audio_only,
+        segments=segments if len(segments) > 1 else [],
+        priority=int(entry.get("priority", 0) or 0)
+    )
+
+
+def jobs_from_manifest(path, output_dir=None, on_error=None):
+    """Yield ExportJobs for a manifest; bad entries are passed to on_error and skipped"""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    reserved = set()
+    for number, entry in enumerate(load_manifest(path), 1):
+        try:
+            yield job_from_entry(entry, base_dir, output_dir, reserved)
+        except (ManifestError, ValueError, TypeError) as e:
+            if on_error:
+                on_error(JobResult(f"entry-{number}", str(entry.get("file", "")), "", -1, 0.0, 0.0, str(e)))
+
+
+# --------------------------------------------------
+# Export execution
+# --------------------------------------------------
+class HeadlessExporter(FFmpegCommandBuilder):
+    """Runs export plans with plain subprocesses, one blocking call per job.
+
+    Each export appends a telemetry record to log (None disables it).
+    FFmpeg's progress output is discarded here, so batch records have
+    stage timings but no speed samples.
+    """
+
+    def __init__(self, log=telemetry_log):
+        self._processes = set()
+        self._lock = threading.Lock()
+        self._aborted = False
+        self.log = log
+
+    def export(self, job):
+        started = time.monotonic()
+        duration = job.duration
+        temp_path = self._get_temp_filename(job.output_path)
+        telemetry = ExportTelemetry("batch", job.input_path, [job.output_path], duration, job.settings)
+
+        try:
+            os.makedirs(os.path.dirname(job.output_path) or ".", exist_ok=True)
+            if not os.path.exists(job.input_path):
+                raise FileNotFoundError(f"input not found: {job.input_path}")
+            with telemetry.stage("probe_time"):
+                probe_media(job.input_path)
+            with telemetry.stage("plan_time"):
+                if len(job.segments) > 1:
+                    plan = self.build_segments_plan(job.input_path, temp_path, job.settings,
+                                                    job.segments, job.video_filters)
+                elif job.audio_only:
+                    cmd = self.build_audio_command(job.input_path, temp_path, job.settings, job.start_time, duration)
+                    plan = single_step_plan(cmd, duration, temp_path)
+                else:
+                    plan = self.plan_export(job.input_path, temp_path, job.settings,
+                                            job.start_time, job.end_time, job.video_filters)
+            if plan is None:
+                raise ValueError("no export command for these settings")
+        except Exception as e:
+            self._log(telemetry, False, -1)
+            return JobResult(job.job_id, job.input_path, job.output_path, -1,
+                             time.monotonic() - started, duration, str(e))
+
+        telemetry.record["steps"] = len(plan.steps)
+        telemetry.spawned()
+        exit_code, error = -1, "export interrupted"
+        try:
+            exit_code, error = self.run_plan(plan)
+        finally:
+            plan.cleanup(exit_code == 0)
+
+        if exit_code == 0:
+            try:
+                with telemetry.stage("rename_time"):
+                    os.replace(temp_path, job.output_path)
+            except OSError as e:
+                exit_code, error = -1, f"rename failed: {e}"
+        if exit_code != 0 and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        self._log(telemetry, exit_code == 0, exit_code)
+        return JobResult(job.job_id, job.input_path, job.output_path, exit_code,
+                         time.monotonic() - started, duration, error)
+
+    def _log(self, telemetry, success, exit_code):
+        if self.log is not None:
+            self.log.append(telemetry.finish(success, exit_code, self._aborted))
+
+    def run_plan(self, plan):
+        """Run plan stages in order; returns (exit_code, error tail) of the first failing step"""
+        for stage in plan.stages:
+            if len(stage) == 1 or plan.max_workers <= 1:
+                failed = self._collect_results(plan, stage, map(self._run_step, stage))
+            else:
+                with ThreadPoolExecutor(max_workers=plan.max_workers) as pool:
+                    failed = self._collect_results(plan, stage, pool.map(self._run_step, stage))
+            if failed:
+                return failed
+        return 0, ""
+
+    def _collect_results(self, plan, stage, results):
+        """Record each finished step as its result arrives; returns the first failure, if any"""
+        failed = None
+        for step, (exit_code, error) in zip(stage, results):
+            if exit_code == 0:
+                plan.step_done(step)
+            elif failed is None:
+                failed = (exit_code, error)
+        return failed
+
+    def _run_step(self, step):
+        if self._aborted:
+            return -1, "aborted"
+        # Only errors are needed, progress output would just fill the pipe
+        cmd = [step.cmd[0], "-hide_banner", "-nostats", "-loglevel", "error"] + step.cmd[1:]
+        try:
+            process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                       stderr=subprocess.PIPE, text=True, errors="replace")
+        except OSError as e:
+            return -1, str(e)
+
+        with self._lock:
+            self._processes.add(process)
+        try:
+            _, stderr = process.communicate()
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+        error = ""
+        if process.returncode != 0:
+            lines = [line for line in stderr.splitlines() if line.strip()]
+            error = " | ".join(lines[-ERROR_TAIL_LINES:]) or f"{step.label} failed"
+        return process.returncode, error
+
+    def abort(self):
+        self._aborted = True
+        with self._lock:
+            for process in list(self._processes):
+                process.kill()
+
+
+def run_batch(jobs, max_jobs=None, on_result=None, exporter=None):
+    """Run jobs on a bounded thread pool; returns (succeeded, failed) counts.
+
+    jobs may be any iterable, including a generator over a large manifest;
+    only a small window of jobs is materialised at a time.
+    """
+    exporter = exporter or HeadlessExporter()
+    max_jobs = max_jobs or max(1, (os.cpu_count() or 1) // 2)
+    succeeded = failed = 0
+    job_iter = iter(jobs)
+
+    with ThreadPoolExecutor(max_workers=max_jobs) as pool:
+        running = set()
+        try:
+            while True:
+                while len(running) < max_jobs * 2:
+                    job = next(job_iter, None)
+                    if job is None:
+                        break
+                    running.add(pool.submit(exporter.export, job))
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result.success:
+                        succeeded += 1
+                    else:
+                        failed += 1
+                    if on_result:
+                        on_result(result)
+        except KeyboardInterrupt:
+            exporter.abort()
+            for future in running:
+                future.cancel()
+            raise
+
+    return succeeded, failed
+
+
+class ResultReport:
+    """Writes job results as CSV or JSON lines depending on the file extension"""
+
+    FIELDS = ["job_id", "input_path", "output_path", "success", "exit_code",
+              "wall_time", "media_duration", "realtime_factor", "error"]
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if path.lower().endswith(".csv"):
+            self._csv = csv.DictWriter(self._file, fieldnames=self.FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result):
+        data = result.to_dict()
+        if self._csv:
+            self._csv.writerow({key: data[key] for key in self.FIELDS})
+        else:
+            self._file.write(json.dumps(data) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
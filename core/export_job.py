@@ -0,0 +1,95 @@
+# --------------------------------------------------
+# Export job records and their on-disk store
+# --------------------------------------------------
+import os
+import json
+import time
+import uuid
+from dataclasses import dataclass, field, asdict, fields
+from typing import List, Optional
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_PAUSED = "paused"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+@dataclass
+class ExportJob:
+    input_path: str
+    output_path: str
+    start_time: float
+    end_time: float
+    settings: dict = field(default_factory=dict)
+    video_filters: Optional[str] = None
+    audio_only: bool = False
+    # [output_path, settings] pairs written by the same ffmpeg run as output_path
+    extra_outputs: List[list] = field(default_factory=list)
+    # [start, end] ranges joined in this order; empty exports start_time..end_time
+    segments: List[list] = field(default_factory=list)
+    priority: int = 0
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: str = JOB_QUEUED
+    progress: int = 0
+    created: float = field(default_factory=time.time)
+    finished: float = 0.0
+
+    @property
+    def is_finished(self):
+        return self.state in FINISHED_STATES
+
+    @property
+    def duration(self):
+        if self.segments:
+            return sum(end - start for start, end in self.segments)
+        return self.end_time - self.start_time
+
+    @property
+    def output_paths(self):
+        return [self.output_path] + [path for path, _ in self.extra_outputs]
+
+    def targets(self):
+        """All (output_path, settings) pairs, main output first"""
+        return [(self.output_path, self.settings)] + [(path, settings) for path, settings in self.extra_outputs]
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+class JobStore:
+    """Reads and writes the job list as JSON, replacing the file atomically"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(os.path.expanduser("~"), ".namacut_queue.json")
+
+    def load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                return [ExportJob.from_dict(item) for item in data.get("jobs", [])]
+        except Exception as e:
+            print(f"Error loading export queue: {e}")
+        return []
+
+    def save(self, jobs):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"jobs": [job.to_dict() for job in jobs]}, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"Error saving export queue: {e}")
+            return False
@@ -0,0 +1,132 @@
+# --------------------------------------------------
+# Checkpoint journal for resumable exports
+# --------------------------------------------------
+import os
+import json
+import time
+import shutil
+import hashlib
+
+JOURNAL_VERSION = 1
+JOURNAL_NAME = "journal.json"
+WORK_DIR_PREFIX = ".namacut-resume-"
+
+# Checkpoint directories nobody resumed within this many seconds are removed
+STALE_AFTER = 7 * 24 * 3600
+
+# Settings that change the encoded chunks; other settings may differ on resume
+RESUME_KEYS = ("format_index", "video_codec", "crf_value", "resolution", "video_audio_format",
+               "video_audio_bitrate", "video_audio_quality")
+
+
+def resume_key(input_path, settings, start_time, end_time, video_filters=None, output_ext=""):
+    """Identify an export by its source file, range and encoding settings, not by its output name"""
+    try:
+        stat = os.stat(input_path)
+        identity = [os.path.abspath(input_path), stat.st_size, int(stat.st_mtime)]
+    except OSError:
+        identity = [os.path.abspath(input_path)]
+    values = {key: settings.get(key) for key in RESUME_KEYS}
+    values.update(input=identity, range=[round(start_time, 3), round(end_time, 3)],
+                  filters=video_filters or "", ext=output_ext.lower())
+    return hashlib.sha1(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def resume_work_dir(output_path, key):
+    """Checkpoint directory next to output_path; the same export always gets the same one"""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    return os.path.join(output_dir, f"{WORK_DIR_PREFIX}{key}")
+
+
+def _fingerprint(cmd):
+    """The step command without its thread count, which may change between runs"""
+    fingerprint = []
+    skip = False
+    for arg in cmd:
+        if skip:
+            skip = False
+        elif arg == "-threads":
+            skip = True
+        else:
+            fingerprint.append(arg)
+    return fingerprint
+
+
+class ExportJournal:
+    """Completed steps of a resumable export, stored as JSON in its work directory.
+
+    A step counts as done only if its output still has the recorded size
+    and it was made by the same command. The chunk boundaries of the
+    first run are kept too, so later runs split the range the same way.
+    The journal is rewritten atomically after every step, so a crash
+    leaves the previous version.
+    """
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        self.path = os.path.join(work_dir, JOURNAL_NAME)
+        self.steps = {}
+        self.boundaries = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == JOURNAL_VERSION:
+            self.steps = data.get("steps", {})
+            self.boundaries = data.get("boundaries")
+
+    def is_done(self, step):
+        entry = self.steps.get(os.path.basename(step.output))
+        if not entry or entry.get("cmd") != _fingerprint(step.cmd):
+            return False
+        try:
+            return os.path.getsize(step.output) == entry.get("size")
+        except OSError:
+            return False
+
+    def mark_done(self, step):
+        try:
+            size = os.path.getsize(step.output)
+        except OSError:
+            return
+        self.steps[os.path.basename(step.output)] = {
+            "cmd": _fingerprint(step.cmd),
+            "size": size,
+            "duration": step.duration,
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self._save()
+
+    def _save(self):
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": JOURNAL_VERSION, "boundaries": self.boundaries, "steps": self.steps}, f, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error writing export journal: {e}")
+
+
+def remove_stale_checkpoints(directory, keep=None, max_age=STALE_AFTER):
+    """Delete checkpoint directories in directory untouched for max_age seconds"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    now = time.time()
+    for name in names:
+        path = os.path.join(directory, name)
+        if not name.startswith(WORK_DIR_PREFIX) or path == keep:
+            continue
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                print(f"Removed stale export checkpoints: {path}")
+        except OSError:
+            continue
@@ -0,0 +1,100 @@
+# --------------------------------------------------
+# Multi-step export plans
+# --------------------------------------------------
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import List, Optional
+from .export_journal import ExportJournal
+from .utils import debug_print
+
+
+@dataclass
+class ExportStep:
+    cmd: List[str]
+    duration: float = 0.0
+    label: str = ""
+    output: str = ""
+
+
+@dataclass
+class ExportPlan:
+    """Ordered stages of ffmpeg commands; steps inside one stage do not depend on each other.
+
+    A plan with a journal is resumable: finished steps are recorded, steps
+    done by an earlier run are left out, and the work directory survives
+    a failed or aborted run.
+    """
+    stages: List[List[ExportStep]] = field(default_factory=list)
+    work_dir: str = ""
+    max_workers: int = 1
+    journal: Optional[ExportJournal] = None
+    resumed_duration: float = 0.0
+
+    def add_stage(self, steps):
+        steps = [step for step in steps if step is not None]
+        if steps:
+            self.stages.append(steps)
+
+    @property
+    def steps(self):
+        return [step for stage in self.stages for step in stage]
+
+    @property
+    def total_duration(self):
+        """Media duration of the whole export, including steps finished by an earlier run"""
+        return self.resumed_duration + sum(step.duration for step in self.steps)
+
+    def step_done(self, step):
+        if self.journal is not None:
+            self.journal.mark_done(step)
+
+    def cleanup(self, success=True):
+        if self.journal is not None and not success:
+            print(f"Kept export checkpoints for resuming: {self.work_dir}")
+            return
+        if self.work_dir and os.path.isdir(self.work_dir):
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            debug_print(f"Removed export work directory: {self.work_dir}")
+
+
+def single_step_plan(cmd, duration=0.0, output_path=""):
+    return ExportPlan(stages=[[ExportStep(cmd=cmd, duration=duration, label="export", output=output_path)]])
+
+
+def create_work_dir(output_path):
+    """Create a scratch directory next to output_path so parts stay on the same filesystem"""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    return tempfile.mkdtemp(prefix=".namacut-", dir=output_dir)
+
+
+def write_concat_list(list_path, part_files):
+    with open(list_path, "w", encoding="utf-8") as f:
+        for part in part_files:
+            escaped = os.path.abspath(part).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    return list_path
+
+
+def build_concat_command(list_path, output_path, audio_path=None):
+    """Build FFmpeg command that joins parts losslessly with the concat demuxer"""
+    cmd = [
+        "ffmpeg", "-y",
+        "-f", "concat", "-safe", "0",
+        "-i", list_path
+    ]
+
+    if audio_path:
+        # Video parts are joined and muxed with one separately cut audio track
+        cmd.extend(["-i", audio_path, "-map", "0:v", "-map", "1:a"])
+    else:
+        cmd.extend(["-map", "0"])
+
+    cmd.extend(["-c", "copy"])
+
+    if output_path.endswith('.mp4'):
+        cmd.extend(["-movflags", "+faststart"])
+
+    cmd.append(output_path)
+    return cmd
@@ -0,0 +1,189 @@
+# --------------------------------------------------
+# FFmpeg capability registry (encoders, filters, hwaccels)
+# --------------------------------------------------
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+from .media_cache import media_cache
+
+
+def _first_line(output):
+    return output.strip().splitlines()[0] if output.strip() else ""
+
+
+def parse_encoders(output):
+    """Names from `ffmpeg -encoders`; rows are a 6-letter flag field then the name"""
+    names = set()
+    in_table = False
+    for line in output.splitlines():
+        parts = line.split()
+        if not in_table:
+            in_table = bool(parts) and set(parts[0]) == {"-"}
+            continue
+        if len(parts) >= 2 and len(parts[0]) == 6:
+            names.add(parts[1])
+    return frozenset(names)
+
+
+def parse_filters(output):
+    """Names from `ffmpeg -filters`; rows are flags, name, then an in->out signature"""
+    names = set()
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and "->" in parts[2]:
+            names.add(parts[1])
+    return frozenset(names)
+
+
+def parse_hwaccels(output):
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    if lines and lines[0].endswith(":"):
+        lines = lines[1:]
+    return tuple(lines)
+
+
+@dataclass(frozen=True)
+class FFmpegCapabilities:
+    ffmpeg_path: str
+    ffprobe_path: str
+    version: str = ""
+    encoders: FrozenSet[str] = frozenset()
+    filters: FrozenSet[str] = frozenset()
+    hwaccels: Tuple[str, ...] = ()
+
+    def has_encoder(self, name) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name) -> bool:
+        return name in self.filters
+
+    def to_json(self):
+        return {
+            "version": self.version,
+            "encoders": sorted(self.encoders),
+            "filters": sorted(self.filters),
+            "hwaccels": list(self.hwaccels),
+        }
+
+    @classmethod
+    def from_json(cls, ffmpeg_path, ffprobe_path, data):
+        return cls(
+            ffmpeg_path=ffmpeg_path,
+            ffprobe_path=ffprobe_path,
+            version=data.get("version", ""),
+            encoders=frozenset(data.get("encoders", [])),
+            filters=frozenset(data.get("filters", [])),
+            hwaccels=tuple(data.get("hwaccels", [])),
+        )
+
+
+# --------------------------------------------------
+# Registry service
+# --------------------------------------------------
+class CapabilityRegistry:
+    """Finds ffmpeg and ffprobe and records what the installed build supports.
+
+    The version checks and the -encoders/-filters/-hwaccels listings run
+    concurrently. Results are stored in the media cache against the
+    binaries themselves, so they are reused until ffmpeg or ffprobe is
+    replaced and later launches start no subprocess at all.
+    """
+    CACHE_KIND = "ffmpeg-caps"
+    PROBE_CACHE_KIND = "ffprobe-version"
+
+    def __init__(self, ffmpeg="ffmpeg", ffprobe="ffprobe", timeout=10, disk_cache=None):
+        self.ffmpeg = ffmpeg
+        self.ffprobe = ffprobe
+        self.timeout = timeout
+        self.disk_cache = disk_cache
+        self.missing = []
+        self._caps = None
+        self._detected = False
+        self._lock = threading.Lock()
+
+    def capabilities(self) -> Optional[FFmpegCapabilities]:
+        """Return the capabilities, detecting them on first use; None if a binary is missing"""
+        with self._lock:
+            if not self._detected:
+                self._caps = self._detect()
+                self._detected = True
+            return self._caps
+
+    def has_encoder(self, name) -> bool:
+        """True if ffmpeg has the encoder, or if that cannot be determined"""
+        caps = self.capabilities()
+        return caps is None or not caps.encoders or caps.has_encoder(name)
+
+    def has_filter(self, name) -> bool:
+        caps = self.capabilities()
+        return caps is None or not caps.filters or caps.has_filter(name)
+
+    def invalidate(self):
+        with self._lock:
+            self._caps = None
+            self._detected = False
+
+    def _run(self, binary, *args):
+        try:
+            result = subprocess.run([binary, "-hide_banner", *args], capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Error running {os.path.basename(binary)} {' '.join(args)}: {e}")
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    def _detect(self):
+        ffmpeg_path = shutil.which(self.ffmpeg)
+        ffprobe_path = shutil.which(self.ffprobe)
+        self.missing = [name for name, path in (("ffmpeg", ffmpeg_path), ("ffprobe", ffprobe_path)) if path is None]
+        if self.missing:
+            return None
+
+        cached = self._load_from_disk(ffmpeg_path, ffprobe_path)
+        if cached is not None:
+            return cached
+
+        with ThreadPoolExecutor(max_workers=5, thread_name_prefix="ffmpeg-caps") as executor:
+            ffmpeg_version = executor.submit(self._run, ffmpeg_path, "-version")
+            ffprobe_version = executor.submit(self._run, ffprobe_path, "-version")
+            encoders = executor.submit(self._run, ffmpeg_path, "-encoders")
+            filters = executor.submit(self._run, ffmpeg_path, "-filters")
+            hwaccels = executor.submit(self._run, ffmpeg_path, "-hwaccels")
+
+            if ffmpeg_version.result() is None:
+                self.missing.append("ffmpeg")
+            if ffprobe_version.result() is None:
+                self.missing.append("ffprobe")
+            if self.missing:
+                return None
+
+            caps = FFmpegCapabilities(
+                ffmpeg_path=ffmpeg_path,
+                ffprobe_path=ffprobe_path,
+                version=_first_line(ffmpeg_version.result()),
+                encoders=parse_encoders(encoders.result() or ""),
+                filters=parse_filters(filters.result() or ""),
+                hwaccels=parse_hwaccels(hwaccels.result() or ""),
+            )
+
+        if self.disk_cache is not None:
+            self.disk_cache.put_json(ffmpeg_path, self.CACHE_KIND, caps.to_json())
+            self.disk_cache.put_json(ffprobe_path, self.PROBE_CACHE_KIND, {"version": _first_line(ffprobe_version.result())})
+        return caps
+
+    def _load_from_disk(self, ffmpeg_path, ffprobe_path):
+        if self.disk_cache is None:
+            return None
+        # Both binaries must be unchanged since they were last checked
+        if self.disk_cache.get_json(ffprobe_path, self.PROBE_CACHE_KIND) is None:
+            return None
+        data = self.disk_cache.get_json(ffmpeg_path, self.CACHE_KIND)
+        if data is None:
+            return None
+        return FFmpegCapabilities.from_json(ffmpeg_path, ffprobe_path, data)
+
+
+capability_registry = CapabilityRegistry(disk_cache=media_cache)
@@ -0,0 +1,1070 @@
+# --------------------------------------------------
+# FFmpeg command building (no Qt dependency)
+# --------------------------------------------------
+import os
+import subprocess
+from .export_plan import ExportPlan, ExportStep, create_work_dir, write_concat_list, build_concat_command, single_step_plan
+from .media_probe import probe_media
+from .keyframe_index import keyframe_indexer
+from .scene_index import scene_detector
+from .ffmpeg_caps import capability_registry
+from .segments import Segment, in_source_order
+from .export_journal import ExportJournal, remove_stale_checkpoints, resume_key, resume_work_dir
+from .utils import debug_print
+
+# Input-side seek margin before an exact output-side seek when copying audio
+AUDIO_SEEK_PREROLL = 10.0
+
+# VC-1 cuts seek on input to a keyframe at least VC1_KEYFRAME_MARGIN before the
+# start, or VC1_SEEK_PREROLL before it without a keyframe index, then exactly on output
+VC1_SEEK_PREROLL = 10.0
+VC1_KEYFRAME_MARGIN = 1.0
+
+# Without a frame index, smart cut looks for keyframes in windows of this many
+# seconds after the start and before the end, doubling them until both are found
+SMART_CUT_WINDOW = 10.0
+
+# Parallel export splits ranges into chunks no shorter than this many seconds
+PARALLEL_MIN_CHUNK = 20.0
+PARALLEL_THREADS_PER_WORKER = 4
+
+# Resumable exports checkpoint after chunks of about this many seconds
+RESUME_CHUNK_SECONDS = 60.0
+
+
+class FFmpegCommandBuilder:
+    """Builds FFmpeg commands and export plans; shared by the GUI and headless runners"""
+    
+    def _get_temp_filename(self, output_path):
+        """Generate temporary filename with proper extension"""
+        base, ext = os.path.splitext(output_path)
+        return f"{base}.tmp{ext}"
+        
+    def plan_export(self, input_path, output_path, settings, start_time, end_time, video_filters=None, segments=None):
+        """Choose the export strategy for settings and return it as an ExportPlan"""
+        if segments and len(segments) > 1:
+            return self.build_segments_plan(input_path, output_path, settings, segments, video_filters)
+        duration = end_time - start_time
+        format_index = settings.get("format_index", 0)
+        
+        if format_index == 0 and not video_filters:
+            if settings.get("cut_mode", "keyframe") == "smart":
+                keyframes = keyframe_indexer.cached(input_path)
+                if keyframes and keyframes.is_keyframe(start_time):
+                    # A copy starting on a keyframe is already frame-accurate
+                    debug_print("Smart cut: start is on a keyframe, using keyframe copy")
+                else:
+                    plan = self.build_smart_cut_plan(input_path, output_path, start_time, end_time)
+                    if plan:
+                        return plan
+            cmd = self.build_fast_copy_command(input_path, output_path, start_time, duration, video_filters)
+        elif self.is_vc1_video(input_path):
+            # Use special conversion command for VC-1
+            cmd = self.build_vc1_conversion_command(input_path, output_path, settings, start_time, duration, video_filters)
+        else:
+            if format_index != 0 and settings.get("resumable_export", False):
+                plan = self.build_resumable_encode_plan(input_path, output_path, settings, start_time, end_time, video_filters)
+                if plan:
+                    return plan
+            if format_index != 0 and settings.get("parallel_export", True):
+                plan = self.build_parallel_encode_plan(input_path, output_path, settings, start_time, end_time, video_filters)
+                if plan:
+                    return plan
+            cmd = self.build_video_command(input_path, output_path, settings, start_time, duration, video_filters)
+        
+        if not cmd:
+            return None
+        return single_step_plan(cmd, duration, output_path)
+        
+    def build_fast_copy_command(self, input_path, output_path, start_time, duration, video_filters=None):
+        """Build FFmpeg command for fast copy (no re-encoding)"""
+        cmd = ["ffmpeg", "-y"]
+        
+        cmd.extend(["-ss", str(start_time), "-i", input_path, "-t", str(duration)])
+        
+        if video_filters:
+            cmd.extend(["-vf", video_filters])
+            cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-c:a", "aac", "-b:a", "192k"])
+        else:
+            cmd.extend(["-c:v", "copy", "-c:a", "copy"])
+        
+        if output_path.endswith('.mp4'):
+            cmd.extend(["-movflags", "+faststart"])
+        
+        cmd.append(output_path)
+        
+        return cmd
+        
+    def build_smart_cut_plan(self, input_path, output_path, start_time, end_time):
+        """Plan a frame-accurate cut that re-encodes only the partial GOPs at each end"""
+        probe = probe_media(input_path)
+        encode_params = self._get_matching_encode_params(probe)
+        if not encode_params:
+            debug_print("Smart cut: source codec cannot be matched, using keyframe copy")
+            return None
+        
+        # Cut points closer than this to a keyframe are treated as on it
+        tolerance = 0.001
+        interior = self._find_gop_interior(input_path, probe, start_time, end_time, tolerance)
+        
+        work_dir = create_work_dir(output_path)
+        plan = ExportPlan(work_dir=work_dir)
+        parts = []
+        steps = []
+        
+        def part_path(name):
+            path = os.path.join(work_dir, f"{name}.ts")
+            parts.append(path)
+            return path
+        
+        if interior is None:
+            # No complete GOP inside the range, re-encode all of it
+            steps.append(self._build_smart_cut_encode_step(
+                input_path, part_path("full"), start_time, end_time - start_time, encode_params, "re-encode range"))
+        else:
+            gop_start, gop_end, frame_count = interior
+            if gop_start - start_time > tolerance:
+                steps.append(self._build_smart_cut_encode_step(
+                    input_path, part_path("head"), start_time, gop_start - start_time, encode_params, "re-encode head"))
+            
+            # Copy by packet count so B-frames of the next GOP are not pulled in
+            steps.append(ExportStep(
+                cmd=[
+                    "ffmpeg", "-y",
+                    "-ss", f"{gop_start:.6f}", "-i", input_path,
+                    "-frames:v", str(frame_count),
+                    "-map", "0:v:0", "-an",
+                    "-c", "copy", "-avoid_negative_ts", "make_zero",
+                    "-f", "mpegts", part_path("middle")
+                ],
+                duration=gop_end - gop_start,
+                label="copy GOP interior"
+            ))
+            if end_time - gop_end > tolerance:
+                steps.append(self._build_smart_cut_encode_step(
+                    input_path, part_path("tail"), gop_end, end_time - gop_end, encode_params, "re-encode tail"))
+        
+        audio_path = None
+        if probe.has_audio:
+            audio_path = os.path.join(work_dir, "audio.mka")
+            steps.append(self._build_audio_copy_step(input_path, audio_path, start_time, end_time - start_time))
+        plan.add_stage(steps)
+        
+        list_path = write_concat_list(os.path.join(work_dir, "parts.txt"), parts)
+        plan.add_stage([ExportStep(
+            cmd=build_concat_command(list_path, output_path, audio_path),
+            label="concat parts",
+            output=output_path
+        )])
+        
+        if interior is None:
+            debug_print(f"Smart cut: {len(parts)} video part(s), no complete GOP in range")
+        else:
+            debug_print(f"Smart cut: {len(parts)} video part(s), copying {interior[2]} frames "
+                        f"from {interior[0]:.3f}s to {interior[1]:.3f}s")
+        return plan
+        
+    def _build_audio_copy_step(self, input_path, audio_path, start_time, duration):
+        """Stream-copy the audio of a range, seeking coarsely on input and exactly on output"""
+        coarse = max(0.0, start_time - AUDIO_SEEK_PREROLL)
+        cmd = [
+            "ffmpeg", "-y",
+            "-ss", f"{coarse:.6f}", "-i", input_path,
+            "-ss", f"{start_time - coarse:.6f}", "-t", f"{duration:.6f}",
+            "-map", "0:a", "-vn", "-c:a", "copy",
+            "-f", "matroska", audio_path
+        ]
+        return ExportStep(cmd=cmd, duration=0.0, label="copy audio", output=audio_path)
+        
+    def _build_smart_cut_encode_step(self, input_path, part_path, start_time, duration, encode_params, label):
+        cmd = [
+            "ffmpeg", "-y",
+            "-ss", f"{start_time:.6f}", "-i", input_path,
+            "-t", f"{duration:.6f}",
+            "-map", "0:v:0", "-an"
+        ]
+        cmd.extend(encode_params)
+        cmd.extend(["-f", "mpegts", part_path])
+        return ExportStep(cmd=cmd, duration=duration, label=label, output=part_path)
+        
+    def _get_matching_encode_params(self, probe):
+        """Encoder settings that reproduce the source stream closely enough to splice with it"""
+        stream = probe.video_stream if probe else None
+        if not stream:
+            return None
+        
+        encoders = {"h264": "libx264", "hevc": "libx265"}
+        encoder = encoders.get(stream.codec_name)
+        if not encoder:
+            return None
+        
+        params = ["-c:v", encoder, "-crf", "16", "-preset", "fast"]
+        if stream.pix_fmt:
+            params.extend(["-pix_fmt", stream.pix_fmt])
+        
+        profiles = {
+            "Baseline": "baseline",
+            "Constrained Baseline": "baseline",
+            "Main": "main",
+            "High": "high",
+            "High 10": "high10",
+            "High 4:2:2": "high422",
+            "High 4:4:4 Predictive": "high444",
+            "Main 10": "main10",
+        }
+        profile = profiles.get(stream.profile)
+        if profile:
+            params.extend(["-profile:v", profile])
+        
+        return params
+        
+    def _find_gop_interior(self, input_path, probe, start_time, end_time, tolerance):
+        """(gop_start, gop_end, frame_count) of the whole GOPs inside a range, or None if there are none.
+
+        gop_start is the first keyframe at or after start_time, gop_end the last
+        one at or before end_time. The cached frame table answers this without
+        reading the file; otherwise only windows around the two cut points are
+        listed and the packets between them are counted, not listed.
+        """
+        frames = keyframe_indexer.cached_frames(input_path)
+        if frames is not None:
+            inner = frames.keyframes.between(start_time - tolerance, end_time)
+            if len(inner) < 2:
+                return None
+            return inner[0], inner[-1], frames.count_between(inner[0] - tolerance, inner[-1] - tolerance)
+        
+        # ffprobe reads file timestamps, cut points are relative to the start
+        offset = probe.start_time
+        window = SMART_CUT_WINDOW
+        while True:
+            head_end = min(end_time, start_time + window)
+            tail_start = max(start_time, end_time - window)
+            whole_range = head_end >= tail_start
+            intervals = [(start_time, end_time)] if whole_range else [(start_time, head_end), (tail_start, end_time)]
+            packets = self._list_video_packets(input_path, intervals, offset)
+            inner = sorted(pts for pts, is_key in packets if is_key and start_time - tolerance <= pts <= end_time)
+            found_head = any(pts <= head_end for pts in inner)
+            found_tail = any(pts >= tail_start for pts in inner)
+            if whole_range or (found_head and found_tail):
+                break
+            window *= 2
+        
+        if len(inner) < 2:
+            return None
+        gop_start, gop_end = inner[0], inner[-1]
+        if whole_range:
+            frame_count = sum(1 for pts, _ in packets if gop_start - tolerance <= pts < gop_end - tolerance)
+        else:
+            frame_count = self._count_video_packets(input_path, gop_start + offset, gop_end + offset - tolerance)
+        if not frame_count:
+            return None
+        return gop_start, gop_end, frame_count
+        
+    def _list_video_packets(self, input_path, intervals, offset=0.0):
+        """List (pts_time, is_keyframe) for video packets in the (start, end) intervals.
+
+        Times are in seconds from offset, the start time of the file.
+        """
+        read_intervals = ",".join(f"{start + offset:.6f}%{end + offset:.6f}" for start, end in intervals)
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-read_intervals", read_intervals,
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0", input_path
+        ]
+        
+        packets = []
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=120)
+            for line in result.stdout.splitlines():
+                pts_time, _, flags = line.partition(",")
+                try:
+                    packets.append((float(pts_time) - offset, "K" in flags))
+                except ValueError:
+                    continue
+        except Exception as e:
+            print(f"Error listing video packets: {e}")
+        
+        packets.sort()
+        return packets
+        
+    def _count_video_packets(self, input_path, start, end):
+        """Number of video packets from the keyframe at start up to, not including, end (file timestamps)"""
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-read_intervals", f"{start:.6f}%{end:.6f}",
+            "-count_packets",
+            "-show_entries", "stream=nb_read_packets",
+            "-of", "csv=p=0", input_path
+        ]
+        
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=600)
+            return int(result.stdout.strip().split(",")[0])
+        except Exception as e:
+            print(f"Error counting video packets: {e}")
+            return 0
+        
+    def build_video_command(self, input_path, output_path, settings, start_time, duration, video_filters):
+        """Build FFmpeg command for video conversion with re-encoding"""
+        cmd = ["ffmpeg", "-y"]
+        
+        cmd.extend(["-ss", str(start_time), "-i", input_path, "-t", str(duration)])
+        
+        format_index = settings.get("format_index", 0)
+        
+        if format_index == 0:
+            cmd.extend(["-c:v", "copy", "-c:a", "copy"])
+            
+            if video_filters:
+                cmd.extend(["-vf", video_filters])
+                cmd.remove("-c:v")
+                cmd.remove("copy")
+                cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18"])
+        else:
+            filter_chain = self._build_video_filter_chain(settings, input_path, video_filters)
+            if filter_chain:
+                cmd.extend(["-vf", filter_chain])
+            
+            # Add codec parameters
+            codec_params = self._get_video_codec_params(settings, format_index)
+            if codec_params:
+                cmd.extend(codec_params)
+            
+            # Add audio parameters
+            audio_params = self._get_audio_params(settings, format_index)
+            if audio_params:
+                cmd.extend(audio_params)
+            
+            # Add standard audio settings
+            audio_settings = self._get_audio_settings(settings)
+            if audio_settings:
+                cmd.extend(audio_settings)
+        
+        if output_path.endswith('.mp4'):
+            cmd.extend(["-movflags", "+faststart"])
+        
+        cmd.append(output_path)
+        
+        # Debug output
+        debug_print("\n=== FFMPEG COMMAND ===")
+        debug_print(f"Video filters: {video_filters}")
+        debug_print(f"Resolution params: {self._get_resolution_params(settings, input_path) or 'None'}")
+        debug_print(f"Full command: {' '.join(cmd)}")
+        debug_print("===================================\n")
+        
+        return cmd
+        
+    def _build_video_filter_chain(self, settings, input_path, video_filters):
+        """Combine transformation filters (crop, rotate, flip) with the scale filter"""
+        filter_chain = []
+        
+        if video_filters:
+            filter_chain.append(video_filters)
+        
+        resolution_params = self._get_resolution_params(settings, input_path)
+        if len(resolution_params) > 1 and resolution_params[1]:
+            filter_chain.append(resolution_params[1])
+        
+        return ",".join(filter_chain)
+        
+    def build_parallel_encode_plan(self, input_path, output_path, settings, start_time, end_time, video_filters=None):
+        """Plan a re-encode split at keyframes into chunks that are encoded concurrently"""
+        duration = end_time - start_time
+        workers = self._parallel_workers(settings)
+        chunk_count = min(workers * 2, int(duration // PARALLEL_MIN_CHUNK))
+        if workers < 2 or chunk_count < 2:
+            return None
+        
+        probe = probe_media(input_path)
+        if not probe or not probe.has_video:
+            return None
+        
+        boundaries = self._chunk_boundaries(input_path, start_time, end_time, chunk_count, PARALLEL_MIN_CHUNK / 2)
+        if len(boundaries) < 3:
+            debug_print("Parallel export: no usable keyframes in range, using a single process")
+            return None
+        
+        plan = ExportPlan(work_dir=create_work_dir(output_path), max_workers=workers)
+        self._add_chunk_stages(plan, probe, input_path, output_path, settings, boundaries, video_filters)
+        debug_print(f"Parallel export: {len(boundaries) - 1} chunk(s) on {workers} worker(s), "
+              f"{self._chunk_threads(workers)} thread(s) each")
+        return plan
+        
+    def build_resumable_encode_plan(self, input_path, output_path, settings, start_time, end_time, video_filters=None):
+        """Plan a re-encode as keyframe-aligned chunks checkpointed in a journal.
+
+        The work directory is derived from the source, range and settings,
+        so running the same export again after an abort or crash finds the
+        chunks finished before and encodes only the rest.
+        """
+        duration = end_time - start_time
+        chunk_count = int(duration // RESUME_CHUNK_SECONDS)
+        if chunk_count < 2:
+            return None
+        
+        probe = probe_media(input_path)
+        if not probe or not probe.has_video:
+            return None
+        
+        key = resume_key(input_path, settings, start_time, end_time, video_filters, os.path.splitext(output_path)[1])
+        work_dir = resume_work_dir(output_path, key)
+        journal = ExportJournal(work_dir)
+        # An earlier run's split is kept, even if a scene index has appeared since
+        boundaries = journal.boundaries or self._chunk_boundaries(input_path, start_time, end_time, chunk_count,
+                                                                  RESUME_CHUNK_SECONDS / 2)
+        if len(boundaries) < 3:
+            debug_print("Resumable export: no usable keyframes in range, using a single process")
+            return None
+        
+        remove_stale_checkpoints(os.path.dirname(work_dir), keep=work_dir)
+        try:
+            os.makedirs(work_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating export checkpoint directory: {e}")
+            return None
+        journal.boundaries = boundaries
+        
+        workers = self._parallel_workers(settings) if settings.get("parallel_export", True) else 1
+        plan = ExportPlan(work_dir=work_dir, max_workers=max(1, workers), journal=journal)
+        self._add_chunk_stages(plan, probe, input_path, output_path, settings, boundaries, video_filters)
+        
+        # Chunks and audio finished by an earlier run are not encoded again
+        encode_stage = plan.stages[0]
+        done = [step for step in encode_stage if plan.journal.is_done(step)]
+        plan.stages[0] = [step for step in encode_stage if step not in done]
+        if not plan.stages[0]:
+            plan.stages.pop(0)
+        plan.resumed_duration = sum(step.duration for step in done)
+        
+        if done:
+            debug_print(f"Resuming export: {len(done)} of {len(encode_stage)} step(s) already done "
+                  f"({plan.resumed_duration:.1f}s of {duration:.1f}s)")
+        debug_print(f"Resumable export: {len(boundaries) - 1} chunk(s) in {work_dir}")
+        return plan
+        
+    def _parallel_workers(self, settings):
+        cpu_count = os.cpu_count() or 1
+        return settings.get("parallel_workers", 0) or max(1, cpu_count // PARALLEL_THREADS_PER_WORKER)
+        
+    def _chunk_threads(self, workers):
+        return max(1, (os.cpu_count() or 1) // workers)
+        
+    def _chunk_boundaries(self, input_path, start_time, end_time, chunk_count, window):
+        """Split start..end into chunk_count parts near equal divisions, at scene cuts or keyframes.
+
+        A chunk starting on a scene cut spends its first keyframe where the
+        encoder would place one anyway. Without a cut within window of a
+        division, the nearest keyframe gives the chunk a clean seek point.
+        """
+        duration = end_time - start_time
+        ideal = [start_time + duration * i / chunk_count for i in range(1, chunk_count)]
+        keyframes = self._find_keyframes_near(input_path, ideal, window)
+        scenes = scene_detector.cached(input_path)
+        cuts = scenes.between(start_time, end_time) if scenes else []
+        boundaries = [start_time]
+        for target in ideal:
+            lowest = boundaries[-1] + 1.0
+            candidates = [cut for cut in cuts if lowest < cut < end_time - 1.0 and abs(cut - target) <= window]
+            if not candidates:
+                candidates = [kf for kf in keyframes if lowest < kf < end_time - 1.0]
+            if candidates:
+                boundaries.append(min(candidates, key=lambda kf: abs(kf - target)))
+        boundaries.append(end_time)
+        return boundaries
+        
+    def _add_chunk_stages(self, plan, probe, input_path, output_path, settings, boundaries, video_filters=None):
+        """Add a stage encoding each chunk between boundaries plus the audio, then a lossless concat"""
+        start_time, end_time = boundaries[0], boundaries[-1]
+        duration = end_time - start_time
+        format_index = settings.get("format_index", 1)
+        codec_params = self._get_video_codec_params(settings, format_index)
+        filter_chain = self._build_video_filter_chain(settings, input_path, video_filters)
+        threads = self._chunk_threads(plan.max_workers)
+        work_dir = plan.work_dir
+        parts = []
+        steps = []
+        
+        for i, (chunk_start, chunk_end) in enumerate(zip(boundaries, boundaries[1:])):
+            part_path = os.path.join(work_dir, f"chunk{i:03d}.mkv")
+            parts.append(part_path)
+            cmd = [
+                "ffmpeg", "-y",
+                "-ss", f"{chunk_start:.6f}", "-i", input_path,
+                "-t", f"{chunk_end - chunk_start:.6f}",
+                "-map", "0:v:0", "-an"
+            ]
+            if filter_chain:
+                cmd.extend(["-vf", filter_chain])
+            cmd.extend(codec_params)
+            cmd.extend(["-threads", str(threads)])
+            if "libvpx-vp9" in codec_params:
+                cmd.extend(["-row-mt", "1"])
+            cmd.extend(["-f", "matroska", part_path])
+            steps.append(ExportStep(cmd=cmd, duration=chunk_end - chunk_start, label=f"encode chunk {i + 1}", output=part_path))
+        
+        audio_path = None
+        if probe.has_audio:
+            audio_path = os.path.join(work_dir, "audio.mka")
+            audio_params = self._get_audio_params(settings, format_index)
+            if audio_params == ["-c:a", "copy"]:
+                steps.append(self._build_audio_copy_step(input_path, audio_path, start_time, duration))
+            else:
+                cmd = [
+                    "ffmpeg", "-y",
+                    "-ss", f"{start_time:.6f}", "-i", input_path,
+                    "-t", f"{duration:.6f}",
+                    "-map", "0:a:0", "-vn"
+                ]
+                cmd.extend(audio_params)
+                cmd.extend(self._get_audio_settings(settings))
+                cmd.extend(["-f", "matroska", audio_path])
+                steps.append(ExportStep(cmd=cmd, label="encode audio", output=audio_path))
+        plan.add_stage(steps)
+        
+        list_path = write_concat_list(os.path.join(work_dir, "parts.txt"), parts)
+        plan.add_stage([ExportStep(
+            cmd=build_concat_command(list_path, output_path, audio_path),
+            label="concat chunks",
+            output=output_path
+        )])
+        
+    def _find_keyframes_near(self, input_path, times, window):
+        """List video keyframe times found within window seconds of each of times"""
+        index = keyframe_indexer.cached(input_path)
+        if index is not None:
+            return sorted({kf for t in times for kf in index.between(t - window, t + window)})
+        
+        intervals = ",".join(f"{max(0.0, t - window):.6f}%+{window * 2:.6f}" for t in times)
+        cmd = [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-read_intervals", intervals,
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0", input_path
+        ]
+        
+        keyframes = set()
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=120)
+            for line in result.stdout.splitlines():
+                pts_time, _, flags = line.partition(",")
+                if "K" not in flags:
+                    continue
+                try:
+                    keyframes.add(float(pts_time))
+                except ValueError:
+                    continue
+        except Exception as e:
+            print(f"Error finding keyframes: {e}")
+        
+        return sorted(keyframes)
+        
+    # --------------------------------------------------
+    # Multi-range exports
+    # --------------------------------------------------
+    def build_segments_plan(self, input_path, output_path, settings, segments, video_filters=None):
+        """Plan an export of several [start, end] ranges joined in list order into one file.
+
+        Copy exports cut each range at keyframes into a part and join the
+        parts with the concat demuxer. Re-encodes of ranges in source order
+        run as one trim/atrim + concat filter graph, so the source is read
+        once. Reordered or overlapping ranges are encoded as parts and
+        joined instead; one graph would have to buffer decoded frames
+        between them.
+        """
+        segments = [Segment(float(start), float(end)) for start, end in segments]
+        audio_only = settings.get("audio_output_format", "none") != "none"
+        
+        if settings.get("format_index", 0) == 0 and not video_filters and not audio_only:
+            return self._build_segment_parts_plan(input_path, output_path, settings, segments, copy=True)
+        if in_source_order(segments):
+            cmd = self.build_segments_filter_command(input_path, output_path, settings, segments, video_filters, audio_only)
+            if not cmd:
+                return None
+            return single_step_plan(cmd, sum(segment.duration for segment in segments), output_path)
+        return self._build_segment_parts_plan(input_path, output_path, settings, segments, video_filters, audio_only)
+        
+    def _build_segment_parts_plan(self, input_path, output_path, settings, segments, video_filters=None,
+                                  audio_only=False, copy=False):
+        work_dir = create_work_dir(output_path)
+        plan = ExportPlan(work_dir=work_dir)
+        # Matroska takes any codec the video outputs use; audio parts keep the output format
+        ext = os.path.splitext(output_path)[1] if audio_only else ".mkv"
+        vc1 = not copy and not audio_only and self.is_vc1_video(input_path)
+        parts = []
+        steps = []
+        
+        for i, segment in enumerate(segments):
+            part = os.path.join(work_dir, f"segment{i:03d}{ext}")
+            if copy:
+                cmd = [
+                    "ffmpeg", "-y",
+                    "-ss", f"{segment.start:.6f}", "-i", input_path,
+                    "-t", f"{segment.duration:.6f}",
+                    "-map", "0:v:0?", "-map", "0:a:0?",
+                    "-c", "copy", "-avoid_negative_ts", "make_zero",
+                    "-f", "matroska", part
+                ]
+            elif audio_only:
+                cmd = self.build_audio_command(input_path, part, settings, segment.start, segment.duration)
+            elif vc1:
+                cmd = self.build_vc1_conversion_command(input_path, part, settings, segment.start, segment.duration, video_filters)
+            else:
+                cmd = self.build_video_command(input_path, part, settings, segment.start, segment.duration, video_filters)
+            if not cmd:
+                plan.cleanup()
+                return None
+            parts.append(part)
+            steps.append(ExportStep(cmd=cmd, duration=segment.duration, label=f"segment {i + 1}", output=part))
+        plan.add_stage(steps)
+        
+        list_path = write_concat_list(os.path.join(work_dir, "segments.txt"), parts)
+        plan.add_stage([ExportStep(
+            cmd=build_concat_command(list_path, output_path),
+            label="concat segments",
+            output=output_path
+        )])
+        
+        debug_print(f"Segments: {len(parts)} part(s), {'copy' if copy else 're-encode'} and concat")
+        return plan
+        
+    def build_segments_filter_command(self, input_path, output_path, settings, segments, video_filters=None,
+                                      audio_only=False):
+        """Build one FFmpeg command that trims every segment from a single decode and concatenates them.
+
+        segments must be in source order. The input is read from the first
+        start to the last end only; trim times are relative to that seek.
+        """
+        probe = probe_media(input_path)
+        if not probe:
+            print(f"Cannot plan segment export, probe failed: {input_path}")
+            return None
+        has_video = not audio_only and probe.video_stream is not None
+        has_audio = probe.has_audio
+        if not has_video and not has_audio:
+            return None
+        
+        first = segments[0].start
+        last = segments[-1].end
+        seek = self._vc1_seek_point(input_path, first) if has_video and probe.is_vc1 else first
+        
+        graph = []
+        pads = []
+        for i, segment in enumerate(segments):
+            start, end = segment.start - seek, segment.end - seek
+            if has_video:
+                graph.append(f"[0:v:0]trim=start={start:.6f}:end={end:.6f},setpts=PTS-STARTPTS[v{i}]")
+                pads.append(f"[v{i}]")
+            if has_audio:
+                graph.append(f"[0:a:0]atrim=start={start:.6f}:end={end:.6f},asetpts=PTS-STARTPTS[a{i}]")
+                pads.append(f"[a{i}]")
+        outputs = ("[vcat]" if has_video else "") + ("[aout]" if has_audio else "")
+        graph.append(f"{''.join(pads)}concat=n={len(segments)}:v={int(has_video)}:a={int(has_audio)}{outputs}")
+        
+        format_index = settings.get("format_index", 0)
+        video_label = "[vcat]"
+        if has_video:
+            if format_index == 0:
+                filter_chain = video_filters or ""
+            else:
+                filter_chain = self._build_video_filter_chain(settings, input_path, video_filters)
+            if filter_chain:
+                graph.append(f"[vcat]{filter_chain}[vout]")
+                video_label = "[vout]"
+        
+        cmd = [
+            "ffmpeg", "-y",
+            "-ss", f"{seek:.6f}", "-t", f"{last - seek:.6f}", "-i", input_path,
+            "-filter_complex", ";".join(graph)
+        ]
+        if has_video:
+            cmd.extend(["-map", video_label])
+        if has_audio:
+            cmd.extend(["-map", "[aout]"])
+        
+        if audio_only:
+            cmd.extend(["-vn", "-ac", "2", "-ar", "48000"])
+            cmd.extend(self._get_audio_export_params(settings))
+        elif format_index == 0:
+            # Same encode as a filtered copy export, see build_fast_copy_command
+            cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-c:a", "aac", "-b:a", "192k"])
+        else:
+            cmd.extend(self._get_video_codec_params(settings, format_index))
+            audio_params = self._get_audio_params(settings, format_index)
+            if "copy" in audio_params:
+                # Filtered audio cannot be stream-copied
+                audio_params = ["-c:a", "aac", "-b:a", "192k"]
+            cmd.extend(audio_params)
+            cmd.extend(self._get_audio_settings(settings))
+            if probe.is_vc1:
+                cmd.extend(["-pix_fmt", "yuv420p"])
+        
+        if output_path.endswith('.mp4'):
+            cmd.extend(["-movflags", "+faststart"])
+        cmd.append(output_path)
+        
+        debug_print("\n=== SEGMENTS FILTER COMMAND ===")
+        debug_print(f"Segments: {[(segment.start, segment.end) for segment in segments]}")
+        debug_print(f"Full command: {' '.join(cmd)}")
+        debug_print("===================================\n")
+        return cmd
+        
+    def build_audio_command(self, input_path, output_path, settings, start_time, duration):
+        """Build FFmpeg command for audio-only export"""
+        cmd = [
+            "ffmpeg", "-y", 
+            "-ss", str(start_time), 
+            "-i", input_path, 
+            "-t", str(duration), 
+            "-vn",
+            "-ac", "2",
+            "-ar", "48000"
+        ]
+        cmd.extend(self._get_audio_export_params(settings))
+        cmd.append(output_path)
+        return cmd
+        
+    def _get_audio_export_params(self, settings):
+        """Get codec parameters for audio-only output formats"""
+        audio_format = settings.get("audio_output_format", "mp3")
+        audio_quality = settings.get("audio_quality", "192")
+        
+        if audio_format == "mp3":
+            return ["-c:a", "libmp3lame", "-b:a", f"{audio_quality}k"]
+        elif audio_format == "aac":
+            return ["-c:a", "aac", "-b:a", f"{audio_quality}k"]
+        elif audio_format == "flac":
+            return ["-c:a", "flac"]
+        return []
+        
+    def build_multi_output_command(self, input_path, targets, start_time, duration, video_filters=None):
+        """Build one FFmpeg command that decodes the range once and writes every target.
+
+        targets is a list of (output_path, settings). Decoded video and audio
+        are fanned out with split/asplit to each output that re-encodes;
+        outputs in original-copy mode map the input streams directly.
+        """
+        probe = probe_media(input_path)
+        if not probe or not targets:
+            return None
+        
+        video_outputs = []
+        audio_outputs = []
+        for index, (output_path, settings) in enumerate(targets):
+            audio_only = settings.get("audio_output_format", "none") != "none"
+            if audio_only:
+                if not probe.has_audio:
+                    print(f"Multi-output: no audio stream for {output_path}")
+                    return None
+                audio_outputs.append(index)
+                continue
+            if not probe.has_video:
+                return None
+            copy_video = settings.get("format_index", 0) == 0 and not video_filters
+            if not copy_video:
+                video_outputs.append(index)
+            if probe.has_audio and self._get_audio_params(settings, settings.get("format_index", 0)) != ["-c:a", "copy"]:
+                audio_outputs.append(index)
+            elif probe.has_audio and not copy_video and settings.get("format_index", 0) == 0:
+                # Filtered original-mode exports re-encode audio like build_fast_copy_command
+                audio_outputs.append(index)
+        
+        graph = []
+        if video_outputs:
+            source = f"[0:v:0]{video_filters}," if video_filters else "[0:v:0]"
+            labels = "".join(f"[vs{i}]" for i in video_outputs)
+            if len(video_outputs) > 1:
+                graph.append(f"{source}split={len(video_outputs)}{labels}")
+            else:
+                graph.append(f"{source}null{labels}")
+            for i in video_outputs:
+                settings = targets[i][1]
+                scale = self._get_resolution_params(settings, input_path)
+                graph.append(f"[vs{i}]{scale[1] if scale else 'null'}[vo{i}]")
+        if audio_outputs:
+            labels = "".join(f"[ao{i}]" for i in audio_outputs)
+            if len(audio_outputs) > 1:
+                graph.append(f"[0:a:0]asplit={len(audio_outputs)}{labels}")
+            else:
+                graph.append(f"[0:a:0]anull{labels}")
+        
+        cmd = ["ffmpeg", "-y", "-ss", str(start_time), "-i", input_path]
+        if graph:
+            cmd.extend(["-filter_complex", ";".join(graph)])
+        
+        for index, (output_path, settings) in enumerate(targets):
+            format_index = settings.get("format_index", 0)
+            cmd.extend(["-t", str(duration)])
+            
+            if settings.get("audio_output_format", "none") != "none":
+                cmd.extend(["-map", f"[ao{index}]", "-ac", "2", "-ar", "48000"])
+                cmd.extend(self._get_audio_export_params(settings))
+                cmd.append(output_path)
+                continue
+            
+            if index in video_outputs:
+                cmd.extend(["-map", f"[vo{index}]"])
+                if format_index == 0:
+                    cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18"])
+                else:
+                    cmd.extend(self._get_video_codec_params(settings, format_index))
+            else:
+                cmd.extend(["-map", "0:v:0", "-c:v", "copy"])
+            
+            if index in audio_outputs:
+                cmd.extend(["-map", f"[ao{index}]"])
+                if format_index == 0:
+                    cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+                else:
+                    cmd.extend(self._get_audio_params(settings, format_index))
+                    cmd.extend(self._get_audio_settings(settings))
+            elif probe.has_audio:
+                cmd.extend(["-map", "0:a:0", "-c:a", "copy"])
+            
+            if output_path.endswith('.mp4'):
+                cmd.extend(["-movflags", "+faststart"])
+            cmd.append(output_path)
+        
+        return cmd
+        
+    def _get_video_codec_params(self, settings, format_index):
+        """Get video codec parameters based on settings"""
+        formats = ["original", "mp4", "mkv", "webm"]
+        
+        if format_index >= len(formats):
+            format_index = 1
+            
+        format_type = formats[format_index]
+        
+        if format_type == "original":
+            video_codec = self.detect_video_codec_from_file(settings.get("input_path", ""))
+            if video_codec:
+                return ["-c:v", video_codec, "-c:a", "copy"]
+            else:
+                return ["-c:v", "copy", "-c:a", "copy"]
+        elif format_type == "webm":
+            crf_value = settings.get("crf_value", 23)
+            if not capability_registry.has_encoder("libvpx-vp9") and capability_registry.has_encoder("libaom-av1"):
+                print("libvpx-vp9 is not available in this FFmpeg build, encoding AV1 with libaom-av1")
+                return ["-c:v", "libaom-av1", "-crf", str(crf_value), "-b:v", "0", "-cpu-used", "6"]
+            return ["-c:v", "libvpx-vp9", "-crf", str(crf_value), "-b:v", "0"]
+        else:
+            video_codec = settings.get("video_codec", "H264")
+            crf_value = settings.get("crf_value", 23)
+            
+            if video_codec == "H265":
+                if capability_registry.has_encoder("libx265"):
+                    return ["-c:v", "libx265", "-crf", str(crf_value), "-preset", "medium"]
+                print("libx265 is not available in this FFmpeg build, falling back to libx264")
+            return ["-c:v", "libx264", "-crf", str(crf_value), "-preset", "medium"]
+        
+    def _get_audio_params(self, settings, format_index):
+        """Get audio codec parameters based on settings"""
+        formats = ["original", "mp4", "mkv", "webm"]
+        format_type = formats[format_index] if format_index < len(formats) else "mp4"
+        
+        video_audio_format = settings.get("video_audio_format", "AAC")
+        
+        if format_type == "original":
+            return ["-c:a", "copy"]
+        elif format_type == "webm":
+            return ["-c:a", "libopus", "-b:a", "192k"]
+        elif video_audio_format == "Copy Original":
+            return ["-c:a", "copy"]
+        elif video_audio_format == "MP3":
+            audio_bitrate = settings.get("video_audio_bitrate", "192")
+            return ["-c:a", "libmp3lame", "-b:a", f"{audio_bitrate}k"]
+        else:
+            audio_bitrate = settings.get("video_audio_bitrate", "192")
+            return ["-c:a", "aac", "-b:a", f"{audio_bitrate}k"]
+        
+    def _get_resolution_params(self, settings, input_path):
+        """Get resolution scaling parameters"""
+        resolution = settings.get("resolution", "Original")
+        
+        if resolution == "Original":
+            return []
+        
+        # Get original video dimensions
+        probe = probe_media(input_path)
+        stream = probe.video_stream if probe else None
+        if not stream or stream.width == 0 or stream.height == 0:
+            return []
+        orig_width = stream.width
+        orig_height = stream.height
+        
+        # Calculate target dimensions while preserving aspect ratio
+        if resolution == "4K":
+            target_width, target_height = 3840, 2160
+        elif resolution == "2K":
+            target_width, target_height = 2560, 1440
+        elif resolution == "1080p":
+            target_width, target_height = 1920, 1080
+        elif resolution == "720p":
+            target_width, target_height = 1280, 720
+        elif resolution == "480p":
+            target_width, target_height = 854, 480
+        else:
+            return []
+        
+        # Ensure dimensions are even numbers (required by most codecs)
+        target_width = target_width if target_width % 2 == 0 else target_width - 1
+        target_height = target_height if target_height % 2 == 0 else target_height - 1
+        
+        # Calculate new dimensions that fit within target while preserving aspect ratio
+        orig_ratio = orig_width / orig_height
+        target_ratio = target_width / target_height
+        
+        if abs(orig_ratio - target_ratio) < 0.01:
+            # Same aspect ratio, direct scale
+            new_width = target_width
+            new_height = target_height
+        else:
+            # Different aspect ratio - fit within target dimensions
+            if orig_ratio > target_ratio:
+                # Video is wider than target, fit by width
+                new_width = target_width
+                new_height = int(target_width / orig_ratio)
+            else:
+                # Video is taller than target, fit by height
+                new_height = target_height
+                new_width = int(target_height * orig_ratio)
+        
+        # Ensure dimensions are even numbers
+        new_width = new_width if new_width % 2 == 0 else new_width - 1
+        new_height = new_height if new_height % 2 == 0 else new_height - 1
+        
+        # Ensure minimum dimensions
+        if new_width < 2 or new_height < 2:
+            return []
+        
+        return ["-vf", f"scale={new_width}:{new_height}"]
+        
+    def _get_audio_settings(self, settings):
+        """Get standard audio settings"""
+        return ["-ac", "2", "-ar", "48000"]
+        
+    def detect_video_codec_from_file(self, input_path):
+        """Detect video codec from file using the shared media probe"""
+        if not input_path or not os.path.exists(input_path):
+            return None
+        
+        probe = probe_media(input_path)
+        if probe and probe.video_stream:
+            codec_name = probe.video_codec
+            # Map codec names to FFmpeg encoder names
+            codec_map = {
+                "h264": "libx264",
+                "hevc": "libx265",
+                "h265": "libx265",
+                "vp8": "libvpx",
+                "vp9": "libvpx-vp9",
+                "av1": "libaom-av1",
+                "mpeg4": "mpeg4",
+                "msmpeg4v3": "msmpeg4v3",
+                "wmv3": "libx264",
+                "vc1": "libx264",
+                "wmva": "libx264",
+                "wmvp": "libx264",
+                "wmv1": "libx264",
+                "wmv2": "libx264",
+                "mpeg2video": "mpeg2video",
+                "mjpeg": "mjpeg"
+            }
+            return codec_map.get(codec_name, codec_name)
+        
+        return None
+        
+    def is_vc1_video(self, input_path):
+        """Check if video uses VC-1 codec family"""
+        probe = probe_media(input_path)
+        return bool(probe and probe.is_vc1)
+
+    def _vc1_seek_point(self, input_path, start_time):
+        """Input-side seek target for a VC-1 cut starting at start_time"""
+        index = keyframe_indexer.cached(input_path)
+        if index:
+            keyframe = index.at_or_before(start_time - VC1_KEYFRAME_MARGIN)
+            if keyframe is not None:
+                return max(0.0, keyframe)
+        return max(0.0, start_time - VC1_SEEK_PREROLL)
+        
+    def build_vc1_conversion_command(self, input_path, output_path, settings, start_time, duration, video_filters):
+        """Build special FFmpeg command for converting VC-1/WMV videos"""
+        cmd = ["ffmpeg", "-y"]
+        
+        # Hybrid seek: coarse on input, exact on output, so only the preroll is decoded twice
+        coarse = self._vc1_seek_point(input_path, start_time)
+        cmd.extend(["-ss", f"{coarse:.6f}", "-i", input_path])
+        cmd.extend(["-ss", f"{start_time - coarse:.6f}", "-t", str(duration)])
+        
+        # Get target codec from settings
+        video_codec = settings.get("video_codec", "H264")
+        crf_value = settings.get("crf_value", 23)
+        
+        # Set video codec and parameters
+        if video_codec == "H265":
+            cmd.extend(["-c:v", "libx265"])
+            cmd.extend(["-crf", str(crf_value)])
+            cmd.extend(["-preset", "medium"])
+            cmd.extend(["-tag:v", "hvc1"])  # For better compatibility
+        elif video_codec == "VP9":
+            cmd.extend(["-c:v", "libvpx-vp9"])
+            cmd.extend(["-crf", str(crf_value)])
+            cmd.extend(["-b:v", "0"])  # Variable bitrate for VP9
+        else:  # Default to H.264
+            cmd.extend(["-c:v", "libx264"])
+            cmd.extend(["-crf", str(crf_value)])
+            cmd.extend(["-preset", "medium"])
+        
+        # Audio settings
+        audio_format = settings.get("video_audio_format", "AAC")
+        audio_bitrate = settings.get("video_audio_bitrate", "192")
+        
+        if audio_format == "MP3":
+            cmd.extend(["-c:a", "libmp3lame", "-b:a", f"{audio_bitrate}k"])
+        else:
+            cmd.extend(["-c:a", "aac", "-b:a", f"{audio_bitrate}k"])
+        
+        # Build filter chain
+        filter_chain = []
+        
+        # Add transformation filters
+        if video_filters:
+            filter_chain.append(video_filters)
+        
+        # Add scale filter for resolution change
+        resolution = settings.get("resolution", "Original")
+        if resolution != "Original":
+            res_params = self._get_resolution_params(settings, input_path)
+            if res_params:
+                scale_filter = res_params[1] if len(res_params) > 1 else ""
+                if scale_filter:
+                    filter_chain.append(scale_filter)
+        
+        # Combine all filters
+        if filter_chain:
+            combined_filters = ",".join(filter_chain)
+            cmd.extend(["-vf", combined_filters])
+        
+        # Add faststart for MP4 files
+        if output_path.endswith('.mp4'):
+            cmd.extend(["-movflags", "+faststart"])
+        
+        # Compatibility flags
+        cmd.extend(["-strict", "-2"])  # Allow experimental codecs
+        cmd.extend(["-pix_fmt", "yuv420p"])  # Ensure compatibility
+        
+        cmd.append(output_path)
+        
+        # Debug output
+        debug_print("\n=== VC-1 CONVERSION COMMAND ===")
+        debug_print(f"Target codec: {video_codec}")
+        debug_print(f"Video filters: {video_filters}")
+        debug_print(f"Full command: {' '.join(cmd)}")
+        debug_print("===================================\n")
+        
+        return cmd
@@ -0,0 +1,125 @@
+# --------------------------------------------------
+# Machine-readable FFmpeg progress (-progress pipe:1)
+# --------------------------------------------------
+from dataclasses import dataclass
+from typing import List
+
+# Inserted right after the ffmpeg binary; -nostats drops the human-readable status line
+PROGRESS_ARGS = ["-progress", "pipe:1", "-nostats"]
+
+
+def with_progress_pipe(cmd):
+    """Return cmd with -progress output sent to stdout"""
+    if "-progress" in cmd:
+        return list(cmd)
+    return [cmd[0]] + PROGRESS_ARGS + list(cmd[1:])
+
+
+def _parse_clock(value):
+    """Parse HH:MM:SS.micro into seconds"""
+    try:
+        hours, minutes, seconds = value.split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _parse_number(value, suffix=""):
+    """Parse '1.5x' / '1234.5kbits/s' style values; 'N/A' becomes 0"""
+    if value is None:
+        return 0.0
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    out_time: float = 0.0
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+    bitrate_kbps: float = 0.0
+    total_size: int = 0
+    finished: bool = False
+
+    def fraction(self, total_duration):
+        if total_duration <= 0:
+            return None
+        return max(0.0, min(self.out_time / total_duration, 1.0))
+
+    def eta(self, total_duration):
+        """Seconds left at the current speed, or None while speed is unknown"""
+        if self.speed <= 0 or total_duration <= 0:
+            return None
+        return max(0.0, total_duration - self.out_time) / self.speed
+
+    @classmethod
+    def from_fields(cls, fields):
+        out_time = None
+        # out_time_ms is also in microseconds in FFmpeg, out_time_us is the correct name
+        for key in ("out_time_us", "out_time_ms"):
+            raw = fields.get(key)
+            if raw not in (None, "N/A"):
+                try:
+                    out_time = int(raw) / 1_000_000
+                    break
+                except ValueError:
+                    pass
+        if out_time is None:
+            out_time = _parse_clock(fields.get("out_time")) or 0.0
+
+        try:
+            total_size = int(fields.get("total_size", 0))
+        except ValueError:
+            total_size = 0
+        try:
+            frame = int(fields.get("frame", 0))
+        except ValueError:
+            frame = 0
+
+        return cls(
+            out_time=max(0.0, out_time),
+            frame=frame,
+            fps=_parse_number(fields.get("fps")),
+            speed=_parse_number(fields.get("speed"), "x"),
+            bitrate_kbps=_parse_number(fields.get("bitrate"), "kbits/s"),
+            total_size=total_size,
+            finished=fields.get("progress") == "end",
+        )
+
+
+class FFmpegProgressParser:
+    """Incremental parser for the key=value blocks FFmpeg writes with -progress.
+
+    feed() accepts arbitrary chunks; a partial line is kept until the rest
+    arrives, and one ProgressEvent is produced per block, which FFmpeg
+    terminates with progress=continue or progress=end.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._fields = {}
+        self.last_event = None
+
+    def feed(self, data) -> List[ProgressEvent]:
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode("utf-8", errors="ignore")
+        self._buffer += data
+
+        events = []
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            key, sep, value = line.strip().partition("=")
+            if not sep:
+                continue
+            self._fields[key] = value
+            if key == "progress":
+                self.last_event = ProgressEvent.from_fields(self._fields)
+                events.append(self.last_event)
+                self._fields = {}
+        return events
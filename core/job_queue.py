@@ -0,0 +1,228 @@
+# --------------------------------------------------
+# Persistent export job queue and scheduler
+# --------------------------------------------------
+import os
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+from .export_job import JobStore, JOB_QUEUED, JOB_RUNNING, JOB_PAUSED, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from .video_processor import VideoProcessor
+
+
+class ExportScheduler(QObject):
+    """Runs queued export jobs, highest priority first, up to max_concurrent at a time.
+
+    Every state change is written to the job store. Jobs that were running
+    when the application exited are queued again by restore(), so pending
+    work survives a crash or restart. A paused job keeps its FFmpeg
+    processes suspended and still occupies its slot.
+    """
+    job_added = pyqtSignal(str)
+    job_updated = pyqtSignal(str)
+    job_progress = pyqtSignal(str, int)
+    job_finished = pyqtSignal(str, bool)
+
+    def __init__(self, max_concurrent=1, store=None, history_limit=50):
+        super().__init__()
+        self.max_concurrent = max(1, max_concurrent)
+        self.store = store or JobStore()
+        self.history_limit = history_limit
+        self.jobs = {}
+        self._processors = {}
+        self._held = False
+
+    # --------------------------------------------------
+    # Queue management
+    # --------------------------------------------------
+    def restore(self):
+        """Load persisted jobs and start whatever was still pending"""
+        for job in self.store.load():
+            if job.state == JOB_RUNNING:
+                job.state = JOB_QUEUED
+                job.progress = 0
+            self.jobs[job.job_id] = job
+        pending = len(self.pending_jobs())
+        if pending:
+            print(f"Restored {pending} pending export job(s)")
+        self._save()
+        self._schedule()
+        return pending
+
+    def add_job(self, job):
+        job.state = JOB_QUEUED
+        self.jobs[job.job_id] = job
+        self._save()
+        self.job_added.emit(job.job_id)
+        self._schedule()
+        return job.job_id
+
+    def get_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    def ordered_jobs(self):
+        return sorted(self.jobs.values(), key=lambda job: (-job.priority, job.created))
+
+    def pending_jobs(self):
+        return [job for job in self.ordered_jobs() if not job.is_finished]
+
+    def reserved_outputs(self):
+        return {path for job in self.pending_jobs() for path in job.output_paths}
+
+    def set_priority(self, job_id, priority):
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        job.priority = priority
+        self._update(job)
+        self._schedule()
+        return True
+
+    def set_max_concurrent(self, max_concurrent):
+        self.max_concurrent = max(1, max_concurrent)
+        self._schedule()
+
+    def clear_finished(self):
+        for job in [job for job in self.jobs.values() if job.is_finished]:
+            del self.jobs[job.job_id]
+        self._save()
+
+    def hold(self):
+        """Stop starting new jobs; running jobs continue"""
+        self._held = True
+
+    def release(self):
+        self._held = False
+        self._schedule()
+
+    # --------------------------------------------------
+    # Job control
+    # --------------------------------------------------
+    def pause(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return False
+        if job.state == JOB_QUEUED:
+            job.state = JOB_PAUSED
+        elif job.state == JOB_RUNNING:
+            if not self._processors[job_id].pause_processing():
+                return False
+            job.state = JOB_PAUSED
+        else:
+            return False
+        self._update(job)
+        return True
+
+    def resume(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job.state != JOB_PAUSED:
+            return False
+        processor = self._processors.get(job_id)
+        if processor is not None:
+            processor.resume_processing()
+            job.state = JOB_RUNNING
+        else:
+            job.state = JOB_QUEUED
+        self._update(job)
+        self._schedule()
+        return True
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return False
+        processor = self._processors.get(job_id)
+        job.state = JOB_CANCELLED
+        if processor is not None:
+            # export_finished arrives from abort_processing() and closes the job
+            processor.abort_processing()
+        else:
+            self._complete_job(job, False)
+        return True
+
+    def shutdown(self):
+        """Stop running jobs and keep them queued for the next start"""
+        self._held = True
+        for job_id, processor in list(self._processors.items()):
+            job = self.jobs[job_id]
+            job.state = JOB_QUEUED
+            job.progress = 0
+            processor.export_finished.disconnect()
+            processor.abort_processing()
+        self._processors.clear()
+        self._save()
+
+    # --------------------------------------------------
+    # Scheduling
+    # --------------------------------------------------
+    def _schedule(self):
+        if self._held:
+            return
+        for job in self.ordered_jobs():
+            if len(self._processors) >= self.max_concurrent:
+                break
+            if job.state == JOB_QUEUED:
+                self._start_job(job)
+
+    def _start_job(self, job):
+        if not os.path.exists(job.input_path):
+            print(f"Export job input missing: {job.input_path}")
+            self._complete_job(job, False)
+            return
+
+        processor = VideoProcessor()
+        processor.progress_updated.connect(lambda percent, job_id=job.job_id: self._job_progress(job_id, percent))
+        processor.export_finished.connect(lambda output, success, job_id=job.job_id: self._job_finished(job_id, success))
+        self._processors[job.job_id] = processor
+
+        job.state = JOB_RUNNING
+        job.progress = 0
+        self._update(job)
+        print(f"Starting export job {job.job_id}: {job.output_path}")
+
+        if job.audio_only:
+            started = processor.export_audio(job.input_path, job.output_path, job.settings,
+                                             job.start_time, job.end_time, job.segments)
+        elif job.extra_outputs:
+            started = processor.export_multi(job.input_path, job.targets(),
+                                             job.start_time, job.end_time, job.video_filters)
+        else:
+            started = processor.export_video(job.input_path, job.output_path, job.settings,
+                                             job.start_time, job.end_time, job.video_filters, job.segments)
+
+        if not started and job.job_id in self._processors:
+            self._processors.pop(job.job_id)
+            self._complete_job(job, False)
+
+    def _job_progress(self, job_id, percent):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job.progress = percent
+            self.job_progress.emit(job_id, percent)
+
+    def _job_finished(self, job_id, success):
+        self._processors.pop(job_id, None)
+        job = self.jobs.get(job_id)
+        if job is not None:
+            self._complete_job(job, success)
+        self._schedule()
+
+    def _complete_job(self, job, success):
+        if job.state != JOB_CANCELLED:
+            job.state = JOB_DONE if success else JOB_FAILED
+        job.finished = time.time()
+        if success:
+            job.progress = 100
+        self._trim_history()
+        self._update(job)
+        self.job_finished.emit(job.job_id, success)
+
+    def _trim_history(self):
+        finished = sorted((job for job in self.jobs.values() if job.is_finished), key=lambda job: job.finished)
+        for job in finished[:max(0, len(finished) - self.history_limit)]:
+            del self.jobs[job.job_id]
+
+    def _update(self, job):
+        self._save()
+        self.job_updated.emit(job.job_id)
+
+    def _save(self):
+        self.store.save(self.ordered_jobs())
@@ -0,0 +1,360 @@
+# --------------------------------------------------
+# Per-file video frame table and keyframe index
+# --------------------------------------------------
+import io
+import os
+import zlib
+import bisect
+import subprocess
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .media_cache import media_cache
+from .media_probe import probe_media
+from .utils import background_popen_kwargs, debug_print
+
+# NumPy is imported where it is used: this module loads with the main window,
+# and NumPy is only needed once a file has been indexed
+
+# Times closer than this to a keyframe are treated as on it
+KEYFRAME_TOLERANCE = 0.001
+
+
+class KeyframeIndex:
+    """Sorted keyframe times (seconds from the start of the file) of the first video stream.
+
+    Times are kept in a flat array of doubles, so even hour-long files with
+    short GOPs stay small, and every lookup is a bisection.
+    """
+
+    def __init__(self, times=()):
+        self.times = array("d", sorted(times))
+
+    def __len__(self):
+        return len(self.times)
+
+    def __bool__(self):
+        return len(self.times) > 0
+
+    def at_or_before(self, t, tolerance=KEYFRAME_TOLERANCE) -> Optional[float]:
+        """Last keyframe at or before t; where a copy export starting at t really starts"""
+        i = bisect.bisect_right(self.times, t + tolerance)
+        return self.times[i - 1] if i else None
+
+    def after(self, t, tolerance=KEYFRAME_TOLERANCE) -> Optional[float]:
+        """First keyframe strictly after t"""
+        i = bisect.bisect_right(self.times, t + tolerance)
+        return self.times[i] if i < len(self.times) else None
+
+    def before(self, t, tolerance=KEYFRAME_TOLERANCE) -> Optional[float]:
+        """Last keyframe strictly before t"""
+        i = bisect.bisect_left(self.times, t - tolerance)
+        return self.times[i - 1] if i else None
+
+    def nearest(self, t) -> Optional[float]:
+        i = bisect.bisect_left(self.times, t)
+        candidates = self.times[max(0, i - 1):i + 1]
+        return min(candidates, key=lambda kf: abs(kf - t)) if candidates else None
+
+    def is_keyframe(self, t, tolerance=KEYFRAME_TOLERANCE):
+        kf = self.nearest(t)
+        return kf is not None and abs(kf - t) <= tolerance
+
+    def between(self, start, end):
+        """Keyframes with start <= time <= end"""
+        lo = bisect.bisect_left(self.times, start)
+        hi = bisect.bisect_right(self.times, end)
+        return list(self.times[lo:hi])
+
+    def to_bytes(self):
+        return zlib.compress(self.times.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        index = cls()
+        index.times.frombytes(zlib.decompress(data))
+        return index
+
+
+class FrameTable:
+    """Presentation timestamps of every video frame, sorted, as NumPy arrays.
+
+    times are seconds from the start of the file and durations the packet
+    durations, which is what makes VFR files come out right: the duration
+    is where the last frame ends, not frame_count / fps.
+    """
+
+    def __init__(self, times, durations, keyframes):
+        import numpy as np
+        order = np.argsort(times, kind="stable")
+        self.times = np.asarray(times, np.float64)[order]
+        self.durations = np.asarray(durations, np.float64)[order]
+        self.keyframe_mask = np.asarray(keyframes, bool)[order]
+        self.keyframes = KeyframeIndex(self.times[self.keyframe_mask].tolist())
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def duration(self):
+        if not len(self.times):
+            return 0.0
+        last_duration = self.durations[-1] if self.durations[-1] > 0 else self.frame_interval
+        return float(self.times[-1] + last_duration)
+
+    @property
+    def frame_interval(self):
+        """Median frame spacing, used where a single frame length is needed"""
+        import numpy as np
+        if len(self.times) < 2:
+            return 0.0
+        return float(np.median(np.diff(self.times)))
+
+    def frame_at(self, t, tolerance=KEYFRAME_TOLERANCE):
+        """Index of the frame on screen at t (the last one starting at or before t), or -1"""
+        import numpy as np
+        return int(np.searchsorted(self.times, t + tolerance, side="right")) - 1
+
+    def count_between(self, start, end):
+        """Number of frames with start <= time < end"""
+        import numpy as np
+        return int(np.searchsorted(self.times, end) - np.searchsorted(self.times, start))
+
+    def snap(self, t):
+        """Start time of the frame on screen at t; what an exact cut at t really starts on"""
+        i = self.frame_at(t)
+        return float(self.times[max(0, i)]) if len(self.times) else t
+
+    def next_frame(self, t) -> Optional[float]:
+        i = self.frame_at(t) + 1
+        return float(self.times[i]) if i < len(self.times) else None
+
+    def previous_frame(self, t) -> Optional[float]:
+        i = self.frame_at(t) - 1
+        return float(self.times[i]) if i >= 0 else None
+
+    def to_bytes(self):
+        import numpy as np
+        buffer = io.BytesIO()
+        np.savez(buffer, times=self.times, durations=self.durations, keyframes=self.keyframe_mask)
+        return zlib.compress(buffer.getvalue())
+
+    @classmethod
+    def from_bytes(cls, data):
+        import numpy as np
+        with np.load(io.BytesIO(zlib.decompress(data))) as arrays:
+            return cls(arrays["times"], arrays["durations"], arrays["keyframes"])
+
+
+# --------------------------------------------------
+# Indexing service
+# --------------------------------------------------
+class KeyframeIndexer:
+    """Builds frame tables and keyframe indexes with ffprobe on a background thread.
+
+    One packet scan yields the FrameTable, and the KeyframeIndex is taken
+    from it. Finished tables are kept in memory and in the media cache,
+    keyed like probe results, so a file is scanned once per version.
+    cached() and cached_frames() never start a scan, which makes them safe
+    to call from export planning and the UI.
+    """
+    CACHE_KIND = "frames"
+
+    def __init__(self, ffprobe_path="ffprobe", timeout=600, max_entries=16, disk_cache=None):
+        self.ffprobe_path = ffprobe_path
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _cache_key(self, file_path):
+        try:
+            st = os.stat(file_path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+    def cached(self, file_path) -> Optional[KeyframeIndex]:
+        """Return the keyframe index if it was already built, without scanning the file"""
+        table = self.cached_frames(file_path)
+        return table.keyframes if table is not None else None
+
+    def cached_frames(self, file_path) -> Optional[FrameTable]:
+        """Return the frame table if it was already built, without scanning the file"""
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        table = self._load_from_disk(file_path)
+        if table is not None:
+            self._remember(key, table)
+        return table
+
+    def index(self, file_path) -> Optional[KeyframeIndex]:
+        """Return the keyframe index for file_path, scanning the file if needed (blocking)"""
+        table = self.frames(file_path)
+        return table.keyframes if table is not None else None
+
+    def frames(self, file_path) -> Optional[FrameTable]:
+        """Return the frame table for file_path, scanning the file if needed (blocking)"""
+        table = self.cached_frames(file_path)
+        if table is not None:
+            return table
+
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+        table = self._scan(key, file_path)
+        if table is not None:
+            self._remember(key, table)
+            if self.disk_cache is not None:
+                self.disk_cache.put(file_path, self.CACHE_KIND, table.to_bytes())
+        return table
+
+    def request(self, file_path, callback=None):
+        """Build the index in the background; callback(file_path, index) runs on the worker thread"""
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="keyframe-index")
+                future = self._executor.submit(self.index, file_path)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget_pending(key))
+
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(file_path, None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    def invalidate(self, file_path=None):
+        with self._lock:
+            if file_path is None:
+                self._cache.clear()
+                return
+            abs_path = os.path.abspath(file_path)
+            for key in [k for k in self._cache if k[0] == abs_path]:
+                del self._cache[key]
+
+    def cancel(self, keep_path=None):
+        """Stop pending and running scans, except those of keep_path"""
+        keep = os.path.abspath(keep_path) if keep_path else None
+        with self._lock:
+            futures = [future for key, future in self._pending.items() if key[0] != keep]
+            processes = [proc for key, proc in self._processes.items() if key[0] != keep]
+        # Cancelling runs done callbacks, which take the lock
+        for future in futures:
+            future.cancel()
+        for proc in processes:
+            proc.kill()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _remember(self, key, table):
+        with self._lock:
+            self._cache[key] = table
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _forget_pending(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _load_from_disk(self, file_path):
+        if self.disk_cache is None:
+            return None
+        data = self.disk_cache.get(file_path, self.CACHE_KIND)
+        if data is None:
+            return None
+        try:
+            return FrameTable.from_bytes(data)
+        except Exception as e:
+            print(f"Frame table cache entry unreadable: {e}")
+            return None
+
+    def _scan(self, key, file_path):
+        probe = probe_media(file_path)
+        if not probe or not probe.has_video:
+            return None
+
+        # Packet headers only, nothing is decoded
+        cmd = [
+            self.ffprobe_path, "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,dts_time,duration_time,flags",
+            "-of", "csv=p=0", file_path
+        ]
+
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                    **background_popen_kwargs())
+        except Exception as e:
+            print(f"Error indexing frames of {file_path}: {e}")
+            return None
+
+        with self._lock:
+            self._processes[key] = proc
+        try:
+            stdout, stderr = proc.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            print(f"Timeout indexing frames of {file_path}")
+            return None
+        finally:
+            with self._lock:
+                self._processes.pop(key, None)
+
+        if proc.returncode != 0:
+            # Killed by cancel() or an ffprobe error; nothing is cached
+            print(f"Frame index stopped for {os.path.basename(file_path)} (code {proc.returncode}): {stderr.strip()[-200:]}")
+            return None
+
+        times = []
+        durations = []
+        keyframes = []
+        for line in stdout.splitlines():
+            fields = line.split(",")
+            if len(fields) < 4:
+                continue
+            for value in fields[:2]:
+                try:
+                    times.append(float(value) - probe.start_time)
+                    break
+                except ValueError:
+                    continue
+            else:
+                continue
+            try:
+                durations.append(float(fields[2]))
+            except ValueError:
+                durations.append(0.0)
+            keyframes.append("K" in fields[3])
+
+        table = FrameTable(times, durations, keyframes)
+        debug_print(f"Frame index: {len(table)} frame(s), {len(table.keyframes)} keyframe(s) in {os.path.basename(file_path)}")
+        return table
+
+
+keyframe_indexer = KeyframeIndexer(disk_cache=media_cache)
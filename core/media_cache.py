@@ -0,0 +1,230 @@
+# --------------------------------------------------
+# Persistent per-file analysis cache
+# --------------------------------------------------
+import os
+import json
+import zlib
+import time
+import sqlite3
+import threading
+
+
+def get_cache_directory():
+    base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    cache_dir = os.path.join(base_dir, "namacut")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def file_identity(file_path):
+    """Return (device, inode, size, mtime_ns) for file_path, or None if it cannot be read"""
+    try:
+        st = os.stat(file_path)
+    except (OSError, TypeError, ValueError):
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class MediaCache:
+    """SQLite store of small per-file blobs (probe data, indexes, peaks).
+
+    Entries are keyed by (kind, device, inode); the stored size and mtime
+    must match the file on disk or the entry is dropped on read, so edits
+    invalidate automatically. Least recently used entries are evicted once
+    the entry count or total payload size exceeds its cap.
+    """
+
+    def __init__(self, db_path=None, max_entries=5000, max_bytes=256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._disabled = False
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # Connection management
+    # --------------------------------------------------
+    def _connection(self):
+        if self._conn is not None or self._disabled:
+            return self._conn
+
+        try:
+            db_path = self.db_path or os.path.join(get_cache_directory(), "media_cache.sqlite")
+            conn = sqlite3.connect(db_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    kind TEXT NOT NULL,
+                    dev INTEGER NOT NULL,
+                    ino INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (kind, dev, ino)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_access)")
+            # Entry count and payload size, kept up to date by triggers so a
+            # write never has to scan the table to know if it is over its cap
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    count INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                INSERT OR IGNORE INTO totals
+                SELECT 0, COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM entries
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries BEGIN
+                    UPDATE totals SET count = count + 1, bytes = bytes + LENGTH(NEW.data) WHERE id = 0;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries BEGIN
+                    UPDATE totals SET count = count - 1, bytes = bytes - LENGTH(OLD.data) WHERE id = 0;
+                END
+            """)
+            conn.commit()
+            self._conn = conn
+        except Exception as e:
+            print(f"Media cache disabled: {e}")
+            self._disabled = True
+
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --------------------------------------------------
+    # Blob access
+    # --------------------------------------------------
+    def get(self, file_path, kind):
+        identity = file_identity(file_path)
+        if identity is None:
+            return None
+        dev, ino, size, mtime_ns = identity
+
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT size, mtime_ns, data FROM entries WHERE kind=? AND dev=? AND ino=?",
+                    (kind, dev, ino)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[0] != size or row[1] != mtime_ns:
+                    # File changed since it was cached
+                    conn.execute("DELETE FROM entries WHERE kind=? AND dev=? AND ino=?", (kind, dev, ino))
+                    conn.commit()
+                    return None
+                conn.execute(
+                    "UPDATE entries SET last_access=? WHERE kind=? AND dev=? AND ino=?",
+                    (time.time(), kind, dev, ino)
+                )
+                conn.commit()
+                return bytes(row[2])
+            except sqlite3.Error as e:
+                print(f"Media cache read error: {e}")
+                return None
+
+    def put(self, file_path, kind, data):
+        identity = file_identity(file_path)
+        if identity is None or data is None:
+            return False
+        dev, ino, size, mtime_ns = identity
+
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return False
+            try:
+                # Not INSERT OR REPLACE: its implicit delete does not fire the totals trigger
+                conn.execute("DELETE FROM entries WHERE kind=? AND dev=? AND ino=?", (kind, dev, ino))
+                conn.execute(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kind, dev, ino, size, mtime_ns, time.time(), sqlite3.Binary(data))
+                )
+                self._evict(conn)
+                conn.commit()
+                return True
+            except sqlite3.Error as e:
+                print(f"Media cache write error: {e}")
+                return False
+
+    def get_json(self, file_path, kind):
+        data = self.get(file_path, kind)
+        if data is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(data).decode("utf-8"))
+        except (zlib.error, ValueError) as e:
+            print(f"Media cache entry unreadable: {e}")
+            return None
+
+    def put_json(self, file_path, kind, value):
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        return self.put(file_path, kind, zlib.compress(payload))
+
+    def invalidate(self, file_path, kind=None):
+        identity = file_identity(file_path)
+        if identity is None:
+            return
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                if kind is None:
+                    conn.execute("DELETE FROM entries WHERE dev=? AND ino=?", identity[:2])
+                else:
+                    conn.execute("DELETE FROM entries WHERE kind=? AND dev=? AND ino=?", (kind,) + identity[:2])
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Media cache write error: {e}")
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute("DELETE FROM entries")
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Media cache write error: {e}")
+
+    # --------------------------------------------------
+    # LRU eviction
+    # --------------------------------------------------
+    def _evict(self, conn, batch=64):
+        """Drop least recently used entries until both caps are met, reading a batch of them at a time"""
+        count, total = conn.execute("SELECT count, bytes FROM totals WHERE id = 0").fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            rows = conn.execute(
+                "SELECT rowid, LENGTH(data) FROM entries ORDER BY last_access ASC LIMIT ?", (batch,)
+            ).fetchall()
+            if not rows:
+                return
+            doomed = []
+            for rowid, length in rows:
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                doomed.append((rowid,))
+                count -= 1
+                total -= length
+            conn.executemany("DELETE FROM entries WHERE rowid=?", doomed)
+
+
+media_cache = MediaCache()
@@ -0,0 +1,112 @@
+# --------------------------------------------------
+# Staged file loading off the GUI thread
+# --------------------------------------------------
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from .media_probe import ProbeResult, opencv_duration, probe_media
+
+
+@dataclass
+class LoadedMedia:
+    path: str
+    generation: int
+    size: int = 0
+    probe: Optional[ProbeResult] = None
+    video_info: dict = field(default_factory=dict)
+    duration: float = 0.0
+    duration_estimated: bool = False
+    error: str = ""
+
+
+class MediaLoader:
+    """Runs the blocking steps of opening a file on a worker thread.
+
+    Every load() gets a new generation number. Opening another file
+    cancels loads that have not started yet, and results of older
+    generations are dropped instead of being passed to the callback, so a
+    slow file on network storage can never overwrite a newer one. The
+    frame index, thumbnails and waveform are started by the caller once
+    the metadata stage is in; they have their own background services.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._generation = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def load(self, file_path, callback):
+        """Start loading file_path; callback(media) runs on the worker thread. Returns the generation"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            stale = list(self._pending.values())
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="media-load")
+            future = self._executor.submit(self._load, file_path, generation)
+            self._pending[generation] = future
+
+        # Cancelling runs done callbacks, which take the lock
+        for old in stale:
+            old.cancel()
+        future.add_done_callback(lambda f: self._finish(generation, f, callback))
+        return generation
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation
+
+    def cancel(self):
+        """Drop every load in flight"""
+        with self._lock:
+            self._generation += 1
+            stale = list(self._pending.values())
+        for future in stale:
+            future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _finish(self, generation, future, callback):
+        with self._lock:
+            self._pending.pop(generation, None)
+            current = generation == self._generation
+        if not current or future.cancelled():
+            return
+        if future.exception() is not None:
+            print(f"Error loading media: {future.exception()}")
+            return
+        callback(future.result())
+
+    def _load(self, file_path, generation):
+        media = LoadedMedia(path=file_path, generation=generation)
+        try:
+            media.size = os.path.getsize(file_path)
+        except OSError as e:
+            media.error = str(e)
+            return media
+
+        if not self.is_current(generation):
+            return media
+        media.probe = probe_media(file_path)
+        media.video_info = media.probe.to_video_info() if media.probe else {}
+        media.duration = media.video_info.get('duration', 0)
+
+        if media.duration <= 0 and self.is_current(generation):
+            # Replaced by the frame table's duration once the index is built
+            media.duration_estimated = True
+            media.duration = media.probe.estimated_duration if media.probe else 0.0
+            if media.duration <= 0:
+                media.duration = opencv_duration(file_path)
+        return media
+
+
+media_loader = MediaLoader()
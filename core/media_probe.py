@@ -0,0 +1,289 @@
+# --------------------------------------------------
+# Media probing with a single cached ffprobe call
+# --------------------------------------------------
+import os
+import json
+import subprocess
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from .media_cache import media_cache
+
+VC1_CODECS = ("wmv3", "vc1", "wmva", "wmvp", "wmv1", "wmv2")
+
+
+def _to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _rate_to_float(rate):
+    """Convert an ffprobe rational such as '30000/1001' to a float"""
+    try:
+        num, _, den = str(rate).partition("/")
+        num = float(num)
+        den = float(den) if den else 1.0
+        return num / den if den else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# --------------------------------------------------
+# Probe result types
+# --------------------------------------------------
+@dataclass(frozen=True)
+class StreamInfo:
+    index: int
+    codec_type: str
+    codec_name: str
+    profile: str = ""
+    width: int = 0
+    height: int = 0
+    pix_fmt: str = ""
+    r_frame_rate: str = "0/0"
+    avg_frame_rate: str = "0/0"
+    time_base: str = ""
+    nb_frames: int = 0
+    duration: float = 0.0
+    bit_rate: int = 0
+    sample_rate: int = 0
+    channels: int = 0
+
+    @property
+    def frame_rate(self) -> float:
+        rate = _rate_to_float(self.avg_frame_rate)
+        return rate if rate > 0 else _rate_to_float(self.r_frame_rate)
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            index=_to_int(data.get("index")),
+            codec_type=data.get("codec_type", ""),
+            codec_name=data.get("codec_name", ""),
+            profile=data.get("profile", ""),
+            width=_to_int(data.get("width")),
+            height=_to_int(data.get("height")),
+            pix_fmt=data.get("pix_fmt", ""),
+            r_frame_rate=data.get("r_frame_rate", "0/0"),
+            avg_frame_rate=data.get("avg_frame_rate", "0/0"),
+            time_base=data.get("time_base", ""),
+            nb_frames=_to_int(data.get("nb_frames")),
+            duration=_to_float(data.get("duration")),
+            bit_rate=_to_int(data.get("bit_rate")),
+            sample_rate=_to_int(data.get("sample_rate")),
+            channels=_to_int(data.get("channels")),
+        )
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    path: str
+    streams: Tuple[StreamInfo, ...]
+    format_name: str = ""
+    duration: float = 0.0
+    size: int = 0
+    bit_rate: int = 0
+    start_time: float = 0.0
+
+    @property
+    def video_stream(self) -> Optional[StreamInfo]:
+        for stream in self.streams:
+            if stream.codec_type == "video":
+                return stream
+        return None
+
+    @property
+    def audio_stream(self) -> Optional[StreamInfo]:
+        for stream in self.streams:
+            if stream.codec_type == "audio":
+                return stream
+        return None
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_stream is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_stream is not None
+
+    @property
+    def video_codec(self) -> str:
+        stream = self.video_stream
+        return stream.codec_name if stream else ""
+
+    @property
+    def is_vc1(self) -> bool:
+        return self.video_codec.lower() in VC1_CODECS
+
+    @property
+    def estimated_duration(self) -> float:
+        """Container duration, else the longest stream, else frame count over frame rate"""
+        if self.duration > 0:
+            return self.duration
+        longest = max((stream.duration for stream in self.streams), default=0.0)
+        if longest > 0:
+            return longest
+        stream = self.video_stream
+        if stream and stream.nb_frames > 0 and stream.frame_rate > 0:
+            return stream.nb_frames / stream.frame_rate
+        return 0.0
+
+    def to_video_info(self):
+        """Return the legacy get_video_info() dictionary"""
+        video_info = {}
+        stream = self.video_stream
+        if stream:
+            video_info.update({
+                'codec': stream.codec_name or 'unknown',
+                'width': stream.width,
+                'height': stream.height,
+                'frame_rate': stream.r_frame_rate
+            })
+        video_info.update({
+            'duration': self.duration,
+            'size': self.size
+        })
+        return video_info
+
+    @classmethod
+    def from_json(cls, path, data):
+        format_info = data.get("format", {})
+        streams = tuple(StreamInfo.from_json(s) for s in data.get("streams", []))
+        return cls(
+            path=path,
+            streams=streams,
+            format_name=format_info.get("format_name", ""),
+            duration=_to_float(format_info.get("duration")),
+            size=_to_int(format_info.get("size")),
+            bit_rate=_to_int(format_info.get("bit_rate")),
+            start_time=_to_float(format_info.get("start_time")),
+        )
+
+
+# --------------------------------------------------
+# Probe service
+# --------------------------------------------------
+class MediaProbe:
+    CACHE_KIND = "probe"
+
+    def __init__(self, ffprobe_path="ffprobe", timeout=10, max_entries=64, disk_cache=None):
+        self.ffprobe_path = ffprobe_path
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, file_path):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+    def probe(self, file_path) -> Optional[ProbeResult]:
+        """Return the parsed ffprobe result for file_path, probing at most once per file version"""
+        if not file_path:
+            return None
+
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        result = self._load_from_disk(file_path)
+        if result is None:
+            result, cacheable = self._run_ffprobe(file_path)
+            if not cacheable:
+                return result
+
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def invalidate(self, file_path=None):
+        """Drop cached results for one file, or for every file when no path is given"""
+        with self._lock:
+            if file_path is None:
+                self._cache.clear()
+                return
+            abs_path = os.path.abspath(file_path)
+            for key in [k for k in self._cache if k[0] == abs_path]:
+                del self._cache[key]
+
+    def _load_from_disk(self, file_path):
+        if self.disk_cache is None:
+            return None
+        data = self.disk_cache.get_json(file_path, self.CACHE_KIND)
+        return ProbeResult.from_json(file_path, data) if data is not None else None
+
+    def _run_ffprobe(self, file_path):
+        cmd = [
+            self.ffprobe_path, "-v", "error",
+            "-show_streams", "-show_format",
+            "-of", "json", file_path
+        ]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=self.timeout)
+            data = json.loads(result.stdout or "{}")
+            if self.disk_cache is not None:
+                self.disk_cache.put_json(file_path, self.CACHE_KIND, data)
+            return ProbeResult.from_json(file_path, data), True
+        except subprocess.TimeoutExpired:
+            # Slow storage may answer next time, so a timeout is not cached
+            print(f"Timeout probing file: {file_path}")
+            return None, False
+        except Exception as e:
+            print(f"Error probing file {file_path}: {e}")
+            return None, True
+
+
+media_probe = MediaProbe(disk_cache=media_cache)
+
+
+def probe_media(file_path) -> Optional[ProbeResult]:
+    return media_probe.probe(file_path)
+
+
+# --------------------------------------------------
+# Optional OpenCV backend
+# --------------------------------------------------
+def opencv_duration(file_path) -> float:
+    """Frame count over FPS as reported by OpenCV; 0.0 when OpenCV is not installed.
+
+    Only used for files ffprobe cannot time at all. cv2 is imported here
+    rather than at module level because it is a large import and optional.
+    """
+    try:
+        import cv2
+    except ImportError:
+        return 0.0
+    cap = cv2.VideoCapture(file_path)
+    try:
+        if not cap.isOpened():
+            return 0.0
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return frame_count / fps if fps > 0 else 0.0
+    finally:
+        cap.release()
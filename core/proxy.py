@@ -0,0 +1,230 @@
+# --------------------------------------------------
+# Low-resolution preview proxies for smooth scrubbing
+# --------------------------------------------------
+import os
+import hashlib
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from .media_cache import get_cache_directory
+from .media_probe import probe_media
+from .utils import background_popen_kwargs
+
+PROXY_HEIGHT = 360
+PROXY_GOP = 6
+PROXY_DISK_BUDGET = 4 * 1024 * 1024 * 1024
+
+# Sources decoded by QtMultimedia at full cost: heavy codecs, or anything above this height
+HEAVY_CODECS = ("hevc", "av1", "vp9", "prores")
+PROXY_MIN_HEIGHT = 1440
+
+# Bytes hashed from each end of the file for the content key
+CONTENT_SAMPLE = 1024 * 1024
+
+
+def content_key(file_path):
+    """Hash of the file size and its first and last megabyte; survives renames and copies"""
+    try:
+        size = os.path.getsize(file_path)
+        digest = hashlib.sha1(str(size).encode("ascii"))
+        with open(file_path, "rb") as f:
+            digest.update(f.read(CONTENT_SAMPLE))
+            if size > CONTENT_SAMPLE:
+                f.seek(max(CONTENT_SAMPLE, size - CONTENT_SAMPLE))
+                digest.update(f.read(CONTENT_SAMPLE))
+        return digest.hexdigest()
+    except OSError as e:
+        print(f"Cannot read {file_path} for proxy key: {e}")
+        return None
+
+
+@dataclass(frozen=True)
+class ProxyInfo:
+    source_path: str
+    proxy_path: str
+    source_duration: float
+    proxy_duration: float
+
+    def to_source(self, milliseconds):
+        """Map a player position on the proxy to the same instant in the source"""
+        if self.source_duration <= 0:
+            return max(0.0, milliseconds)
+        return max(0.0, min(milliseconds, self.source_duration * 1000))
+
+    def to_proxy(self, milliseconds):
+        if self.proxy_duration <= 0:
+            return max(0.0, milliseconds)
+        return max(0.0, min(milliseconds, self.proxy_duration * 1000))
+
+
+class ProxyManager:
+    """Transcodes low-resolution, short-GOP proxies in the background.
+
+    The proxy keeps the source timeline, so player positions carry over
+    unchanged; ProxyInfo clamps them to the source when exporting.
+    Proxies are stored by content key and the least recently used ones
+    are deleted once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, ffmpeg_path="ffmpeg", cache_dir=None, max_bytes=PROXY_DISK_BUDGET):
+        self.ffmpeg_path = ffmpeg_path
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._pending = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _directory(self):
+        directory = self.cache_dir or os.path.join(get_cache_directory(), "proxies")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def needs_proxy(self, probe):
+        stream = probe.video_stream if probe else None
+        if stream is None:
+            return False
+        if probe.is_vc1 or stream.height >= PROXY_MIN_HEIGHT:
+            return True
+        return stream.codec_name in HEAVY_CODECS and stream.height > 1080
+
+    def cached(self, file_path) -> Optional[ProxyInfo]:
+        """Return the finished proxy for file_path, if there is one"""
+        key = content_key(file_path)
+        if key is None:
+            return None
+        proxy_path = os.path.join(self._directory(), f"{key}.mp4")
+        if not os.path.exists(proxy_path):
+            return None
+        # The modification time doubles as the last-used time for eviction
+        os.utime(proxy_path)
+        return self._info(file_path, proxy_path)
+
+    def request(self, file_path, callback=None):
+        """Create the proxy in the background; callback(file_path, info) runs on the worker thread"""
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            future = self._pending.get(abs_path)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="proxy")
+                future = self._executor.submit(self.create, file_path)
+                self._pending[abs_path] = future
+                future.add_done_callback(lambda f: self._forget_pending(abs_path))
+
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(file_path, None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    def create(self, file_path) -> Optional[ProxyInfo]:
+        """Return the proxy for file_path, transcoding it if needed (blocking)"""
+        info = self.cached(file_path)
+        if info is not None:
+            return info
+
+        key = content_key(file_path)
+        if key is None:
+            return None
+        proxy_path = os.path.join(self._directory(), f"{key}.mp4")
+        temp_path = os.path.join(self._directory(), f"{key}.part.mp4")
+
+        cmd = [
+            self.ffmpeg_path, "-y", "-v", "error",
+            "-i", file_path,
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-vf", f"scale=-2:{PROXY_HEIGHT}",
+            "-c:v", "libx264", "-preset", "ultrafast", "-tune", "fastdecode",
+            "-crf", "28", "-g", str(PROXY_GOP), "-bf", "0", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "96k",
+            "-movflags", "+faststart",
+            temp_path
+        ]
+
+        abs_path = os.path.abspath(file_path)
+        print(f"Creating preview proxy for {os.path.basename(file_path)}")
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, **background_popen_kwargs())
+        except Exception as e:
+            print(f"Error starting proxy transcode: {e}")
+            return None
+
+        with self._lock:
+            self._processes[abs_path] = proc
+        try:
+            _, stderr = proc.communicate()
+        finally:
+            with self._lock:
+                self._processes.pop(abs_path, None)
+
+        if proc.returncode != 0:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"Proxy transcode stopped (code {proc.returncode}): {stderr.decode(errors='ignore').strip()[-200:]}")
+            return None
+
+        os.replace(temp_path, proxy_path)
+        self._evict(keep=proxy_path)
+        return self._info(file_path, proxy_path)
+
+    def cancel(self, keep_path=None):
+        """Stop pending and running transcodes, except the one for keep_path"""
+        keep = os.path.abspath(keep_path) if keep_path else None
+        with self._lock:
+            futures = [future for path, future in self._pending.items() if path != keep]
+            processes = [proc for path, proc in self._processes.items() if path != keep]
+        for future in futures:
+            future.cancel()
+        for proc in processes:
+            proc.kill()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _forget_pending(self, abs_path):
+        with self._lock:
+            self._pending.pop(abs_path, None)
+
+    def _info(self, file_path, proxy_path):
+        source = probe_media(file_path)
+        proxy = probe_media(proxy_path)
+        return ProxyInfo(
+            source_path=file_path,
+            proxy_path=proxy_path,
+            source_duration=source.duration if source else 0.0,
+            proxy_duration=proxy.duration if proxy else 0.0,
+        )
+
+    def _evict(self, keep=None):
+        directory = self._directory()
+        entries = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".part.mp4") or not name.endswith(".mp4"):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                print(f"Evicted preview proxy: {os.path.basename(path)}")
+            except OSError as e:
+                print(f"Error removing proxy {path}: {e}")
+
+
+proxy_manager = ProxyManager()
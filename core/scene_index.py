@@ -0,0 +1,272 @@
+# --------------------------------------------------
+# Per-file scene-change index
+# --------------------------------------------------
+import os
+import re
+import zlib
+import bisect
+import subprocess
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .media_cache import media_cache
+from .media_probe import probe_media
+from .utils import background_popen_kwargs, debug_print
+
+# Frames scoring at least SCAN_THRESHOLD are stored, so the cut threshold can
+# change without a rescan; SCENE_THRESHOLD is what counts as a cut by default
+SCAN_THRESHOLD = 0.15
+SCENE_THRESHOLD = 0.3
+
+# Frames are scored at this width; the decode dominates, not the comparison
+SCAN_WIDTH = 160
+
+_FRAME_RE = re.compile(r"pts_time:\s*(-?[\d.]+)")
+_SCORE_RE = re.compile(r"lavfi\.scene_score=([\d.]+)")
+
+
+class SceneIndex:
+    """Scene change times (seconds from the start of the file) with their scene scores.
+
+    Lookups take a threshold, so one scan serves any sensitivity at or
+    above SCAN_THRESHOLD.
+    """
+
+    def __init__(self, times=(), scores=()):
+        pairs = sorted(zip(times, scores))
+        self.times = array("d", (t for t, _ in pairs))
+        self.scores = array("d", (s for _, s in pairs))
+
+    def __len__(self):
+        return len(self.times)
+
+    def cuts(self, threshold=SCENE_THRESHOLD):
+        return [t for t, score in zip(self.times, self.scores) if score >= threshold]
+
+    def after(self, t, threshold=SCENE_THRESHOLD, tolerance=0.001) -> Optional[float]:
+        """First cut strictly after t"""
+        cuts = self.cuts(threshold)
+        i = bisect.bisect_right(cuts, t + tolerance)
+        return cuts[i] if i < len(cuts) else None
+
+    def before(self, t, threshold=SCENE_THRESHOLD, tolerance=0.001) -> Optional[float]:
+        """Last cut strictly before t"""
+        cuts = self.cuts(threshold)
+        i = bisect.bisect_left(cuts, t - tolerance)
+        return cuts[i - 1] if i else None
+
+    def nearest(self, t, threshold=SCENE_THRESHOLD) -> Optional[float]:
+        cuts = self.cuts(threshold)
+        i = bisect.bisect_left(cuts, t)
+        candidates = cuts[max(0, i - 1):i + 1]
+        return min(candidates, key=lambda cut: abs(cut - t)) if candidates else None
+
+    def between(self, start, end, threshold=SCENE_THRESHOLD):
+        """Cuts with start <= time <= end"""
+        return [t for t in self.cuts(threshold) if start <= t <= end]
+
+    def to_bytes(self):
+        return zlib.compress(self.times.tobytes() + self.scores.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        values = array("d")
+        values.frombytes(zlib.decompress(data))
+        half = len(values) // 2
+        return cls(values[:half], values[half:])
+
+
+def parse_scene_log(text):
+    """Times and scores from the metadata=print log of a scene scan"""
+    times = []
+    scores = []
+    pending = None
+    for line in text.splitlines():
+        frame = _FRAME_RE.search(line)
+        if frame:
+            pending = float(frame.group(1))
+            continue
+        score = _SCORE_RE.search(line)
+        if score and pending is not None:
+            times.append(pending)
+            scores.append(float(score.group(1)))
+            pending = None
+    return times, scores
+
+
+# --------------------------------------------------
+# Detection service
+# --------------------------------------------------
+class SceneDetector:
+    """Finds scene changes with FFmpeg's scene score on a background thread.
+
+    The first video stream is decoded at low priority, shrunk to
+    SCAN_WIDTH and compared frame by frame; every frame is scored, so
+    cut times are exact frame starts. Results are kept in memory and in
+    the media cache, and cached() never starts a scan, which makes it
+    safe to call from export planning and the UI.
+    """
+    CACHE_KIND = "scenes"
+
+    def __init__(self, ffmpeg_path="ffmpeg", timeout=3600, max_entries=16, disk_cache=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _cache_key(self, file_path):
+        try:
+            st = os.stat(file_path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+    def cached(self, file_path) -> Optional[SceneIndex]:
+        """Return the scene index if it was already built, without scanning the file"""
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        index = self._load_from_disk(file_path)
+        if index is not None:
+            self._remember(key, index)
+        return index
+
+    def index(self, file_path) -> Optional[SceneIndex]:
+        """Return the scene index for file_path, scanning the file if needed (blocking)"""
+        index = self.cached(file_path)
+        if index is not None:
+            return index
+
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+        index = self._scan(key, file_path)
+        if index is not None:
+            self._remember(key, index)
+            if self.disk_cache is not None:
+                self.disk_cache.put(file_path, self.CACHE_KIND, index.to_bytes())
+        return index
+
+    def request(self, file_path, callback=None):
+        """Scan in the background; callback(file_path, index) runs on the worker thread"""
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scene-index")
+                future = self._executor.submit(self.index, file_path)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget_pending(key))
+
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(file_path, None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    def cancel(self, keep_path=None):
+        """Stop pending and running scans, except those of keep_path"""
+        keep = os.path.abspath(keep_path) if keep_path else None
+        with self._lock:
+            futures = [future for key, future in self._pending.items() if key[0] != keep]
+            processes = [proc for key, proc in self._processes.items() if key[0] != keep]
+        for future in futures:
+            future.cancel()
+        for proc in processes:
+            proc.kill()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _remember(self, key, index):
+        with self._lock:
+            self._cache[key] = index
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _forget_pending(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _load_from_disk(self, file_path):
+        if self.disk_cache is None:
+            return None
+        data = self.disk_cache.get(file_path, self.CACHE_KIND)
+        if data is None:
+            return None
+        try:
+            return SceneIndex.from_bytes(data)
+        except Exception as e:
+            print(f"Scene index cache entry unreadable: {e}")
+            return None
+
+    def _scan(self, key, file_path):
+        probe = probe_media(file_path)
+        if not probe or not probe.has_video:
+            return None
+
+        # Deblocking is skipped; it changes nothing a scene score can see
+        cmd = [
+            self.ffmpeg_path, "-hide_banner", "-nostats", "-v", "info",
+            "-skip_loop_filter", "all",
+            "-i", file_path,
+            "-map", "0:v:0", "-an", "-sn", "-dn",
+            "-vf", (f"scale={SCAN_WIDTH}:-2:flags=fast_bilinear,"
+                    f"select='gte(scene,{SCAN_THRESHOLD})',metadata=print:key=lavfi.scene_score"),
+            "-f", "null", "-"
+        ]
+
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, text=True, errors="replace",
+                                    **background_popen_kwargs())
+        except Exception as e:
+            print(f"Error scanning scenes of {file_path}: {e}")
+            return None
+
+        with self._lock:
+            self._processes[key] = proc
+        try:
+            _, stderr = proc.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            print(f"Timeout scanning scenes of {file_path}")
+            return None
+        finally:
+            with self._lock:
+                self._processes.pop(key, None)
+
+        if proc.returncode != 0:
+            # Killed by cancel() or an FFmpeg error; nothing is cached
+            print(f"Scene scan stopped for {os.path.basename(file_path)} (code {proc.returncode}): {stderr.strip()[-200:]}")
+            return None
+
+        # FFmpeg already shifts timestamps to start at zero
+        index = SceneIndex(*parse_scene_log(stderr))
+        debug_print(f"Scene index: {len(index.cuts())} cut(s) in {os.path.basename(file_path)}")
+        return index
+
+
+scene_detector = SceneDetector(disk_cache=media_cache)
@@ -0,0 +1,79 @@
+# --------------------------------------------------
+# In/out segment lists for multi-range exports
+# --------------------------------------------------
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass(frozen=True)
+class Segment:
+    start: float
+    end: float
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+def in_source_order(segments):
+    """True if segments follow each other in the source without overlapping"""
+    return all(a.end <= b.start for a, b in zip(segments, segments[1:]))
+
+
+class SegmentList:
+    """Segments in output order, in seconds of the source; they may be reordered freely"""
+
+    def __init__(self, segments=()):
+        self._segments: List[Segment] = []
+        for start, end in segments:
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def __iter__(self):
+        return iter(self._segments)
+
+    def __getitem__(self, index):
+        return self._segments[index]
+
+    @property
+    def total_duration(self):
+        return sum(segment.duration for segment in self._segments)
+
+    @property
+    def start(self):
+        return min(segment.start for segment in self._segments) if self._segments else 0.0
+
+    @property
+    def end(self):
+        return max(segment.end for segment in self._segments) if self._segments else 0.0
+
+    def add(self, start, end):
+        """Append a segment and return its index"""
+        if end <= start:
+            raise ValueError(f"segment end ({end}) must be after its start ({start})")
+        self._segments.append(Segment(float(start), float(end)))
+        return len(self._segments) - 1
+
+    def remove(self, index):
+        return self._segments.pop(index)
+
+    def move(self, index, new_index):
+        """Move a segment to new_index, clamped to the list; returns where it ended up"""
+        new_index = max(0, min(new_index, len(self._segments) - 1))
+        self._segments.insert(new_index, self._segments.pop(index))
+        return new_index
+
+    def clear(self):
+        self._segments.clear()
+
+    def in_source_order(self):
+        return in_source_order(self._segments)
+
+    def to_list(self):
+        return [[segment.start, segment.end] for segment in self._segments]
+
+    @classmethod
+    def from_list(cls, data):
+        return cls((start, end) for start, end in data)
@@ -22,6 +22,18 @@ class SettingsManager:
             "video_audio_quality": "192",  
             "audio_output_format": "none",
             "audio_quality": "192",   
+            "cut_mode": "keyframe",
+            "parallel_export": True,
+            "resumable_export": False,
+            "companion_audio_format": "none",
+            "parallel_workers": 0,
+            "queue_max_concurrent": 1,
+            "use_proxies": True,
+            "detect_scenes": True,
+            "silence_mode": "remove",
+            "silence_noise_db": -40,
+            "silence_min_duration": 1.0,
+            "silence_padding": 0.2,
             "action": 0
         }
         
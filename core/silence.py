@@ -0,0 +1,246 @@
+# --------------------------------------------------
+# Silence detection for auto-trim and auto-split
+# --------------------------------------------------
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .media_cache import media_cache
+from .media_probe import probe_media
+from .segments import SegmentList
+from .utils import background_popen_kwargs
+
+# One scan records silences at every level of this ladder (dBFS), so the
+# noise threshold can be changed afterwards without scanning again
+NOISE_LEVELS = tuple(range(-70, -15, 5))
+SCAN_MIN_SILENCE = 0.1
+
+DEFAULT_NOISE_DB = -40
+DEFAULT_MIN_SILENCE = 1.0
+DEFAULT_PADDING = 0.2
+MIN_PART = 0.3
+
+_PRINT_RE = re.compile(r"\[Parsed_ametadata_(\d+) @ [^\]]*\] lavfi\.silence_(start|end)=(-?[\d.]+)")
+_EOF_RE = re.compile(r"\[silencedetect @ [^\]]*\] silence_end: (-?[\d.]+)")
+
+
+def nearest_level(noise_db):
+    return min(NOISE_LEVELS, key=lambda level: abs(level - noise_db))
+
+
+@dataclass
+class SilenceMap:
+    """Silent intervals of a file's first audio stream at each level of NOISE_LEVELS.
+
+    Intervals are [start, end] in seconds, at least SCAN_MIN_SILENCE long.
+    A longer minimum only drops intervals, so every threshold and minimum
+    duration is answered from this map.
+    """
+    duration: float
+    levels: Dict[int, List[list]] = field(default_factory=dict)
+
+    def silences(self, noise_db=DEFAULT_NOISE_DB, min_silence=DEFAULT_MIN_SILENCE):
+        intervals = self.levels.get(nearest_level(noise_db), [])
+        return [(start, end) for start, end in intervals if end - start >= min_silence]
+
+    def parts(self, noise_db=DEFAULT_NOISE_DB, min_silence=DEFAULT_MIN_SILENCE, padding=DEFAULT_PADDING):
+        """The non-silent stretches between silences, each widened by padding into the silence around it.
+
+        Leading and trailing silence only bounds the first and last part:
+
+        >>> SilenceMap(20.0, {-40: [[0.0, 5.0], [10.0, 12.0], [18.5, 20.0]]}).parts(-40, 1.0, 0.5)
+        [(4.5, 10.5), (11.5, 19.0)]
+        """
+        # Half of the shortest silence is left between two padded parts
+        padding = max(0.0, min(padding, min_silence / 2))
+        parts = []
+        # End of the previous silence; silence at either end of the file leaves no part there
+        position = 0.0
+        for start, end in self.silences(noise_db, min_silence) + [(self.duration, self.duration)]:
+            if start > position:
+                part_start = max(0.0, position - padding) if position > 0 else 0.0
+                part_end = min(self.duration, start + padding) if start < self.duration else self.duration
+                if part_end - part_start >= MIN_PART:
+                    parts.append((part_start, part_end))
+            position = end
+        return parts
+
+    def trimmed(self, noise_db=DEFAULT_NOISE_DB, min_silence=DEFAULT_MIN_SILENCE, padding=DEFAULT_PADDING):
+        """Start and end with only the leading and trailing silence removed, or None if all is silent"""
+        parts = self.parts(noise_db, min_silence, padding)
+        return (parts[0][0], parts[-1][1]) if parts else None
+
+    def segment_list(self, noise_db=DEFAULT_NOISE_DB, min_silence=DEFAULT_MIN_SILENCE, padding=DEFAULT_PADDING):
+        return SegmentList(self.parts(noise_db, min_silence, padding))
+
+    def to_json(self):
+        return {"duration": self.duration, "levels": {str(level): intervals for level, intervals in self.levels.items()}}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["duration"], {int(level): intervals for level, intervals in data["levels"].items()})
+
+
+def silence_filter(levels=NOISE_LEVELS, min_silence=SCAN_MIN_SILENCE):
+    """One silencedetect per level, each followed by a metadata printer that names it in the log.
+
+    silencedetect itself logs without its instance name, so the printers
+    (Parsed_ametadata_<3i+1>) tell the levels apart; each printed frame's
+    metadata is then deleted so the next level starts clean.
+    """
+    return ",".join(f"silencedetect=n={level}dB:d={min_silence},ametadata=mode=print,ametadata=mode=delete"
+                    for level in levels)
+
+
+def parse_silence_log(text, duration, levels=NOISE_LEVELS):
+    """Build a SilenceMap from the log of a scan run with silence_filter(levels)"""
+    by_filter = {3 * i + 1: level for i, level in enumerate(levels)}
+    intervals = {level: [] for level in levels}
+    open_starts = {}
+    for line in text.splitlines():
+        match = _PRINT_RE.search(line)
+        if match:
+            level = by_filter.get(int(match.group(1)))
+            if level is None:
+                continue
+            value = float(match.group(3))
+            if match.group(2) == "start":
+                open_starts[level] = max(0.0, value)
+            elif level in open_starts:
+                intervals[level].append([open_starts.pop(level), value])
+            continue
+        # A silence still running at the end is closed in the log only, never on a frame
+        eof = _EOF_RE.search(line)
+        if eof:
+            duration = max(duration, float(eof.group(1)))
+    for level, start in open_starts.items():
+        if duration > start:
+            intervals[level].append([start, duration])
+    return SilenceMap(duration, intervals)
+
+
+# --------------------------------------------------
+# Analysis service
+# --------------------------------------------------
+class SilenceAnalyzer:
+    """Scans a file's audio for silences on a background thread.
+
+    Only the first audio stream is decoded (-vn), at low priority. The
+    SilenceMap is stored in the media cache, so changing thresholds or
+    reopening the file never scans again.
+    """
+    CACHE_KIND = "silence"
+
+    def __init__(self, ffmpeg_path="ffmpeg", timeout=3600, disk_cache=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.timeout = timeout
+        self.disk_cache = disk_cache
+        self._pending = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def cached(self, file_path) -> Optional[SilenceMap]:
+        if self.disk_cache is None:
+            return None
+        data = self.disk_cache.get_json(file_path, self.CACHE_KIND)
+        try:
+            return SilenceMap.from_json(data) if data else None
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Silence cache entry unreadable: {e}")
+            return None
+
+    def analyze(self, file_path) -> Optional[SilenceMap]:
+        """Return the silence map for file_path, scanning it if needed (blocking)"""
+        silence_map = self.cached(file_path)
+        if silence_map is not None:
+            return silence_map
+
+        probe = probe_media(file_path)
+        if not probe or not probe.has_audio:
+            return None
+
+        cmd = [
+            self.ffmpeg_path, "-hide_banner", "-nostats", "-v", "info",
+            "-vn", "-sn", "-dn",
+            "-i", file_path,
+            "-map", "0:a:0",
+            "-af", silence_filter(),
+            "-f", "null", "-"
+        ]
+
+        abs_path = os.path.abspath(file_path)
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, text=True, errors="replace",
+                                    **background_popen_kwargs())
+        except Exception as e:
+            print(f"Error scanning silence of {file_path}: {e}")
+            return None
+
+        with self._lock:
+            self._processes[abs_path] = proc
+        try:
+            _, stderr = proc.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            print(f"Timeout scanning silence of {file_path}")
+            return None
+        finally:
+            with self._lock:
+                self._processes.pop(abs_path, None)
+
+        if proc.returncode != 0:
+            print(f"Silence scan stopped for {os.path.basename(file_path)} (code {proc.returncode}): {stderr.strip()[-200:]}")
+            return None
+
+        silence_map = parse_silence_log(stderr, probe.estimated_duration)
+        if self.disk_cache is not None:
+            self.disk_cache.put_json(file_path, self.CACHE_KIND, silence_map.to_json())
+        return silence_map
+
+    def request(self, file_path, callback=None):
+        """Analyze in the background; callback(file_path, silence_map) runs on the worker thread"""
+        abs_path = os.path.abspath(file_path)
+        with self._lock:
+            future = self._pending.get(abs_path)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="silence")
+                future = self._executor.submit(self.analyze, file_path)
+                self._pending[abs_path] = future
+                future.add_done_callback(lambda f: self._forget_pending(abs_path))
+
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(file_path, None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    def cancel(self, keep_path=None):
+        """Stop pending and running scans, except the one for keep_path"""
+        keep = os.path.abspath(keep_path) if keep_path else None
+        with self._lock:
+            futures = [future for path, future in self._pending.items() if path != keep]
+            processes = [proc for path, proc in self._processes.items() if path != keep]
+        for future in futures:
+            future.cancel()
+        for proc in processes:
+            proc.kill()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _forget_pending(self, abs_path):
+        with self._lock:
+            self._pending.pop(abs_path, None)
+
+
+silence_analyzer = SilenceAnalyzer(disk_cache=media_cache)
@@ -0,0 +1,240 @@
+# --------------------------------------------------
+# Output size and encode time estimates from sample encodes
+# --------------------------------------------------
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from .ffmpeg_commands import FFmpegCommandBuilder
+from .ffmpeg_progress import FFmpegProgressParser, with_progress_pipe
+from .media_cache import media_cache
+from .utils import background_popen_kwargs
+
+# Evenly spaced samples encoded per estimate; short ranges are encoded whole
+SAMPLE_COUNT = 3
+SAMPLE_SECONDS = 2.0
+
+# Settings that change the encoded size or speed
+ESTIMATE_KEYS = ("format_index", "video_codec", "crf_value", "resolution", "video_audio_format", "video_audio_bitrate")
+SAMPLE_EXTENSIONS = {1: ".mp4", 2: ".mkv", 3: ".webm"}
+
+
+@dataclass(frozen=True)
+class SizeEstimate:
+    output_bytes: int
+    encode_seconds: float
+    duration: float
+    sampled: float
+    samples: int
+
+    @property
+    def bitrate_kbps(self):
+        return self.output_bytes * 8 / 1000 / self.duration if self.duration > 0 else 0.0
+
+    def to_json(self):
+        return {
+            "output_bytes": self.output_bytes,
+            "encode_seconds": self.encode_seconds,
+            "duration": self.duration,
+            "sampled": self.sampled,
+            "samples": self.samples,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(**{name: data[name] for name in ("output_bytes", "encode_seconds", "duration", "sampled", "samples")})
+
+
+def sample_ranges(start_time, end_time, count=SAMPLE_COUNT, length=SAMPLE_SECONDS):
+    """(start, duration) of count samples centred in equal parts of the range"""
+    duration = end_time - start_time
+    if duration <= count * length:
+        return [(start_time, duration)]
+    part = duration / count
+    return [(start_time + (i + 0.5) * part - length / 2, length) for i in range(count)]
+
+
+def estimate_key(settings, start_time, end_time, video_filters=None):
+    values = {key: settings.get(key) for key in ESTIMATE_KEYS}
+    values.update(filters=video_filters or "", range=[round(start_time, 3), round(end_time, 3)],
+                  samples=[SAMPLE_COUNT, SAMPLE_SECONDS])
+    return hashlib.sha1(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class SizeEstimator(FFmpegCommandBuilder):
+    """Estimates output size and encode time by encoding short samples of the source.
+
+    The samples use the same command builder as the export, so codec,
+    CRF, scaling and crop all count. Size and time are extrapolated from
+    the samples to the whole range. Only the newest request is kept: a
+    new one kills the sample encode in progress. Results are cached per
+    file and settings.
+    """
+    CACHE_KIND = "size-estimate"
+
+    def __init__(self, disk_cache=None):
+        self.disk_cache = disk_cache
+        self._generation = 0
+        self._pending = None
+        self._process = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def cached(self, input_path, settings, start_time, end_time, video_filters=None) -> Optional[SizeEstimate]:
+        if self.disk_cache is None:
+            return None
+        kind = f"{self.CACHE_KIND}:{estimate_key(settings, start_time, end_time, video_filters)}"
+        data = self.disk_cache.get_json(input_path, kind)
+        return SizeEstimate.from_json(data) if data else None
+
+    def request(self, input_path, settings, start_time, end_time, video_filters=None, callback=None):
+        """Estimate in the background; callback(generation, estimate) runs on the worker thread.
+
+        Returns the generation. Superseded requests never reach the callback.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            stale, process = self._pending, self._process
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="size-estimate")
+            future = self._executor.submit(self.estimate, input_path, dict(settings), start_time, end_time,
+                                           video_filters, generation)
+            self._pending = future
+
+        if stale is not None:
+            stale.cancel()
+        if process is not None:
+            process.kill()
+        if callback is not None:
+            future.add_done_callback(lambda f: self._finish(generation, f, callback))
+        return generation
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation
+
+    def estimate(self, input_path, settings, start_time, end_time, video_filters=None, generation=None):
+        """Encode the samples and return the extrapolated estimate (blocking); None if cancelled or failed"""
+        estimate = self.cached(input_path, settings, start_time, end_time, video_filters)
+        if estimate is not None:
+            return estimate
+
+        ext = SAMPLE_EXTENSIONS.get(settings.get("format_index", 0))
+        if ext is None:
+            return None
+        vc1 = self.is_vc1_video(input_path)
+        temp_dir = tempfile.mkdtemp(prefix="namacut-estimate-")
+        sampled = encode_seconds = 0.0
+        output_bytes = 0
+        ranges = sample_ranges(start_time, end_time)
+        try:
+            for index, (sample_start, sample_duration) in enumerate(ranges):
+                if generation is not None and not self.is_current(generation):
+                    return None
+                sample_path = os.path.join(temp_dir, f"sample{index}{ext}")
+                if vc1:
+                    cmd = self.build_vc1_conversion_command(input_path, sample_path, settings, sample_start,
+                                                            sample_duration, video_filters)
+                else:
+                    cmd = self.build_video_command(input_path, sample_path, settings, sample_start,
+                                                   sample_duration, video_filters)
+                elapsed = self._run_sample(cmd, sample_duration, generation)
+                if elapsed is None or not os.path.exists(sample_path):
+                    return None
+                encode_seconds += elapsed
+                output_bytes += os.path.getsize(sample_path)
+                sampled += sample_duration
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        if sampled <= 0:
+            return None
+        scale = (end_time - start_time) / sampled
+        estimate = SizeEstimate(
+            output_bytes=int(output_bytes * scale),
+            encode_seconds=round(encode_seconds * scale, 3),
+            duration=end_time - start_time,
+            sampled=sampled,
+            samples=len(ranges),
+        )
+        if self.disk_cache is not None:
+            kind = f"{self.CACHE_KIND}:{estimate_key(settings, start_time, end_time, video_filters)}"
+            self.disk_cache.put_json(input_path, kind, estimate.to_json())
+        return estimate
+
+    def cancel(self):
+        """Drop the current request and stop its sample encode"""
+        with self._lock:
+            self._generation += 1
+            pending, process = self._pending, self._process
+        if pending is not None:
+            pending.cancel()
+        if process is not None:
+            process.kill()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _run_sample(self, cmd, duration, generation=None):
+        """Run one sample encode and return its encode time, or None if it failed or was killed.
+
+        The time comes from FFmpeg's final speed, which leaves out process
+        start-up and probing; those would dominate a two-second sample.
+        """
+        cmd = with_progress_pipe([cmd[0], "-hide_banner", "-loglevel", "error"] + cmd[1:])
+        started = time.perf_counter()
+        # Started under the lock, so a newer request either comes first and
+        # this sample is skipped, or finds the process and kills it
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return None
+            try:
+                process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                           stderr=subprocess.PIPE, **background_popen_kwargs())
+            except OSError as e:
+                print(f"Error starting sample encode: {e}")
+                return None
+            self._process = process
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            with self._lock:
+                if self._process is process:
+                    self._process = None
+        elapsed = time.perf_counter() - started
+
+        if process.returncode != 0:
+            if process.returncode > 0:
+                print(f"Sample encode failed: {stderr.decode(errors='ignore').strip()[-200:]}")
+            return None
+        parser = FFmpegProgressParser()
+        parser.feed(stdout)
+        speed = parser.last_event.speed if parser.last_event else 0.0
+        return duration / speed if speed > 0 else elapsed
+
+    def _finish(self, generation, future, callback):
+        with self._lock:
+            if self._pending is future:
+                self._pending = None
+            current = generation == self._generation
+        if not current or future.cancelled():
+            return
+        if future.exception() is not None:
+            print(f"Error estimating output size: {future.exception()}")
+            return
+        callback(generation, future.result())
+
+
+size_estimator = SizeEstimator(disk_cache=media_cache)
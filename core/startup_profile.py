@@ -0,0 +1,87 @@
+# --------------------------------------------------
+# Startup timeline recorder (Chrome trace output)
+# --------------------------------------------------
+import os
+import json
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records named startup phases as wall-clock intervals.
+
+    Recording is always on and costs a perf_counter() call per phase;
+    the timeline is only written when main.py runs with
+    --profile-startup. The output is a Chrome trace (chrome://tracing,
+    Perfetto) whose times are relative to the start of main().
+    """
+
+    def __init__(self, origin=None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.events = []
+        self.written = False
+
+    def add(self, name, start, end=None, category="startup"):
+        """Record a phase from perf_counter() values; without an end it is an instant"""
+        self.events.append((name, category, start, end))
+
+    @contextmanager
+    def phase(self, name, category="startup"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), category)
+
+    def mark(self, name, category="startup"):
+        self.add(name, time.perf_counter(), None, category)
+
+    def has(self, name):
+        return any(event[0] == name for event in self.events)
+
+    def elapsed(self, name):
+        """Milliseconds from the origin to the end of the first event called name"""
+        for event_name, _, start, end in self.events:
+            if event_name == name:
+                return ((end if end is not None else start) - self.origin) * 1000
+        return None
+
+    def to_trace(self, metadata=None):
+        pid = os.getpid()
+        trace_events = []
+        for name, category, start, end in self.events:
+            event = {
+                "name": name,
+                "cat": category,
+                "ts": round((start - self.origin) * 1e6),
+                "pid": pid,
+                "tid": 0,
+            }
+            if end is None:
+                event.update({"ph": "i", "s": "p"})
+            else:
+                event.update({"ph": "X", "dur": round((end - start) * 1e6)})
+            trace_events.append(event)
+        trace_events.sort(key=lambda event: event["ts"])
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms", "otherData": metadata or {}}
+
+    def write(self, output_path, metadata=None):
+        try:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_trace(metadata), f, indent=1)
+            self.written = True
+        except OSError as e:
+            print(f"Error writing startup profile: {e}")
+            return False
+
+        print(f"\nStartup profile written to {output_path}")
+        for name, _, start, end in sorted(self.events, key=lambda event: event[2]):
+            at = (start - self.origin) * 1000
+            if end is None:
+                print(f"  {at:9.1f} ms  {name}")
+            else:
+                print(f"  {at:9.1f} ms  {name} ({(end - start) * 1000:.1f} ms)")
+        return True
+
+
+startup_profiler = StartupProfiler()
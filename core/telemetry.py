@@ -0,0 +1,199 @@
+# --------------------------------------------------
+# Per-export telemetry records in a rotating JSONL log
+# --------------------------------------------------
+import os
+import json
+import time
+import uuid
+import threading
+import statistics
+from contextlib import contextmanager
+from .media_cache import get_cache_directory
+
+# Progress samples kept per export; at most one per interval
+SAMPLE_INTERVAL = 1.0
+MAX_SAMPLES = 600
+
+# Durations (seconds) summarised by aggregate()
+TIMING_FIELDS = ("probe_time", "plan_time", "spawn_latency", "first_progress", "encode_time",
+                 "fsync_time", "rename_time", "wall_time")
+
+
+class ExportTelemetry:
+    """Timings of one export, filled in as it runs and written when it finishes.
+
+    Times are perf_counter() based and stored in seconds relative to
+    start(). Stages are timed with stage(); progress() samples FFmpeg's
+    speed and fps at most once per SAMPLE_INTERVAL.
+    """
+
+    def __init__(self, kind, input_path, output_paths, media_duration, settings=None):
+        self.started = time.perf_counter()
+        self.record = {
+            "export_id": uuid.uuid4().hex[:12],
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "kind": kind,
+            "input_path": input_path,
+            "output_paths": list(output_paths),
+            "media_duration": round(media_duration, 3),
+            "format_index": (settings or {}).get("format_index"),
+            "video_codec": (settings or {}).get("video_codec"),
+            "cut_mode": (settings or {}).get("cut_mode"),
+            "steps": 1,
+            "samples": [],
+        }
+        try:
+            self.record["input_size"] = os.path.getsize(input_path)
+        except OSError:
+            self.record["input_size"] = 0
+        self._spawned = None
+        self._last_sample = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def add_time(self, name, seconds):
+        self.record[name] = round(self.record.get(name, 0.0) + seconds, 6)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def spawned(self):
+        """Called just before the first FFmpeg process is started"""
+        if self._spawned is None:
+            self._spawned = time.perf_counter()
+
+    def process_started(self):
+        """Called when the first FFmpeg process is running"""
+        if self._spawned is not None and "spawn_latency" not in self.record:
+            self.record["spawn_latency"] = round(time.perf_counter() - self._spawned, 6)
+
+    def progress(self, event):
+        now = time.perf_counter()
+        if "first_progress" not in self.record and self._spawned is not None:
+            self.record["first_progress"] = round(now - self._spawned, 6)
+        if self._last_sample is not None and now - self._last_sample < SAMPLE_INTERVAL:
+            return
+        if len(self.record["samples"]) >= MAX_SAMPLES:
+            return
+        self._last_sample = now
+        self.record["samples"].append([round(now - self.started, 3), round(event.out_time, 3),
+                                       round(event.fps, 2), round(event.speed, 3)])
+
+    def finish(self, success, exit_code=None, aborted=False):
+        record = self.record
+        if self._spawned is not None:
+            commit = record.get("fsync_time", 0.0) + record.get("rename_time", 0.0)
+            record["encode_time"] = round(time.perf_counter() - self._spawned - commit, 6)
+        record["wall_time"] = round(self.elapsed(), 6)
+        record["success"] = bool(success)
+        record["exit_code"] = exit_code
+        record["aborted"] = bool(aborted)
+        record["output_size"] = sum(os.path.getsize(path) for path in record["output_paths"] if os.path.exists(path))
+        speeds = [sample[3] for sample in record["samples"] if sample[3] > 0]
+        record["mean_speed"] = round(statistics.mean(speeds), 3) if speeds else None
+        return record
+
+
+# --------------------------------------------------
+# Log storage and aggregation
+# --------------------------------------------------
+class TelemetryLog:
+    """Append-only JSONL file rotated to .1, .2, ... once it exceeds max_bytes"""
+
+    def __init__(self, path=None, max_bytes=5 * 1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def _path(self):
+        return self.path or os.path.join(get_cache_directory(), "telemetry", "exports.jsonl")
+
+    def _files(self):
+        """Log files from oldest to newest"""
+        path = self._path()
+        return [f"{path}.{i}" for i in range(self.backups, 0, -1)] + [path]
+
+    def append(self, record):
+        path = self._path()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if os.path.exists(path) and os.path.getsize(path) + len(line) > self.max_bytes:
+                    self._rotate(path)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+            except OSError as e:
+                print(f"Error writing export telemetry: {e}")
+
+    def _rotate(self, path):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{i}"):
+                os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+
+    def records(self):
+        """Yield every stored record, oldest first; unreadable lines are skipped"""
+        for path in self._files():
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def aggregate(records, group_by="kind"):
+    """Summarise records per group_by value: counts, success rate, and stats of each timing.
+
+    Returns {group: {"count", "success_rate", "mean_speed", "realtime_factor",
+    "<timing>": {"mean", "median", "p95", "max"}}}, in seconds.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record.get(group_by), []).append(record)
+
+    summary = {}
+    for group, items in groups.items():
+        successful = [r for r in items if r.get("success")]
+        entry = {
+            "count": len(items),
+            "success_rate": round(len(successful) / len(items), 3),
+        }
+        speeds = [r["mean_speed"] for r in successful if r.get("mean_speed")]
+        entry["mean_speed"] = round(statistics.mean(speeds), 3) if speeds else None
+        media = sum(r.get("media_duration", 0) for r in successful)
+        wall = sum(r.get("wall_time", 0) for r in successful)
+        entry["realtime_factor"] = round(media / wall, 3) if wall > 0 else None
+        for name in TIMING_FIELDS:
+            values = [r[name] for r in successful if isinstance(r.get(name), (int, float))]
+            if values:
+                entry[name] = {
+                    "mean": round(statistics.mean(values), 4),
+                    "median": round(statistics.median(values), 4),
+                    "p95": round(_percentile(values, 0.95), 4),
+                    "max": round(max(values), 4),
+                }
+        summary[group] = entry
+    return summary
+
+
+telemetry_log = TelemetryLog()
@@ -0,0 +1,237 @@
+# --------------------------------------------------
+# Timeline thumbnails with a multi-resolution tile cache
+# --------------------------------------------------
+import os
+import struct
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .media_cache import media_cache, file_identity
+
+THUMB_HEIGHT = 48
+
+# Level 0 spreads BASE_THUMBS over the whole file, every further level doubles it
+BASE_THUMBS = 16
+MAX_LEVEL = 6
+TILE_THUMBS = 16
+
+
+def thumbnail_count(level):
+    return BASE_THUMBS << level
+
+
+def tile_count(level):
+    return max(1, thumbnail_count(level) // TILE_THUMBS)
+
+
+def thumbnail_time(duration, level, index):
+    """Time in seconds shown by thumbnail index of level: the middle of its slot"""
+    return duration * (index + 0.5) / thumbnail_count(level)
+
+
+def level_for_width(width, thumb_width):
+    """Lowest level with at least one thumbnail per thumb_width pixels"""
+    needed = width / max(1, thumb_width)
+    level = 0
+    while level < MAX_LEVEL and thumbnail_count(level) < needed:
+        level += 1
+    return level
+
+
+def _pack_tile(images):
+    header = struct.pack(f"<I{len(images)}I", len(images), *(len(image) for image in images))
+    return header + b"".join(images)
+
+
+def _unpack_tile(data):
+    count = struct.unpack_from("<I", data)[0]
+    lengths = struct.unpack_from(f"<{count}I", data, 4)
+    images = []
+    offset = 4 + 4 * count
+    for length in lengths:
+        images.append(bytes(data[offset:offset + length]))
+        offset += length
+    return images
+
+
+class _TileRequest:
+    def __init__(self, count):
+        self.images = [b""] * count
+        self.remaining = count
+        self.callbacks = []
+        self.futures = []
+
+
+class ThumbnailCache:
+    """Generates JPEG thumbnail tiles in a worker pool and caches them.
+
+    A tile is TILE_THUMBS consecutive thumbnails of one level. Each
+    thumbnail is one keyframe-only decode (-skip_frame nokey) after an
+    input seek, so even long files produce a coarse strip quickly. Tiles
+    live in an LRU memory cache bounded by size, backed by the media cache
+    on disk.
+    """
+    CACHE_KIND = "thumbs"
+
+    def __init__(self, ffmpeg_path="ffmpeg", max_workers=None, max_bytes=32 * 1024 * 1024, disk_cache=None, timeout=30):
+        self.ffmpeg_path = ffmpeg_path
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self.timeout = timeout
+        self._tiles = OrderedDict()
+        self._tile_bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _tile_key(self, file_path, level, tile):
+        identity = file_identity(file_path)
+        if identity is None:
+            return None
+        return (os.path.abspath(file_path),) + identity[2:] + (level, tile)
+
+    def _disk_kind(self, level, tile):
+        return f"{self.CACHE_KIND}:{THUMB_HEIGHT}:{level}:{tile}"
+
+    # --------------------------------------------------
+    # Tile access
+    # --------------------------------------------------
+    def get_tile(self, file_path, level, tile):
+        """Return the tile's JPEG images if cached in memory or on disk, else None"""
+        key = self._tile_key(file_path, level, tile)
+        if key is None:
+            return None
+
+        with self._lock:
+            if key in self._tiles:
+                self._tiles.move_to_end(key)
+                return self._tiles[key]
+
+        if self.disk_cache is None:
+            return None
+        data = self.disk_cache.get(file_path, self._disk_kind(level, tile))
+        if data is None:
+            return None
+        try:
+            images = _unpack_tile(data)
+        except struct.error as e:
+            print(f"Thumbnail cache entry unreadable: {e}")
+            return None
+        self._remember(key, images)
+        return images
+
+    def request_tile(self, file_path, duration, level, tile, callback=None):
+        """Generate a tile in the background.
+
+        callback(file_path, level, tile, images) runs on a worker thread once
+        every thumbnail of the tile is done; images that failed are empty.
+        """
+        images = self.get_tile(file_path, level, tile)
+        if images is not None:
+            if callback is not None:
+                callback(file_path, level, tile, images)
+            return
+
+        key = self._tile_key(file_path, level, tile)
+        if key is None or duration <= 0:
+            return
+
+        with self._lock:
+            request = self._pending.get(key)
+            if request is not None:
+                if callback is not None:
+                    request.callbacks.append(callback)
+                return
+
+            first = tile * TILE_THUMBS
+            count = min(TILE_THUMBS, thumbnail_count(level) - first)
+            request = _TileRequest(count)
+            if callback is not None:
+                request.callbacks.append(callback)
+            self._pending[key] = request
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="thumbnails")
+            executor = self._executor
+            for slot in range(count):
+                time_pos = thumbnail_time(duration, level, first + slot)
+                request.futures.append(executor.submit(self._render, file_path, time_pos))
+
+        # Outside the lock: a future that is already done runs its callback right here
+        for slot, future in enumerate(list(request.futures)):
+            future.add_done_callback(
+                lambda f, slot=slot: self._thumb_done(file_path, key, level, tile, slot, f))
+
+    def cancel(self, keep_path=None):
+        """Drop pending tiles, except those of keep_path"""
+        keep = os.path.abspath(keep_path) if keep_path else None
+        with self._lock:
+            for key in [k for k in self._pending if k[0] != keep]:
+                for future in self._pending.pop(key).futures:
+                    future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    # --------------------------------------------------
+    # Generation
+    # --------------------------------------------------
+    def _render(self, file_path, time_pos):
+        # Past the last keyframe a keyframe-only decode yields nothing, so fall back to a full decode
+        for decode_args in (["-skip_frame", "nokey"], []):
+            cmd = [self.ffmpeg_path, "-v", "error"] + decode_args + [
+                "-noaccurate_seek",
+                "-ss", f"{time_pos:.3f}", "-i", file_path,
+                "-map", "0:v:0", "-an", "-frames:v", "1",
+                "-vf", f"scale=-2:{THUMB_HEIGHT}",
+                "-f", "image2pipe", "-c:v", "mjpeg", "-q:v", "5", "pipe:1"
+            ]
+            try:
+                result = subprocess.run(cmd, capture_output=True, check=True, timeout=self.timeout)
+            except Exception as e:
+                print(f"Error rendering thumbnail at {time_pos:.1f}s: {e}")
+                return b""
+            if result.stdout:
+                return result.stdout
+        return b""
+
+    def _thumb_done(self, file_path, key, level, tile, slot, future):
+        if future.cancelled():
+            return
+        with self._lock:
+            request = self._pending.get(key)
+            if request is None:
+                return
+            request.images[slot] = future.result()
+            request.remaining -= 1
+            if request.remaining > 0:
+                return
+            del self._pending[key]
+
+        images = request.images
+        self._remember(key, images)
+        if self.disk_cache is not None and all(images):
+            self.disk_cache.put(file_path, self._disk_kind(level, tile), _pack_tile(images))
+        for callback in request.callbacks:
+            callback(file_path, level, tile, images)
+
+    def _remember(self, key, images):
+        size = sum(len(image) for image in images)
+        with self._lock:
+            if key in self._tiles:
+                self._tile_bytes -= sum(len(image) for image in self._tiles[key])
+            self._tiles[key] = images
+            self._tiles.move_to_end(key)
+            self._tile_bytes += size
+            while self._tile_bytes > self.max_bytes and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self._tile_bytes -= sum(len(image) for image in evicted)
+
+
+thumbnail_cache = ThumbnailCache(disk_cache=media_cache)
@@ -1,7 +1,21 @@
 import os
 import subprocess
-import re
-import json
+from .media_probe import probe_media
+
+# --------------------------------------------------
+# Debug output
+# --------------------------------------------------
+# Command lines and planning details; headless runs switch them off unless
+# --verbose is given. Errors are printed either way.
+_debug_output = True
+
+def set_debug_output(enabled):
+    global _debug_output
+    _debug_output = bool(enabled)
+
+def debug_print(*args, **kwargs):
+    if _debug_output:
+        print(*args, **kwargs)
 
 # --------------------------------------------------
 # Time conversion
@@ -52,20 +66,8 @@ def get_file_type(file_path):
     if not file_path or not os.path.exists(file_path):
         return None
         
-    try:
-        result = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=codec_type", "-of", "csv=p=0",
-            file_path
-        ], capture_output=True, text=True, check=True, timeout=10)
-        
-        return "video" if result.stdout.strip() == "video" else None
-    except subprocess.TimeoutExpired:
-        print(f"Timeout detecting file type: {file_path}")
-        return None
-    except Exception as e:
-        print(f"Error detecting file type {file_path}: {e}")
-        return None
+    probe = probe_media(file_path)
+    return "video" if probe and probe.has_video else None
 
 def is_video_file(file_path):
     if not file_path or not os.path.exists(file_path):
@@ -91,53 +93,15 @@ def get_video_duration(file_path):
     if not file_path or not os.path.exists(file_path):
         return 0
         
-    try:
-        result = subprocess.run([
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", file_path
-        ], capture_output=True, text=True, check=True, timeout=10)
-        
-        return float(result.stdout.strip())
-    except Exception as e:
-        print(f"Error getting video duration {file_path}: {e}")
-        return 0
+    probe = probe_media(file_path)
+    return probe.duration if probe else 0
 
 def get_video_info(file_path):
     if not file_path or not os.path.exists(file_path):
         return {}
         
-    try:
-        result = subprocess.run([
-            "ffprobe", "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=codec_name,width,height,r_frame_rate",
-            "-show_entries", "format=duration,size",
-            "-of", "json", file_path
-        ], capture_output=True, text=True, check=True, timeout=10)
-        
-        info = json.loads(result.stdout)
-        
-        video_info = {}
-        if 'streams' in info and info['streams']:
-            stream = info['streams'][0]
-            video_info.update({
-                'codec': stream.get('codec_name', 'unknown'),
-                'width': stream.get('width', 0),
-                'height': stream.get('height', 0),
-                'frame_rate': stream.get('r_frame_rate', '0/0')
-            })
-            
-        if 'format' in info:
-            format_info = info['format']
-            video_info.update({
-                'duration': float(format_info.get('duration', 0)),
-                'size': int(format_info.get('size', 0))
-            })
-            
-        return video_info
-        
-    except Exception as e:
-        print(f"Error getting video info {file_path}: {e}")
-        return {}
+    probe = probe_media(file_path)
+    return probe.to_video_info() if probe else {}
 
 # --------------------------------------------------
 # File management
@@ -158,18 +122,19 @@ def get_output_directory(format_type):
     os.makedirs(output_dir, exist_ok=True)
     return output_dir
 
-def unique_output_path(base_name, extension, format_type):
+def unique_output_path(base_name, extension, format_type, reserved=()):
     output_dir = get_output_directory(format_type)
     base_path = os.path.join(output_dir, base_name)
     candidate = f"{base_path}{extension}"
     
-    if not os.path.exists(candidate):
+    # reserved holds outputs of exports that have not written their file yet
+    if not os.path.exists(candidate) and candidate not in reserved:
         return candidate
     
     i = 1
     while True:
         candidate = f"{base_path}({i}){extension}"
-        if not os.path.exists(candidate):
+        if not os.path.exists(candidate) and candidate not in reserved:
             return candidate
         i += 1
 
@@ -193,35 +158,19 @@ def sanitize_filename(filename):
     return filename
 
 # --------------------------------------------------
-# FFmpeg progress parsing
+# Background processes
 # --------------------------------------------------
-def parse_ffmpeg_progress(line, total_duration):
-    if not line or total_duration <= 0:
-        return None
-        
-    patterns = [
-        r'time=(\d+):(\d+):(\d+\.\d+)',
-        r'time=(\d+):(\d+):(\d+)',
-        r'time=(\d+\.\d+)',
-        r'time=(\d+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, line)
-        if match:
-            try:
-                if len(match.groups()) == 3:
-                    hours, minutes, seconds = map(float, match.groups())
-                    current_time = hours * 3600 + minutes * 60 + seconds
-                else:
-                    current_time = float(match.group(1))
-                
-                progress = min(current_time / total_duration, 1.0)
-                return progress
-            except (ValueError, TypeError):
-                continue
-                
-    return None
+def _lower_priority():
+    # Runs in the child before exec, POSIX only
+    os.nice(10)
+
+def background_popen_kwargs():
+    """Popen keyword arguments that start a helper process at below-normal priority"""
+    if os.name == "posix":
+        return {"preexec_fn": _lower_priority}
+    if os.name == "nt":
+        return {"creationflags": subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+    return {}
 
 # --------------------------------------------------
 # Formatting utilities
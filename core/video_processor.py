@@ -2,42 +2,62 @@
 # Video processing and export management
 # --------------------------------------------------
 import os
-import subprocess
-import json
+import time
+import signal
 from PyQt5.QtCore import QObject, pyqtSignal, QProcess
-from .utils import parse_ffmpeg_progress
+from .ffmpeg_commands import FFmpegCommandBuilder
+from .export_plan import single_step_plan
+from .ffmpeg_progress import FFmpegProgressParser, ProgressEvent, with_progress_pipe
+from .media_probe import probe_media
+from .telemetry import ExportTelemetry, telemetry_log
 
 
-class VideoProcessor(QObject):
+class VideoProcessor(QObject, FFmpegCommandBuilder):
     progress_updated = pyqtSignal(int)
     export_finished = pyqtSignal(str, bool)
     export_started = pyqtSignal()
+    progress_event = pyqtSignal(object)
+    output_progress = pyqtSignal(str, int)
+    output_finished = pyqtSignal(str, bool)
     
     def __init__(self):
         super().__init__()
         self.current_process = None
         self.is_processing = False
         self.abort_requested = False
+        self.is_paused = False
         self.output_file = None
         self.temp_output_file = None
+        self.output_targets = []
         self.total_duration = 0
-        
-    def _get_temp_filename(self, output_path):
-        """Generate temporary filename with proper extension"""
-        base, ext = os.path.splitext(output_path)
-        return f"{base}.tmp{ext}"
-        
-    def export_video(self, input_path, output_path, settings, start_time, end_time, video_filters=None):
-        """Main video export function with VC-1 detection"""
+        self.current_plan = None
+        self._plan_stages = []
+        self._pending_steps = []
+        self._running_steps = {}
+        self._step_events = {}
+        self._plan_done_duration = 0.0
+        self._plan_done_size = 0
+        self._plan_failed = False
+        self._progress_parser = FFmpegProgressParser()
+        self.telemetry = None
+        self._exit_code = None
+        
+    def export_video(self, input_path, output_path, settings, start_time, end_time, video_filters=None, segments=None):
+        """Main video export function with VC-1 detection; segments are [start, end] ranges joined in order"""
         if not os.path.exists(input_path):
             self.export_finished.emit(output_path, False)
             return False
             
         self.output_file = output_path
         self.temp_output_file = self._get_temp_filename(output_path)
+        self.output_targets = []
         
-        duration = end_time - start_time
+        duration = sum(end - start for start, end in segments) if segments else end_time - start_time
         self.total_duration = duration
+        self.telemetry = ExportTelemetry("video", input_path, [output_path], duration, settings)
+        self.telemetry.record["segments"] = len(segments) if segments else 1
+        with self.telemetry.stage("probe_time"):
+            probe_media(input_path)
         
         format_index = settings.get("format_index", 0)
         
@@ -47,32 +67,30 @@ class VideoProcessor(QObject):
         print(f"Output: {output_path}")
         print(f"Temp: {self.temp_output_file}")
         print(f"Start: {start_time}, End: {end_time}, Duration: {duration}")
+        if segments:
+            print(f"Segments: {segments}")
         print(f"Format index: {format_index}")
         print(f"Video filters: {video_filters}")
         
         # Check if video uses VC-1 codec
-        is_vc1 = self.is_vc1_video(input_path)
-        if is_vc1:
+        if self.is_vc1_video(input_path):
             print(f"Detected VC-1/WMV video codec")
         print(f"===================\n")
         
         # Select appropriate command based on format and codec
-        if format_index == 0 and not video_filters:
-            cmd = self.build_fast_copy_command(input_path, self.temp_output_file, start_time, duration, video_filters)
-        else:
-            if is_vc1:
-                # Use special conversion command for VC-1
-                cmd = self.build_vc1_conversion_command(input_path, self.temp_output_file, settings, start_time, duration, video_filters)
-            else:
-                cmd = self.build_video_command(input_path, self.temp_output_file, settings, start_time, duration, video_filters)
-        
-        if not cmd:
+        with self.telemetry.stage("plan_time"):
+            plan = self.plan_export(input_path, self.temp_output_file, settings, start_time, end_time, video_filters, segments)
+        if not plan:
+            self.telemetry = None
             return False
+        self.telemetry.record["steps"] = len(plan.steps)
             
         self.export_started.emit()
-        return self._run_ffmpeg_process(cmd)
+        if plan.work_dir:
+            return self._run_export_plan(plan)
+        return self._run_ffmpeg_process(plan.steps[0].cmd)
         
-    def export_audio(self, input_path, output_path, settings, start_time, end_time):
+    def export_audio(self, input_path, output_path, settings, start_time, end_time, segments=None):
         """Export audio only from video file"""
         if not os.path.exists(input_path):
             self.export_finished.emit(output_path, False)
@@ -80,309 +98,81 @@ class VideoProcessor(QObject):
             
         self.output_file = output_path
         self.temp_output_file = self._get_temp_filename(output_path)
+        self.output_targets = []
         
-        duration = end_time - start_time
+        duration = sum(end - start for start, end in segments) if segments else end_time - start_time
         self.total_duration = duration
-        
-        cmd = self.build_audio_command(input_path, self.temp_output_file, settings, start_time, duration)
-        if not cmd:
+        self.telemetry = ExportTelemetry("audio", input_path, [output_path], duration, settings)
+        self.telemetry.record["segments"] = len(segments) if segments else 1
+        with self.telemetry.stage("probe_time"):
+            probe_media(input_path)
+        
+        with self.telemetry.stage("plan_time"):
+            if segments and len(segments) > 1:
+                plan = self.build_segments_plan(input_path, self.temp_output_file, settings, segments)
+            else:
+                cmd = self.build_audio_command(input_path, self.temp_output_file, settings, start_time, duration)
+                plan = single_step_plan(cmd, duration, self.temp_output_file) if cmd else None
+        if not plan:
+            self.telemetry = None
             return False
+        self.telemetry.record["steps"] = len(plan.steps)
             
         self.export_started.emit()
-        return self._run_ffmpeg_process(cmd)
-        
-    def build_fast_copy_command(self, input_path, output_path, start_time, duration, video_filters=None):
-        """Build FFmpeg command for fast copy (no re-encoding)"""
-        cmd = ["ffmpeg", "-y"]
-        
-        cmd.extend(["-ss", str(start_time), "-i", input_path, "-t", str(duration)])
-        
-        if video_filters:
-            cmd.extend(["-vf", video_filters])
-            cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18", "-c:a", "aac", "-b:a", "192k"])
-        else:
-            cmd.extend(["-c:v", "copy", "-c:a", "copy"])
-        
-        if output_path.endswith('.mp4'):
-            cmd.extend(["-movflags", "+faststart"])
-        
-        cmd.append(output_path)
-        
-        return cmd
+        if plan.work_dir:
+            return self._run_export_plan(plan)
+        return self._run_ffmpeg_process(plan.steps[0].cmd)
         
-    def build_video_command(self, input_path, output_path, settings, start_time, duration, video_filters):
-        """Build FFmpeg command for video conversion with re-encoding"""
-        cmd = ["ffmpeg", "-y"]
+    def export_multi(self, input_path, targets, start_time, end_time, video_filters=None):
+        """Export several renditions of one range from a single decode.
+
+        targets is a list of (output_path, settings) pairs; each output is
+        reported through output_progress/output_finished, and export_finished
+        carries the first output and whether all of them succeeded.
+        """
+        if not os.path.exists(input_path) or not targets:
+            self.export_finished.emit(targets[0][0] if targets else "", False)
+            return False
         
-        cmd.extend(["-ss", str(start_time), "-i", input_path, "-t", str(duration)])
+        self.output_targets = [(path, self._get_temp_filename(path)) for path, _ in targets]
+        self.output_file, self.temp_output_file = self.output_targets[0]
+        self.total_duration = end_time - start_time
         
-        format_index = settings.get("format_index", 0)
+        self.telemetry = ExportTelemetry("multi", input_path, [path for path, _ in targets], self.total_duration, targets[0][1])
+        with self.telemetry.stage("probe_time"):
+            probe_media(input_path)
         
-        if format_index == 0:
-            cmd.extend(["-c:v", "copy", "-c:a", "copy"])
-            
-            if video_filters:
-                cmd.extend(["-vf", video_filters])
-                cmd.remove("-c:v")
-                cmd.remove("copy")
-                cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "18"])
-        else:
-            # Build filter chain
-            filter_chain = []
-            
-            # Add transformation filters (crop, rotate, flip)
-            if video_filters:
-                filter_chain.append(video_filters)
-            
-            # Add scale filter for resolution change
-            resolution_params = self._get_resolution_params(settings, input_path)
-            if resolution_params:
-                # Extract just the filter part (remove "-vf" prefix)
-                scale_filter = resolution_params[1] if len(resolution_params) > 1 else ""
-                if scale_filter:
-                    filter_chain.append(scale_filter)
-            
-            # Combine all filters
-            if filter_chain:
-                combined_filters = ",".join(filter_chain)
-                cmd.extend(["-vf", combined_filters])
-            
-            # Add codec parameters
-            codec_params = self._get_video_codec_params(settings, format_index)
-            if codec_params:
-                cmd.extend(codec_params)
-            
-            # Add audio parameters
-            audio_params = self._get_audio_params(settings, format_index)
-            if audio_params:
-                cmd.extend(audio_params)
-            
-            # Add standard audio settings
-            audio_settings = self._get_audio_settings(settings)
-            if audio_settings:
-                cmd.extend(audio_settings)
-        
-        if output_path.endswith('.mp4'):
-            cmd.extend(["-movflags", "+faststart"])
-        
-        cmd.append(output_path)
+        temp_targets = [(temp_path, settings) for (_, temp_path), (_, settings) in zip(self.output_targets, targets)]
+        with self.telemetry.stage("plan_time"):
+            cmd = self.build_multi_output_command(input_path, temp_targets, start_time, self.total_duration, video_filters)
+        if not cmd:
+            self.output_targets = []
+            self.telemetry = None
+            return False
         
-        # Debug output
-        print(f"\n=== FFMPEG COMMAND ===")
-        print(f"Video filters: {video_filters}")
-        print(f"Resolution params: {resolution_params if 'resolution_params' in locals() else 'None'}")
+        print(f"Multi-output export: {len(targets)} output(s) from one decode")
         print(f"Full command: {' '.join(cmd)}")
-        print(f"===================================\n")
-        
-        return cmd
-        
-    def build_audio_command(self, input_path, output_path, settings, start_time, duration):
-        """Build FFmpeg command for audio-only export"""
-        cmd = [
-            "ffmpeg", "-y", 
-            "-ss", str(start_time), 
-            "-i", input_path, 
-            "-t", str(duration), 
-            "-vn",
-            "-ac", "2",
-            "-ar", "48000"
-        ]
-        
-        audio_format = settings.get("audio_output_format", "mp3")
-        audio_quality = settings.get("audio_quality", "192")
-        
-        if audio_format == "mp3":
-            cmd.extend(["-c:a", "libmp3lame", "-b:a", f"{audio_quality}k"])
-        elif audio_format == "aac":
-            cmd.extend(["-c:a", "aac", "-b:a", f"{audio_quality}k"])
-        elif audio_format == "flac":
-            cmd.extend(["-c:a", "flac"])
-            
-        cmd.append(output_path)
-        return cmd
-        
-    def _get_video_codec_params(self, settings, format_index):
-        """Get video codec parameters based on settings"""
-        formats = ["original", "mp4", "mkv", "webm"]
-        
-        if format_index >= len(formats):
-            format_index = 1
-            
-        format_type = formats[format_index]
-        
-        if format_type == "original":
-            video_codec = self.detect_video_codec_from_file(settings.get("input_path", ""))
-            if video_codec:
-                return ["-c:v", video_codec, "-c:a", "copy"]
-            else:
-                return ["-c:v", "copy", "-c:a", "copy"]
-        elif format_type == "webm":
-            crf_value = settings.get("crf_value", 23)
-            return ["-c:v", "libvpx-vp9", "-crf", str(crf_value), "-b:v", "0"]
-        else:
-            video_codec = settings.get("video_codec", "H264")
-            crf_value = settings.get("crf_value", 23)
-            
-            if video_codec == "H265":
-                return ["-c:v", "libx265", "-crf", str(crf_value), "-preset", "medium"]
-            else:
-                return ["-c:v", "libx264", "-crf", str(crf_value), "-preset", "medium"]
-        
-    def _get_audio_params(self, settings, format_index):
-        """Get audio codec parameters based on settings"""
-        formats = ["original", "mp4", "mkv", "webm"]
-        format_type = formats[format_index] if format_index < len(formats) else "mp4"
-        
-        video_audio_format = settings.get("video_audio_format", "AAC")
-        
-        if format_type == "original":
-            return ["-c:a", "copy"]
-        elif format_type == "webm":
-            return ["-c:a", "libopus", "-b:a", "192k"]
-        elif video_audio_format == "Copy Original":
-            return ["-c:a", "copy"]
-        elif video_audio_format == "MP3":
-            audio_bitrate = settings.get("video_audio_bitrate", "192")
-            return ["-c:a", "libmp3lame", "-b:a", f"{audio_bitrate}k"]
-        else:
-            audio_bitrate = settings.get("video_audio_bitrate", "192")
-            return ["-c:a", "aac", "-b:a", f"{audio_bitrate}k"]
-        
-    def _get_resolution_params(self, settings, input_path):
-        """Get resolution scaling parameters"""
-        resolution = settings.get("resolution", "Original")
-        
-        if resolution == "Original":
-            return []
-        
-        # Get original video dimensions
-        try:
-            cmd = [
-                "ffprobe", "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height",
-                "-of", "json", input_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            data = json.loads(result.stdout)
-            
-            if "streams" in data and len(data["streams"]) > 0:
-                orig_width = int(data["streams"][0].get("width", 0))
-                orig_height = int(data["streams"][0].get("height", 0))
-                
-                if orig_width == 0 or orig_height == 0:
-                    return []
-        except Exception as e:
-            print(f"Error getting video dimensions: {e}")
-            return []
-        
-        # Calculate target dimensions while preserving aspect ratio
-        if resolution == "4K":
-            target_width, target_height = 3840, 2160
-        elif resolution == "2K":
-            target_width, target_height = 2560, 1440
-        elif resolution == "1080p":
-            target_width, target_height = 1920, 1080
-        elif resolution == "720p":
-            target_width, target_height = 1280, 720
-        elif resolution == "480p":
-            target_width, target_height = 854, 480
-        else:
-            return []
-        
-        # Ensure dimensions are even numbers (required by most codecs)
-        target_width = target_width if target_width % 2 == 0 else target_width - 1
-        target_height = target_height if target_height % 2 == 0 else target_height - 1
-        
-        # Calculate new dimensions that fit within target while preserving aspect ratio
-        orig_ratio = orig_width / orig_height
-        target_ratio = target_width / target_height
-        
-        if abs(orig_ratio - target_ratio) < 0.01:
-            # Same aspect ratio, direct scale
-            new_width = target_width
-            new_height = target_height
-        else:
-            # Different aspect ratio - fit within target dimensions
-            if orig_ratio > target_ratio:
-                # Video is wider than target, fit by width
-                new_width = target_width
-                new_height = int(target_width / orig_ratio)
-            else:
-                # Video is taller than target, fit by height
-                new_height = target_height
-                new_width = int(target_height * orig_ratio)
-        
-        # Ensure dimensions are even numbers
-        new_width = new_width if new_width % 2 == 0 else new_width - 1
-        new_height = new_height if new_height % 2 == 0 else new_height - 1
-        
-        # Ensure minimum dimensions
-        if new_width < 2 or new_height < 2:
-            return []
-        
-        return ["-vf", f"scale={new_width}:{new_height}"]
-        
-    def _get_audio_settings(self, settings):
-        """Get standard audio settings"""
-        return ["-ac", "2", "-ar", "48000"]
-        
-    def detect_video_codec_from_file(self, input_path):
-        """Detect video codec from file using ffprobe"""
-        if not input_path or not os.path.exists(input_path):
-            return None
-        
-        try:
-            cmd = [
-                "ffprobe", "-v", "error", 
-                "-select_streams", "v:0",
-                "-show_entries", "stream=codec_name",
-                "-of", "json", input_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
-            data = json.loads(result.stdout)
-            
-            if "streams" in data and len(data["streams"]) > 0:
-                codec_name = data["streams"][0].get("codec_name", "")
-                # Map codec names to FFmpeg encoder names
-                codec_map = {
-                    "h264": "libx264",
-                    "hevc": "libx265",
-                    "h265": "libx265",
-                    "vp8": "libvpx",
-                    "vp9": "libvpx-vp9",
-                    "av1": "libaom-av1",
-                    "mpeg4": "mpeg4",
-                    "msmpeg4v3": "msmpeg4v3",
-                    "wmv3": "libx264",
-                    "vc1": "libx264",
-                    "wmva": "libx264",
-                    "wmvp": "libx264",
-                    "wmv1": "libx264",
-                    "wmv2": "libx264",
-                    "mpeg2video": "mpeg2video",
-                    "mjpeg": "mjpeg"
-                }
-                return codec_map.get(codec_name, codec_name)
-                
-        except Exception as e:
-            print(f"Error detecting codec: {e}")
-        
-        return None
+        self.export_started.emit()
+        return self._run_ffmpeg_process(cmd)
         
     def _run_ffmpeg_process(self, cmd):
         """Run FFmpeg process and handle signals"""
         self.is_processing = True
         self.abort_requested = False
+        self.current_plan = None
+        self._progress_parser = FFmpegProgressParser()
         
         try:
             print(f"Starting FFmpeg process...")
+            cmd = with_progress_pipe(cmd)
             self.current_process = QProcess()
+            self.current_process.readyReadStandardOutput.connect(self._handle_stdout)
             self.current_process.readyReadStandardError.connect(self._handle_stderr)
             self.current_process.finished.connect(self._process_finished)
+            self.current_process.started.connect(self._process_started)
             
+            if self.telemetry:
+                self.telemetry.spawned()
             self.current_process.start(cmd[0], cmd[1:])
             return True
             
@@ -391,47 +181,181 @@ class VideoProcessor(QObject):
             self.is_processing = False
             return False
         
+    def _handle_stdout(self):
+        """Parse the -progress stream and report progress"""
+        if self.current_process:
+            for event in self._progress_parser.feed(self.current_process.readAllStandardOutput().data()):
+                if self.telemetry:
+                    self.telemetry.progress(event)
+                self.progress_event.emit(event)
+                fraction = event.fraction(self.total_duration)
+                if fraction is not None:
+                    self.progress_updated.emit(int(fraction * 100))
+                    # All outputs of one graph advance together
+                    for output_path, _ in self.output_targets:
+                        self.output_progress.emit(output_path, int(fraction * 100))
+        
     def _handle_stderr(self):
-        """Handle FFmpeg stderr output and parse progress"""
+        """Print FFmpeg log output"""
         if self.current_process:
             data = self.current_process.readAllStandardError().data().decode('utf-8', errors='ignore')
-            lines = data.split('\n')
-            for line in lines:
+            for line in data.split('\n'):
                 if line.strip():
                     print(f"FFmpeg: {line}")
-                    progress = parse_ffmpeg_progress(line, self.total_duration)
-                    if progress is not None:
-                        self.progress_updated.emit(int(progress * 100))
+    
+    # --------------------------------------------------
+    # Export plan execution
+    # --------------------------------------------------
+    def _run_export_plan(self, plan):
+        """Run plan stages in order, each stage on a bounded pool of FFmpeg processes"""
+        self.is_processing = True
+        self.abort_requested = False
+        self.current_plan = plan
+        self.total_duration = plan.total_duration
+        self._plan_stages = [list(stage) for stage in plan.stages]
+        self._pending_steps = []
+        self._running_steps = {}
+        self._step_events = {}
+        self._plan_done_duration = plan.resumed_duration
+        self._plan_done_size = 0
+        self._plan_failed = False
+        
+        print(f"Running export plan: {len(plan.steps)} step(s), up to {plan.max_workers} at once")
+        if self._start_next_plan_stage():
+            return True
+        
+        self._abort_running_steps()
+        self.is_processing = False
+        plan.cleanup(success=False)
+        self.current_plan = None
+        return False
+        
+    def _start_next_plan_stage(self):
+        self._pending_steps = self._plan_stages.pop(0)
+        return self._fill_worker_pool()
+        
+    def _fill_worker_pool(self):
+        # Paused plans start no new steps until resume_processing()
+        while not self.is_paused and self._pending_steps and len(self._running_steps) < self.current_plan.max_workers:
+            step = self._pending_steps.pop(0)
+            if not self._start_plan_step(step):
+                return False
+        return True
+        
+    def _start_plan_step(self, step):
+        cmd = with_progress_pipe(step.cmd)
+        print(f"Plan step: {step.label}")
+        print(f"Full command: {' '.join(cmd)}")
+        
+        try:
+            process = QProcess()
+            parser = FFmpegProgressParser()
+            process.readyReadStandardOutput.connect(lambda p=process, st=step, pr=parser: self._handle_step_stdout(p, st, pr))
+            process.readyReadStandardError.connect(lambda p=process, st=step: self._handle_step_stderr(p, st))
+            process.finished.connect(lambda code, status, p=process: self._plan_step_finished(p, code, status))
+            process.started.connect(self._process_started)
+            
+            self._running_steps[process] = step
+            self.current_process = process
+            if self.telemetry:
+                self.telemetry.spawned()
+            process.start(cmd[0], cmd[1:])
+            return True
+            
+        except Exception as e:
+            print(f"Error starting FFmpeg: {e}")
+            self._running_steps.pop(process, None)
+            return False
+        
+    def _handle_step_stdout(self, process, step, parser):
+        """Track progress of one plan step and emit the aggregate over all steps"""
+        events = parser.feed(process.readAllStandardOutput().data())
+        if not events or self.total_duration <= 0:
+            return
+        
+        self._step_events[id(step)] = (step, events[-1])
+        # Steps without a duration (audio copies) run far above realtime and would skew speed
+        timed = [event for st, event in self._step_events.values() if st.duration > 0]
+        aggregate = ProgressEvent(
+            out_time=self._plan_done_duration + sum(min(event.out_time, st.duration)
+                                                    for st, event in self._step_events.values()),
+            frame=sum(event.frame for event in timed),
+            fps=sum(event.fps for event in timed),
+            speed=sum(event.speed for event in timed),
+            bitrate_kbps=sum(event.bitrate_kbps for event in timed),
+            total_size=self._plan_done_size + sum(event.total_size for _, event in self._step_events.values()),
+        )
+        if self.telemetry:
+            self.telemetry.progress(aggregate)
+        self.progress_event.emit(aggregate)
+        self.progress_updated.emit(int(aggregate.fraction(self.total_duration) * 100))
+        
+    def _handle_step_stderr(self, process, step):
+        data = process.readAllStandardError().data().decode('utf-8', errors='ignore')
+        for line in data.split('\n'):
+            if line.strip():
+                print(f"FFmpeg [{step.label}]: {line}")
+        
+    def _plan_step_finished(self, process, exit_code, exit_status):
+        """Advance the plan when a step ends, failing the whole export on any error"""
+        step = self._running_steps.pop(process, None)
+        if step is None or self._plan_failed:
+            return
+        
+        self._exit_code = exit_code
+        if exit_code != 0 or self.abort_requested:
+            print(f"Plan step failed: {step.label} (exit code {exit_code})")
+            self._plan_failed = True
+            self._abort_running_steps()
+            self._finish_export(False)
+            return
+        
+        finished = self._step_events.pop(id(step), None)
+        if finished:
+            self._plan_done_size += finished[1].total_size
+        self._plan_done_duration += step.duration
+        self.current_plan.step_done(step)
+        
+        if not self._fill_worker_pool():
+            self._plan_failed = True
+            self._abort_running_steps()
+            self._finish_export(False)
+        elif not self._running_steps and not self._pending_steps:
+            if not self._plan_stages:
+                self._finish_export(True)
+            elif not self._start_next_plan_stage():
+                self._plan_failed = True
+                self._abort_running_steps()
+                self._finish_export(False)
+        
+    def _abort_running_steps(self):
+        for process in list(self._running_steps):
+            if process.state() == QProcess.Running:
+                process.kill()
+                process.waitForFinished(2000)
+        self._running_steps = {}
     
     def _process_finished(self, exit_code, exit_status):
         """Handle FFmpeg process completion"""
+        self._exit_code = exit_code
         success = (exit_code == 0) and (not self.abort_requested)
+        self._finish_export(success)
+        
+    def _finish_export(self, success):
+        """Move the temp file into place and report the export result"""
         self.is_processing = False
+        self.is_paused = False
+        
+        if self.current_plan is not None:
+            self.current_plan.cleanup(success)
+            self.current_plan = None
+        
+        if self.output_targets:
+            self._finish_multi_export(success)
+            return
         
         if success and hasattr(self, 'temp_output_file') and self.temp_output_file:
-            try:
-                if os.path.exists(self.temp_output_file):
-                    with open(self.temp_output_file, 'rb+') as f:
-                        os.fsync(f.fileno())
-            except Exception as e:
-                print(f"Error syncing temp file: {e}")
-            
-            try:
-                if os.path.exists(self.temp_output_file):
-                    os.rename(self.temp_output_file, self.output_file)
-                    print(f"Successfully renamed temp file to: {self.output_file}")
-                    
-                    try:
-                        with open(self.output_file, 'rb+') as f:
-                            os.fsync(f.fileno())
-                    except Exception as e:
-                        print(f"Error syncing final file: {e}")
-                else:
-                    print(f"Warning: Temp file does not exist: {self.temp_output_file}")
-                    success = False
-            except Exception as e:
-                print(f"Error renaming temp file: {e}")
-                success = False
+            success = self._commit_temp_file(self.temp_output_file, self.output_file)
         elif not success:
             self._cleanup_temp_file()
             self._cleanup_incomplete_file(self.output_file)
@@ -451,6 +375,82 @@ class VideoProcessor(QObject):
                 self.export_finished.emit(self.output_file, False)
         
         self.current_process = None
+        self._write_telemetry(success)
+    
+    def _commit_temp_file(self, temp_path, output_path):
+        """fsync temp_path and rename it to output_path"""
+        started = time.perf_counter()
+        try:
+            if os.path.exists(temp_path):
+                with open(temp_path, 'rb+') as f:
+                    os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Error syncing temp file: {e}")
+        self._record_time("fsync_time", started)
+        
+        try:
+            if os.path.exists(temp_path):
+                started = time.perf_counter()
+                os.rename(temp_path, output_path)
+                self._record_time("rename_time", started)
+                print(f"Successfully renamed temp file to: {output_path}")
+                
+                started = time.perf_counter()
+                try:
+                    with open(output_path, 'rb+') as f:
+                        os.fsync(f.fileno())
+                except Exception as e:
+                    print(f"Error syncing final file: {e}")
+                self._record_time("fsync_time", started)
+                return True
+            else:
+                print(f"Warning: Temp file does not exist: {temp_path}")
+                return False
+        except Exception as e:
+            print(f"Error renaming temp file: {e}")
+            return False
+        
+    def _finish_multi_export(self, success):
+        """Commit every output of a multi-output export and report each one"""
+        results = []
+        for output_path, temp_path in self.output_targets:
+            # An output the graph never wrote to is a failure even if FFmpeg exited cleanly
+            ok = success and os.path.exists(temp_path) and os.path.getsize(temp_path) > 0
+            ok = ok and self._commit_temp_file(temp_path, output_path)
+            if not ok:
+                try:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                        print(f"Removed temp file: {temp_path}")
+                except Exception as e:
+                    print(f"Error cleaning up temp file: {e}")
+            self.output_finished.emit(output_path, ok)
+            results.append(ok)
+        
+        self.output_targets = []
+        self.current_process = None
+        self.export_finished.emit(self.output_file, all(results))
+        self._write_telemetry(all(results))
+    
+    # --------------------------------------------------
+    # Telemetry
+    # --------------------------------------------------
+    def _process_started(self):
+        if self.telemetry:
+            self.telemetry.process_started()
+    
+    def _record_time(self, name, started):
+        if self.telemetry:
+            self.telemetry.add_time(name, time.perf_counter() - started)
+    
+    def _write_telemetry(self, success):
+        """Finish the current telemetry record and append it to the export log"""
+        if self.telemetry is None:
+            return
+        record = self.telemetry.finish(success, self._exit_code, self.abort_requested)
+        self.telemetry = None
+        self._exit_code = None
+        telemetry_log.append(record)
     
     def _cleanup_temp_file(self):
         """Clean up temporary file"""
@@ -485,6 +485,23 @@ class VideoProcessor(QObject):
     def abort_processing(self):
         """Abort current FFmpeg process"""
         self.abort_requested = True
+        if self.is_paused:
+            self.resume_processing()
+        if self.current_plan is not None and self._running_steps:
+            print(f"Terminating {len(self._running_steps)} FFmpeg process(es)...")
+            for process in list(self._running_steps):
+                process.terminate()
+            for process in list(self._running_steps):
+                if not process.waitForFinished(3000):
+                    process.kill()
+                    process.waitForFinished(2000)
+            if self.is_processing:
+                # Steps that never reported back still need the export closed out
+                self._plan_failed = True
+                self._running_steps = {}
+                self._finish_export(False)
+            return
+        
         if self.current_process and self.current_process.state() == QProcess.Running:
             print("Terminating FFmpeg process...")
             
@@ -502,105 +519,50 @@ class VideoProcessor(QObject):
                 self.is_processing = False
                 print("FFmpeg process terminated successfully")
     
+    def _active_processes(self):
+        if self.current_plan is not None:
+            return list(self._running_steps)
+        return [self.current_process] if self.current_process else []
+        
+    def _signal_processes(self, sig):
+        if not hasattr(signal, "SIGSTOP"):
+            print("Pausing exports is not supported on this platform")
+            return False
+        
+        for process in self._active_processes():
+            pid = process.processId()
+            if process.state() == QProcess.Running and pid > 0:
+                try:
+                    os.kill(pid, sig)
+                except OSError as e:
+                    print(f"Error signalling FFmpeg process {pid}: {e}")
+                    return False
+        return True
+        
+    def pause_processing(self):
+        """Suspend running FFmpeg processes"""
+        if not self.is_processing or self.is_paused:
+            return False
+        if self._signal_processes(signal.SIGSTOP):
+            self.is_paused = True
+            return True
+        return False
+        
+    def resume_processing(self):
+        """Continue FFmpeg processes suspended by pause_processing"""
+        if not self.is_paused:
+            return False
+        self._signal_processes(signal.SIGCONT)
+        self.is_paused = False
+        if self.current_plan is not None and not self._fill_worker_pool():
+            self._plan_failed = True
+            self._abort_running_steps()
+            self._finish_export(False)
+        return True
+    
     def wait_for_completion(self, timeout_ms=5000):
         """Wait for FFmpeg process to complete"""
         if self.current_process and self.current_process.state() == QProcess.Running:
             print(f"Waiting for FFmpeg to complete (timeout: {timeout_ms}ms)...")
             return self.current_process.waitForFinished(timeout_ms)
         return True
-
-    def is_vc1_video(self, input_path):
-        """Check if video uses VC-1 codec family"""
-        try:
-            cmd = [
-                "ffprobe", "-v", "error", 
-                "-select_streams", "v:0",
-                "-show_entries", "stream=codec_name",
-                "-of", "json", input_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            data = json.loads(result.stdout)
-            
-            if "streams" in data and len(data["streams"]) > 0:
-                codec_name = data["streams"][0].get("codec_name", "").lower()
-                return codec_name in ["wmv3", "vc1", "wmva", "wmvp", "wmv1", "wmv2"]
-        except Exception as e:
-            print(f"Error checking VC-1: {e}")
-        return False
-
-    def build_vc1_conversion_command(self, input_path, output_path, settings, start_time, duration, video_filters):
-        """Build special FFmpeg command for converting VC-1/WMV videos"""
-        cmd = ["ffmpeg", "-y"]
-        
-        # For VC-1, use -ss after -i for better accuracy
-        cmd.extend(["-i", input_path])
-        cmd.extend(["-ss", str(start_time), "-t", str(duration)])
-        
-        # Get target codec from settings
-        video_codec = settings.get("video_codec", "H264")
-        crf_value = settings.get("crf_value", 23)
-        
-        # Set video codec and parameters
-        if video_codec == "H265":
-            cmd.extend(["-c:v", "libx265"])
-            cmd.extend(["-crf", str(crf_value)])
-            cmd.extend(["-preset", "medium"])
-            cmd.extend(["-tag:v", "hvc1"])  # For better compatibility
-        elif video_codec == "VP9":
-            cmd.extend(["-c:v", "libvpx-vp9"])
-            cmd.extend(["-crf", str(crf_value)])
-            cmd.extend(["-b:v", "0"])  # Variable bitrate for VP9
-        else:  # Default to H.264
-            cmd.extend(["-c:v", "libx264"])
-            cmd.extend(["-crf", str(crf_value)])
-            cmd.extend(["-preset", "medium"])
-        
-        # Audio settings
-        audio_format = settings.get("video_audio_format", "AAC")
-        audio_bitrate = settings.get("video_audio_bitrate", "192")
-        
-        if audio_format == "MP3":
-            cmd.extend(["-c:a", "libmp3lame", "-b:a", f"{audio_bitrate}k"])
-        else:
-            cmd.extend(["-c:a", "aac", "-b:a", f"{audio_bitrate}k"])
-        
-        # Build filter chain
-        filter_chain = []
-        
-        # Add transformation filters
-        if video_filters:
-            filter_chain.append(video_filters)
-        
-        # Add scale filter for resolution change
-        resolution = settings.get("resolution", "Original")
-        if resolution != "Original":
-            res_params = self._get_resolution_params(settings, input_path)
-            if res_params:
-                scale_filter = res_params[1] if len(res_params) > 1 else ""
-                if scale_filter:
-                    filter_chain.append(scale_filter)
-        
-        # Combine all filters
-        if filter_chain:
-            combined_filters = ",".join(filter_chain)
-            cmd.extend(["-vf", combined_filters])
-        
-        # Add faststart for MP4 files
-        if output_path.endswith('.mp4'):
-            cmd.extend(["-movflags", "+faststart"])
-        
-        # Compatibility flags
-        cmd.extend(["-strict", "-2"])  # Allow experimental codecs
-        cmd.extend(["-pix_fmt", "yuv420p"])  # Ensure compatibility
-        
-        cmd.append(output_path)
-        
-        # Debug output
-        print(f"\n=== VC-1 CONVERSION COMMAND ===")
-        print(f"Target codec: {video_codec}")
-        print(f"Video filters: {video_filters}")
-        print(f"Full command: {' '.join(cmd)}")
-        print(f"===================================\n")
-        
-        return cmd
@@ -0,0 +1,288 @@
+# --------------------------------------------------
+# Audio waveform peaks computed from streamed PCM
+# --------------------------------------------------
+import io
+import os
+import zlib
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .media_cache import media_cache
+from .media_probe import probe_media
+from .utils import background_popen_kwargs, debug_print
+
+# NumPy is imported where it is used: this module loads with the main window,
+# and NumPy is only needed once peaks are computed or read from the cache
+
+# Mono 8 kHz is plenty for an overview and keeps the decode cheap
+PEAK_SAMPLE_RATE = 8000
+PEAK_BLOCK = 64
+CHUNK_BLOCKS = 4096
+
+
+def reduce_peaks(samples, block=PEAK_BLOCK):
+    """Min/max of every complete block of samples, as two int16 arrays"""
+    import numpy as np
+    usable = len(samples) - len(samples) % block
+    if usable <= 0:
+        return np.empty(0, np.int16), np.empty(0, np.int16)
+    blocks = samples[:usable].reshape(-1, block)
+    return blocks.min(axis=1), blocks.max(axis=1)
+
+
+class WaveformPeaks:
+    """Min/max peak pyramid of a file's first audio stream.
+
+    Level 0 holds one min/max pair per PEAK_BLOCK samples at
+    PEAK_SAMPLE_RATE; each further level halves the resolution, down to a
+    few hundred pairs for the whole file. Values are int16 sample units.
+    """
+
+    def __init__(self, mins, maxs, peaks_per_second=PEAK_SAMPLE_RATE / PEAK_BLOCK):
+        import numpy as np
+        self.peaks_per_second = peaks_per_second
+        self.levels = [(np.asarray(mins, np.int16), np.asarray(maxs, np.int16))]
+        while len(self.levels[-1][0]) > 512:
+            mins, maxs = self.levels[-1]
+            usable = len(mins) - len(mins) % 2
+            self.levels.append((
+                np.minimum(mins[:usable:2], mins[1:usable:2]),
+                np.maximum(maxs[:usable:2], maxs[1:usable:2]),
+            ))
+
+    def __len__(self):
+        return len(self.levels[0][0])
+
+    @property
+    def duration(self):
+        return len(self) / self.peaks_per_second
+
+    def columns(self, start, end, width):
+        """Min/max per pixel column for the time range start..end (seconds), scaled to -1..1.
+
+        Reads from the coarsest level that still has a pair per column, so
+        the cost depends on the width and not on the file length.
+        """
+        import numpy as np
+        if width <= 0 or end <= start or not len(self):
+            return np.zeros(0), np.zeros(0)
+
+        level = 0
+        while (level + 1 < len(self.levels)
+               and (end - start) * self.peaks_per_second / (2 ** (level + 1)) >= width):
+            level += 1
+        mins, maxs = self.levels[level]
+        rate = self.peaks_per_second / (2 ** level)
+
+        count = len(mins)
+        edges = np.clip(np.linspace(start * rate, end * rate, width + 1).astype(np.int64), 0, count)
+        # reduceat covers lo[i]:lo[i + 1], and the last column runs to stop
+        stop = max(int(edges[-1]), min(count, int(edges[0]) + 1))
+        valid = edges[:-1] < count
+        lo = np.minimum(edges[:-1], stop - 1)
+
+        col_min = np.where(valid, np.minimum.reduceat(mins[:stop], lo), 0) / 32768.0
+        col_max = np.where(valid, np.maximum.reduceat(maxs[:stop], lo), 0) / 32768.0
+        return col_min, col_max
+
+    def to_bytes(self):
+        import numpy as np
+        buffer = io.BytesIO()
+        np.savez(buffer, mins=self.levels[0][0], maxs=self.levels[0][1],
+                 rate=np.array([self.peaks_per_second]))
+        return zlib.compress(buffer.getvalue())
+
+    @classmethod
+    def from_bytes(cls, data):
+        import numpy as np
+        with np.load(io.BytesIO(zlib.decompress(data))) as arrays:
+            return cls(arrays["mins"], arrays["maxs"], float(arrays["rate"][0]))
+
+
+# --------------------------------------------------
+# Peak computation service
+# --------------------------------------------------
+class WaveformBuilder:
+    """Streams decoded PCM from FFmpeg through reduce_peaks on a background thread.
+
+    PCM is read in fixed chunks of CHUNK_BLOCKS blocks, so memory stays
+    bounded however long the file is. Results are kept in memory and in
+    the media cache per file version.
+    """
+    CACHE_KIND = "waveform"
+
+    def __init__(self, ffmpeg_path="ffmpeg", max_entries=8, disk_cache=None):
+        self.ffmpeg_path = ffmpeg_path
+        self.max_entries = max_entries
+        self.disk_cache = disk_cache
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._processes = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _cache_key(self, file_path):
+        try:
+            st = os.stat(file_path)
+        except (OSError, TypeError, ValueError):
+            return None
+        return (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+
+    def cached(self, file_path) -> Optional[WaveformPeaks]:
+        """Return the peaks if already computed, without decoding"""
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        peaks = self._load_from_disk(file_path)
+        if peaks is not None:
+            self._remember(key, peaks)
+        return peaks
+
+    def build(self, file_path) -> Optional[WaveformPeaks]:
+        """Return the peaks for file_path, decoding its audio if needed (blocking)"""
+        peaks = self.cached(file_path)
+        if peaks is not None:
+            return peaks
+
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+        peaks = self._compute(key, file_path)
+        if peaks is not None:
+            self._remember(key, peaks)
+            if self.disk_cache is not None:
+                self.disk_cache.put(file_path, self.CACHE_KIND, peaks.to_bytes())
+        return peaks
+
+    def request(self, file_path, callback=None):
+        """Compute peaks in the background; callback(file_path, peaks) runs on the worker thread"""
+        key = self._cache_key(file_path)
+        if key is None:
+            return None
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="waveform")
+                future = self._executor.submit(self.build, file_path)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget_pending(key))
+
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(file_path, None if f.cancelled() or f.exception() else f.result()))
+        return future
+
+    def cancel(self, keep_path=None):
+        """Stop pending and running decodes, except those of keep_path"""
+        keep = os.path.abspath(keep_path) if keep_path else None
+        with self._lock:
+            futures = [future for key, future in self._pending.items() if key[0] != keep]
+            processes = [proc for key, proc in self._processes.items() if key[0] != keep]
+        # Cancelling runs done callbacks, which take the lock
+        for future in futures:
+            future.cancel()
+        for proc in processes:
+            proc.kill()
+
+    def shutdown(self):
+        self.cancel()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _remember(self, key, peaks):
+        with self._lock:
+            self._cache[key] = peaks
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def _forget_pending(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def _load_from_disk(self, file_path):
+        if self.disk_cache is None:
+            return None
+        data = self.disk_cache.get(file_path, self.CACHE_KIND)
+        if data is None:
+            return None
+        try:
+            return WaveformPeaks.from_bytes(data)
+        except Exception as e:
+            print(f"Waveform cache entry unreadable: {e}")
+            return None
+
+    def _compute(self, key, file_path):
+        import numpy as np
+        probe = probe_media(file_path)
+        if not probe or not probe.has_audio:
+            return None
+
+        cmd = [
+            self.ffmpeg_path, "-v", "error",
+            "-i", file_path,
+            "-map", "0:a:0", "-vn",
+            "-ac", "1", "-ar", str(PEAK_SAMPLE_RATE),
+            "-f", "s16le", "pipe:1"
+        ]
+
+        chunk_bytes = PEAK_BLOCK * CHUNK_BLOCKS * 2
+        mins, maxs = [], []
+        remainder = np.empty(0, np.int16)
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    **background_popen_kwargs())
+        except Exception as e:
+            print(f"Error computing waveform of {file_path}: {e}")
+            return None
+
+        with self._lock:
+            self._processes[key] = proc
+        try:
+            while True:
+                data = proc.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                samples = np.frombuffer(data[:len(data) - len(data) % 2], np.int16)
+                if len(remainder):
+                    samples = np.concatenate((remainder, samples))
+                chunk_min, chunk_max = reduce_peaks(samples)
+                mins.append(chunk_min)
+                maxs.append(chunk_max)
+                remainder = samples[len(chunk_min) * PEAK_BLOCK:]
+            proc.wait()
+        finally:
+            proc.stdout.close()
+            with self._lock:
+                self._processes.pop(key, None)
+
+        if proc.returncode != 0:
+            # Killed by cancel() or a decode error; a partial result is not cached
+            print(f"Waveform decode stopped for {os.path.basename(file_path)} (code {proc.returncode})")
+            return None
+
+        if len(remainder):
+            mins.append(np.array([remainder.min()], np.int16))
+            maxs.append(np.array([remainder.max()], np.int16))
+
+        peaks = WaveformPeaks(
+            np.concatenate(mins) if mins else np.empty(0, np.int16),
+            np.concatenate(maxs) if maxs else np.empty(0, np.int16),
+        )
+        debug_print(f"Waveform: {len(peaks)} peak(s), {len(peaks.levels)} level(s) for {os.path.basename(file_path)}")
+        return peaks
+
+
+waveform_builder = WaveformBuilder(disk_cache=media_cache)
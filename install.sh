@@ -138,7 +138,7 @@ install_python_requirements() {
     pip install -r "$REQUIREMENTS_FILE"
     
     # Install additional packages if needed
-    pip install PyQt5 qtawesome opencv-python
+    pip install PyQt5 qtawesome numpy
     
     print_success "Python requirements installed"
 }
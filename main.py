@@ -7,8 +7,10 @@ License: MIT-X11
 
 import sys
 import os
+import time
 import warnings
 import argparse
+import importlib
 from pathlib import Path
 
 # --------------------------------------------------
@@ -53,8 +55,14 @@ def show_help():
     print("  -h, --help              Show this help message")
     print("  -v, --version           Show version information")
     print("  --debug                 Enable debug mode")
+    print("  --profile-startup [OUT] Write a startup timeline (Chrome trace JSON)")
+    print("\nHeadless commands (no GUI):")
+    print("  export INPUT [OPTIONS]  Export one clip, see 'export --help'")
+    print("  batch MANIFEST          Export every clip in a JSON/CSV manifest, see 'batch --help'")
     print("\nExamples:")
     print(f"  {os.path.basename(sys.argv[0])} video.mp4      Open video.mp4")
+    print(f"  {os.path.basename(sys.argv[0])} export video.mp4 --in 10 --out 25 -f mp4 -o clip.mp4")
+    print(f"  {os.path.basename(sys.argv[0])} batch clips.csv --jobs 4 --report report.csv")
     print(f"  {os.path.basename(sys.argv[0])} --version      Show version")
     print(f"  {os.path.basename(sys.argv[0])} --help         Show help")
 
@@ -65,26 +73,11 @@ def check_dependencies():
     Returns:
         bool: True if all dependencies are available, False otherwise
     """
-    missing_deps = []
+    from core.ffmpeg_caps import capability_registry
     
-    # Check for ffmpeg
-    try:
-        import subprocess
-        result = subprocess.run(['ffmpeg', '-version'], 
-                              capture_output=True, text=True)
-        if result.returncode != 0:
-            missing_deps.append("ffmpeg")
-    except FileNotFoundError:
-        missing_deps.append("ffmpeg")
-    
-    # Check for ffprobe
-    try:
-        result = subprocess.run(['ffprobe', '-version'], 
-                              capture_output=True, text=True)
-        if result.returncode != 0:
-            missing_deps.append("ffprobe")
-    except FileNotFoundError:
-        missing_deps.append("ffprobe")
+    # Cached per ffmpeg/ffprobe binary; only the first launch after an update runs them
+    capability_registry.capabilities()
+    missing_deps = capability_registry.missing
     
     if missing_deps:
         print("ERROR: Missing required dependencies:")
@@ -98,6 +91,115 @@ def check_dependencies():
     
     return True
 
+# --------------------------------------------------
+# Headless Export Commands
+# --------------------------------------------------
+HEADLESS_COMMANDS = ("export", "batch")
+
+def run_headless(argv):
+    """
+    Run the 'export' or 'batch' command without starting Qt.
+    
+    Args:
+        argv (list): Command line arguments after the program name
+    
+    Returns:
+        int: 0 if every job succeeded, 1 if any failed, 2 on usage errors
+    """
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])}",
+                                     description=f"{APP_NAME} headless export")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="Export a single clip")
+    export_parser.add_argument("input", help="Input video file")
+    export_parser.add_argument("--in", dest="start", help="Start time (seconds or HH:MM:SS.mmm)")
+    export_parser.add_argument("--out", dest="end", help="End time (default: end of file)")
+    export_parser.add_argument("-o", "--output", help="Output file (default: NamaCut output folder)")
+    export_parser.add_argument("-f", "--format", default="original",
+                               help="original, mp4, mkv, webm, mp3, aac or flac")
+    export_parser.add_argument("--codec", help="h264, h265 or vp9")
+    export_parser.add_argument("--crf", type=int, help="Quality for re-encoding (lower is better)")
+    export_parser.add_argument("--resolution", help="4K, 2K, 1080p, 720p or 480p")
+    export_parser.add_argument("--audio-bitrate", help="Audio bitrate in kbps")
+    export_parser.add_argument("--crop", help="Crop rectangle as w:h:x:y")
+    export_parser.add_argument("--rotate", type=int, default=0, help="Rotate by 90, 180 or 270 degrees")
+    export_parser.add_argument("--hflip", action="store_true", help="Flip horizontally")
+    export_parser.add_argument("--vflip", action="store_true", help="Flip vertically")
+    export_parser.add_argument("--smart-cut", action="store_true", help="Frame-accurate cut in original mode")
+    
+    batch_parser = subparsers.add_parser("batch", help="Export all clips listed in a manifest")
+    batch_parser.add_argument("manifest", help="JSON or CSV manifest (columns: file, in, out, format, crop, rotate, ...)")
+    batch_parser.add_argument("-j", "--jobs", type=int, help="Clips exported at the same time (default: half the CPUs)")
+    batch_parser.add_argument("-o", "--output-dir", help="Directory for outputs without an explicit 'output'")
+    batch_parser.add_argument("--report", help="Write per-job results to a .csv or .jsonl file")
+    
+    for sub in (export_parser, batch_parser):
+        sub.add_argument("--verbose", action="store_true", help="Show FFmpeg commands and debug output")
+    
+    args = parser.parse_args(argv)
+    
+    if not check_dependencies():
+        return 2
+    
+    from core.batch import (ManifestError, ResultReport, job_from_entry, jobs_from_manifest, run_batch)
+    from core.utils import set_debug_output
+    
+    # The command builders print every FFmpeg command; errors are printed either way
+    set_debug_output(args.verbose)
+    
+    report = ResultReport(args.report) if getattr(args, "report", None) else None
+    counts = {"ok": 0, "failed": 0}
+    
+    def on_result(result):
+        status = "  ok" if result.success else "FAIL"
+        line = (f"[{status}] {result.wall_time:7.2f}s  exit={result.exit_code:<4} "
+                f"{result.realtime_factor:6.1f}x  {result.input_path} -> {result.output_path}")
+        if result.error:
+            line += f"\n        {result.error}"
+        print(line, flush=True)
+        if report:
+            report.write(result)
+    
+    def on_entry_error(result):
+        counts["failed"] += 1
+        on_result(result)
+    
+    started = time.monotonic()
+    try:
+        if args.command == "export":
+            entry = {
+                "file": args.input, "in": args.start, "out": args.end, "output": args.output,
+                "format": args.format, "codec": args.codec, "crf": args.crf,
+                "resolution": args.resolution, "audio_bitrate": args.audio_bitrate,
+                "crop": args.crop, "rotate": args.rotate, "hflip": args.hflip,
+                "vflip": args.vflip, "smart_cut": args.smart_cut
+            }
+            try:
+                jobs = [job_from_entry({k: v for k, v in entry.items() if v is not None}, os.getcwd())]
+            except (ManifestError, ValueError) as e:
+                print(f"ERROR: {e}", file=sys.stderr)
+                return 2
+            succeeded, failed = run_batch(jobs, max_jobs=1, on_result=on_result)
+        else:
+            if not os.path.isfile(args.manifest):
+                print(f"ERROR: Manifest not found: {args.manifest}", file=sys.stderr)
+                return 2
+            jobs = jobs_from_manifest(args.manifest, args.output_dir, on_entry_error)
+            succeeded, failed = run_batch(jobs, max_jobs=args.jobs, on_result=on_result)
+    except KeyboardInterrupt:
+        print("Interrupted, running FFmpeg processes were stopped", file=sys.stderr)
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if report:
+            report.close()
+    
+    failed += counts["failed"]
+    print(f"\n{succeeded} succeeded, {failed} failed in {time.monotonic() - started:.1f}s")
+    return 0 if failed == 0 else 1
+
 # --------------------------------------------------
 # Main Application Entry Point
 # --------------------------------------------------
@@ -105,9 +207,21 @@ def main():
     """
     Main entry point for the NamaCut application.
     """
+    started = time.perf_counter()
+    
     # Suppress deprecation warnings
     warnings.filterwarnings("ignore", category=DeprecationWarning)
     
+    # Headless commands never touch Qt
+    if len(sys.argv) > 1 and sys.argv[1] in HEADLESS_COMMANDS:
+        sys.exit(run_headless(sys.argv[1:]))
+    
+    # The core package imports its modules on first use; this phase tracks what it still loads eagerly
+    from core.startup_profile import startup_profiler
+    startup_profiler.origin = started
+    startup_profiler.add("import core", started, time.perf_counter(), "import")
+    argparse_started = time.perf_counter()
+    
     # --------------------------------------------------
     # Command Line Argument Parsing
     # --------------------------------------------------
@@ -150,6 +264,14 @@ Website: {WEBSITE}
         help='Enable debug mode'
     )
     
+    parser.add_argument(
+        '--profile-startup',
+        nargs='?',
+        const='namacut-startup-trace.json',
+        metavar='OUT',
+        help='Write a startup timeline as a Chrome trace JSON file'
+    )
+    
     # For compatibility with older versions
     parser.add_argument(
         '-V', 
@@ -159,6 +281,7 @@ Website: {WEBSITE}
     )
     
     args = parser.parse_args()
+    startup_profiler.add("argparse", argparse_started, time.perf_counter())
     
     # --------------------------------------------------
     # Handle Command Line Options
@@ -174,7 +297,9 @@ Website: {WEBSITE}
         sys.exit(0)
     
     # Check dependencies
-    if not check_dependencies():
+    with startup_profiler.phase("check_dependencies"):
+        dependencies_ok = check_dependencies()
+    if not dependencies_ok:
         sys.exit(1)
     
     # Enable debug if requested
@@ -198,9 +323,10 @@ Website: {WEBSITE}
     # Qt Application Setup
     # --------------------------------------------------
     try:
-        from PyQt5.QtWidgets import QApplication
-        from PyQt5.QtCore import QTimer, Qt
-        from PyQt5.QtGui import QIcon
+        with startup_profiler.phase("import PyQt5", "import"):
+            from PyQt5.QtWidgets import QApplication
+            from PyQt5.QtCore import QTimer, Qt, QObject, QEvent
+            from PyQt5.QtGui import QIcon
     except ImportError as e:
         print(f"ERROR: Failed to import PyQt5: {e}")
         print("\nPlease install PyQt5:")
@@ -212,7 +338,8 @@ Website: {WEBSITE}
         sys.exit(1)
     
     # Create QApplication instance
-    app = QApplication(sys.argv)
+    with startup_profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
     app.setApplicationName(APP_NAME)
     app.setApplicationVersion(APP_VERSION)
     app.setOrganizationName("Pourdaryaei")
@@ -235,10 +362,15 @@ Website: {WEBSITE}
         Returns:
             VideoEditor: The main application window instance
         """
-        from ui.main_window import VideoEditor
+        with startup_profiler.phase("import qtawesome", "import"):
+            # Imported here only to time it on its own; ui.main_window uses it
+            importlib.import_module("qtawesome")
+        with startup_profiler.phase("import ui.main_window", "import"):
+            from ui.main_window import VideoEditor
         
         try:
-            editor = VideoEditor()
+            with startup_profiler.phase("VideoEditor.__init__"):
+                editor = VideoEditor()
             
             # Load video file if provided via command line
             if args.file:
@@ -247,12 +379,15 @@ Website: {WEBSITE}
                 
                 # Small delay to ensure UI is ready
                 def load_video():
-                    success = editor.load_video_file(video_path)
-                    if not success:
-                        print(f"Warning: Could not load video: {video_path}")
+                    with startup_profiler.phase("load_video_file"):
+                        editor.load_video_file(video_path)
                 
+                startup_profiler.mark("load_video_file scheduled")
                 QTimer.singleShot(300, load_video)
             
+            if args.profile_startup:
+                watch_startup(editor)
+            
             editor.show()
             
             # Center window on screen
@@ -271,6 +406,45 @@ Website: {WEBSITE}
             app.quit()
             sys.exit(1)
     
+    # --------------------------------------------------
+    # Startup Profiling
+    # --------------------------------------------------
+    def write_startup_profile():
+        metadata = {"app": APP_NAME, "version": APP_VERSION, "file": args.file or ""}
+        startup_profiler.write(args.profile_startup, metadata)
+    
+    def watch_startup(editor):
+        """
+        Record the first paint and the end of file loading, then write the profile.
+        
+        Parameters:
+            editor (VideoEditor): The main window being shown
+        """
+        def maybe_write():
+            if startup_profiler.written or not startup_profiler.has("first paint"):
+                return
+            if args.file and not startup_profiler.has("media loaded"):
+                return
+            write_startup_profile()
+        
+        class FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint and obj.isWidgetType() and obj.window() is editor:
+                    startup_profiler.mark("first paint")
+                    app.removeEventFilter(self)
+                    # Written after this paint has finished
+                    QTimer.singleShot(0, maybe_write)
+                return False
+        
+        editor._first_paint_filter = FirstPaintFilter()
+        app.installEventFilter(editor._first_paint_filter)
+        
+        def on_media_loaded(media):
+            startup_profiler.mark("media loaded")
+            maybe_write()
+        
+        editor.media_loaded.connect(on_media_loaded)
+    
     # Create main window
     editor = create_app()
     
@@ -279,6 +453,9 @@ Website: {WEBSITE}
     # --------------------------------------------------
     exit_code = app.exec_()
     
+    if args.profile_startup and not startup_profiler.written:
+        write_startup_profile()
+    
     # Cleanup before exit
     if hasattr(editor, 'video_processor'):
         editor.video_processor.abort_processing()
@@ -10,6 +10,9 @@ from .advanced_settings import AdvancedSettingsDialog
 from .widgets import IconButton, VideoPlayer
 from .media_player import MediaPlayer
 from .crop_widget import CropOverlay
+from .thumbnail_strip import ThumbnailStrip
+from .waveform_lane import WaveformLane
+from .silence_dialog import SilenceDialog
 
 # Optional: Define what gets imported with "from ui import *"
 __all__ = [
@@ -20,5 +23,8 @@ __all__ = [
     'IconButton',
     'VideoPlayer',
     'MediaPlayer',
-    'CropOverlay'
+    'CropOverlay',
+    'ThumbnailStrip',
+    'WaveformLane',
+    'SilenceDialog'
 ]
\ No newline at end of file
@@ -5,25 +5,43 @@
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTabWidget, 
                             QWidget, QLabel, QComboBox, QSlider, QLineEdit,
-                            QGroupBox, QDialogButtonBox, QGridLayout)
-from PyQt5.QtCore import Qt
+                            QGroupBox, QDialogButtonBox, QGridLayout, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 import qtawesome as qta
+from core.size_estimator import size_estimator
 
 # --------------------------------------------------
 # Class: AdvancedSettingsDialog
 # Description: Advanced output settings dialog for video and audio configuration
 # --------------------------------------------------
 class AdvancedSettingsDialog(QDialog):
-    def __init__(self, parent=None, settings=None):
+    # Emitted from the estimator thread; queued to the dialog's thread
+    estimate_ready = pyqtSignal(int, object)
+    
+    def __init__(self, parent=None, settings=None, input_path=None, time_range=None, video_filters=None):
         """
         Constructor for AdvancedSettingsDialog
         
         Parameters:
             parent (QWidget, optional): Parent widget. Default: None
             settings (dict, optional): Current application settings. Default: None
+            input_path (str, optional): Loaded file, used for sample-encode size estimates. Default: None
+            time_range (tuple, optional): Selected (start, end) in seconds. Default: whole file
+            video_filters (str, optional): Crop/rotate/flip filters of the export. Default: None
         """
         super().__init__(parent)
         self.settings = settings or {}  # Store current settings
+        self.input_path = input_path
+        self.time_range = time_range
+        self.video_filters = video_filters
+        self.estimate_generation = None  # Newest sample-encode request
+        
+        # Sample encodes start once the controls have been still for a moment
+        self.estimate_timer = QTimer(self)
+        self.estimate_timer.setSingleShot(True)
+        self.estimate_timer.setInterval(400)
+        self.estimate_timer.timeout.connect(self.request_sample_estimate)
+        self.estimate_ready.connect(self.on_estimate_ready)
         
         # Dialog styling
         self.setStyleSheet("""
@@ -61,6 +79,23 @@ class AdvancedSettingsDialog(QDialog):
         
         layout.addWidget(self.tab_widget)
         
+        # Playback option shared by both tabs
+        self.use_proxies_check = QCheckBox("Use low-resolution preview proxies for heavy videos")
+        self.use_proxies_check.setToolTip(
+            "4K, HEVC/AV1/VP9 above 1080p and VC-1 files are transcoded to a\n"
+            "small 360p copy in the background for smooth scrubbing.\n"
+            "Exports always read the original file."
+        )
+        layout.addWidget(self.use_proxies_check)
+        
+        self.detect_scenes_check = QCheckBox("Detect scene changes in the background")
+        self.detect_scenes_check.setToolTip(
+            "Scans loaded videos at low priority for scene cuts, which are\n"
+            "marked on the timeline for navigation and In/Out snapping.\n"
+            "Results are cached per file."
+        )
+        layout.addWidget(self.detect_scenes_check)
+        
         # Dialog buttons (OK/Cancel)
         button_box = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel
@@ -97,6 +132,34 @@ class AdvancedSettingsDialog(QDialog):
         self.video_codec_combo.addItems(["Original", "H.264 (libx264)", "H.265 (libx265)", "VP9 (libvpx-vp9)"])
         format_layout.addWidget(self.video_codec_combo, 1, 1)
         
+        # Smart cut re-encodes only the GOPs around the cut points (copy mode only)
+        self.smart_cut_check = QCheckBox("Frame-accurate cut (re-encode only around cut points)")
+        self.smart_cut_check.setToolTip(
+            "Keyframe copy snaps the start to the previous keyframe.\n"
+            "Smart cut re-encodes the partial GOPs at the in and out points\n"
+            "and stream-copies everything in between."
+        )
+        format_layout.addWidget(self.smart_cut_check, 2, 0, 1, 2)
+        
+        # Parallel encoding splits long ranges at keyframes (re-encode modes only)
+        self.parallel_export_check = QCheckBox("Parallel encoding (split long ranges into chunks)")
+        self.parallel_export_check.setToolTip(
+            "Encodes keyframe-aligned chunks in several FFmpeg processes\n"
+            "at once and joins them losslessly. Ranges shorter than about\n"
+            "40 seconds are always encoded in one process."
+        )
+        format_layout.addWidget(self.parallel_export_check, 3, 0, 1, 2)
+        
+        # Resumable export keeps finished chunks across aborts and crashes (re-encode modes only)
+        self.resumable_export_check = QCheckBox("Resumable export (keep finished chunks if interrupted)")
+        self.resumable_export_check.setToolTip(
+            "Encodes ranges longer than about two minutes in one-minute,\n"
+            "keyframe-aligned chunks kept next to the output. Exporting\n"
+            "the same range with the same settings after an abort or crash\n"
+            "continues from the last finished chunk."
+        )
+        format_layout.addWidget(self.resumable_export_check, 4, 0, 1, 2)
+        
         format_group.setLayout(format_layout)
         layout.addWidget(format_group)
         
@@ -190,6 +253,20 @@ class AdvancedSettingsDialog(QDialog):
         audio_bitrate_layout.addWidget(self.video_audio_bitrate_combo)
         audio_layout.addLayout(audio_bitrate_layout)
         
+        # Companion audio file, written from the same decode as the video
+        companion_layout = QHBoxLayout()
+        companion_layout.addWidget(QLabel("Also save audio as:"))
+        self.companion_audio_combo = QComboBox()
+        self.companion_audio_combo.addItems(["None", "MP3", "AAC (M4A)", "FLAC"])
+        self.companion_audio_combo.setToolTip(
+            "Writes a separate audio file alongside the video in the same\n"
+            "FFmpeg run, so the source is only decoded once.\n"
+            "Not available with frame-accurate cut."
+        )
+        companion_layout.addWidget(self.companion_audio_combo)
+        audio_layout.addLayout(companion_layout)
+        self.smart_cut_check.toggled.connect(self.update_companion_audio_state)
+        
         self.audio_group.setLayout(audio_layout)
         layout.addWidget(self.audio_group)
         
@@ -261,6 +338,9 @@ class AdvancedSettingsDialog(QDialog):
         self.quality_slider.valueChanged.connect(self.on_quality_slider_changed)
         self.video_audio_format_combo.currentTextChanged.connect(self.update_file_size_estimation)
         self.resolution_combo.currentTextChanged.connect(self.update_file_size_estimation)
+        self.video_codec_combo.currentTextChanged.connect(self.update_file_size_estimation)
+        self.video_audio_bitrate_combo.currentTextChanged.connect(self.update_file_size_estimation)
+        self.tab_widget.currentChanged.connect(self.update_file_size_estimation)
         self.audio_output_combo.currentTextChanged.connect(self.on_audio_format_changed)
         self.container_combo.currentTextChanged.connect(self.update_ui_state)
         
@@ -294,6 +374,9 @@ class AdvancedSettingsDialog(QDialog):
             self.video_audio_bitrate_combo.setCurrentText("Original")
             
             self.file_size_label.setText("File size will match original (fast copy)")
+            self.smart_cut_check.setEnabled(True)
+            self.parallel_export_check.setEnabled(False)
+            self.resumable_export_check.setEnabled(False)
             
         elif "MP4" in container:
             self.video_codec_combo.setEnabled(True)
@@ -310,13 +393,25 @@ class AdvancedSettingsDialog(QDialog):
             self.video_codec_combo.addItems(["VP9 (libvpx-vp9)"])
             self.enable_all_controls()
         
+        self.update_companion_audio_state()
         self.update_file_size_estimation()
         
+    def update_companion_audio_state(self):
+        """
+        Enable the companion audio option unless smart cut will be used
+        Smart cut exports run as a multi-step plan with a single output
+        """
+        smart_cut = self.smart_cut_check.isEnabled() and self.smart_cut_check.isChecked()
+        self.companion_audio_combo.setEnabled(not smart_cut)
+        
     def enable_all_controls(self):
         """
         Enable all video-related controls
         Called when not in "Original - Copy" mode
         """
+        self.smart_cut_check.setEnabled(False)
+        self.parallel_export_check.setEnabled(True)
+        self.resumable_export_check.setEnabled(True)
         self.quality_slider.setEnabled(True)
         self.resolution_combo.setEnabled(True)
         self.video_audio_format_combo.setEnabled(True)
@@ -396,8 +491,24 @@ class AdvancedSettingsDialog(QDialog):
     def update_file_size_estimation(self):
         """
         Estimate output file size based on current settings
-        Updates the file size label with estimated MB per minute
+        Shows a rough MB-per-minute figure at once, then replaces it with
+        a sample-encode estimate of the loaded file (see request_sample_estimate)
         """
+        self.estimate_timer.stop()
+        self.estimate_generation = None
+        self.file_size_label.setToolTip("")
+        if "Original" in self.container_combo.currentText():
+            self.file_size_label.setText("File size will match original (fast copy)")
+            return
+        
+        estimate_settings = self.get_estimate_settings()
+        if estimate_settings is not None:
+            start_time, end_time = self.time_range
+            cached = size_estimator.cached(self.input_path, estimate_settings, start_time, end_time, self.video_filters)
+            if cached is not None:
+                self.show_sample_estimate(cached)
+                return
+        
         try:
             slider_value = self.quality_slider.value()
             crf_value = 29 - slider_value
@@ -438,11 +549,88 @@ class AdvancedSettingsDialog(QDialog):
             elif "AAC" in audio_format:
                 base_size_per_minute += 1.5
                 
-            self.file_size_label.setText(f"Estimated: ~{base_size_per_minute:.1f} MB per minute")
+            if estimate_settings is not None:
+                self.file_size_label.setText(f"Estimated: ~{base_size_per_minute:.1f} MB per minute (measuring...)")
+                self.estimate_timer.start()
+            else:
+                self.file_size_label.setText(f"Estimated: ~{base_size_per_minute:.1f} MB per minute")
             
         except Exception as e:
             print(f"Error estimating file size: {e}")
             self.file_size_label.setText("Estimated file size: --")
+    
+    def get_estimate_settings(self):
+        """
+        Get the export settings to sample-encode with
+        
+        Returns:
+            dict or None: Settings as they would be saved, or None when there is
+            no file, no range or the audio tab is selected
+        """
+        if not self.input_path or not self.time_range or self.tab_widget.currentIndex() != 0:
+            return None
+        start_time, end_time = self.time_range
+        if end_time <= start_time:
+            return None
+        return dict(self.settings, **self.get_updated_settings())
+        
+    def request_sample_estimate(self):
+        """
+        Start encoding samples of the loaded file with the current settings
+        Called by estimate_timer; only the newest request is reported back
+        """
+        estimate_settings = self.get_estimate_settings()
+        if estimate_settings is None or "Original" in self.container_combo.currentText():
+            return
+        start_time, end_time = self.time_range
+        self.estimate_generation = size_estimator.request(
+            self.input_path, estimate_settings, start_time, end_time, self.video_filters,
+            self.estimate_ready.emit
+        )
+        
+    def on_estimate_ready(self, generation, estimate):
+        """
+        Show a finished sample-encode estimate
+        
+        Parameters:
+            generation (int): Request the estimate belongs to
+            estimate (SizeEstimate or None): Result, or None if the samples failed
+        """
+        if generation != self.estimate_generation:
+            return
+        self.estimate_generation = None
+        if estimate is None:
+            self.file_size_label.setText(self.file_size_label.text().replace(" (measuring...)", ""))
+            return
+        self.show_sample_estimate(estimate)
+        
+    def show_sample_estimate(self, estimate):
+        """
+        Display an estimate as total size and encode time
+        
+        Parameters:
+            estimate (SizeEstimate): Extrapolated size and time of the selected range
+        """
+        size_mb = estimate.output_bytes / (1024 * 1024)
+        seconds = int(round(estimate.encode_seconds))
+        encode_time = f"{seconds // 60}m {seconds % 60:02d}s" if seconds >= 60 else f"{max(seconds, 1)}s"
+        self.file_size_label.setText(f"Estimated: {size_mb:.1f} MB, about {encode_time} to encode")
+        self.file_size_label.setToolTip(
+            f"Measured by encoding {estimate.sampled:.1f}s of the selection "
+            f"in {estimate.samples} sample(s), {estimate.bitrate_kbps:.0f} kbps"
+        )
+        
+    def done(self, result):
+        """
+        Stop any sample encode when the dialog closes
+        
+        Parameters:
+            result (int): Dialog result code
+        """
+        self.estimate_timer.stop()
+        if self.estimate_generation is not None:
+            size_estimator.cancel()
+        super().done(result)
         
     def on_audio_format_changed(self):
         """
@@ -496,6 +684,21 @@ class AdvancedSettingsDialog(QDialog):
         
         self.on_container_changed()  # Update UI based on container
         
+        # Load cut mode
+        self.smart_cut_check.setChecked(self.settings.get("cut_mode", "keyframe") == "smart")
+        self.parallel_export_check.setChecked(self.settings.get("parallel_export", True))
+        self.resumable_export_check.setChecked(self.settings.get("resumable_export", False))
+        
+        # Load companion audio format
+        companion_formats = {"mp3": "MP3", "aac": "AAC (M4A)", "flac": "FLAC"}
+        companion_audio = self.settings.get("companion_audio_format", "none")
+        self.companion_audio_combo.setCurrentText(companion_formats.get(companion_audio, "None"))
+        self.update_companion_audio_state()
+        
+        # Load preview proxy option
+        self.use_proxies_check.setChecked(self.settings.get("use_proxies", True))
+        self.detect_scenes_check.setChecked(self.settings.get("detect_scenes", True))
+        
         # Load video codec
         video_codec = self.settings.get("video_codec", "Original")
         if video_codec in ["H.264 (libx264)", "H264"]:
@@ -581,11 +784,28 @@ class AdvancedSettingsDialog(QDialog):
         Returns:
             dict: Dictionary containing all current settings
         """
-        settings = {}
+        # Keys without a control in this dialog are carried over unchanged
+        settings = dict(self.settings)
+        
+        settings["use_proxies"] = self.use_proxies_check.isChecked()
+        settings["detect_scenes"] = self.detect_scenes_check.isChecked()
         
         if self.tab_widget.currentIndex() == 0:
             # Video export settings
             settings["audio_output_format"] = "none"
+            settings["cut_mode"] = "smart" if self.smart_cut_check.isChecked() else "keyframe"
+            settings["parallel_export"] = self.parallel_export_check.isChecked()
+            settings["resumable_export"] = self.resumable_export_check.isChecked()
+            
+            companion_text = self.companion_audio_combo.currentText()
+            if "MP3" in companion_text:
+                settings["companion_audio_format"] = "mp3"
+            elif "AAC" in companion_text:
+                settings["companion_audio_format"] = "aac"
+            elif "FLAC" in companion_text:
+                settings["companion_audio_format"] = "flac"
+            else:
+                settings["companion_audio_format"] = "none"
             
             container_text = self.container_combo.currentText()
             if "Original" in container_text:
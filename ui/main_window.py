@@ -5,23 +5,40 @@
 
 import os
 import sys
-import cv2
+import math
 import time
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QLabel,
                              QSlider, QFileDialog, QMessageBox, QProgressBar,
                              QComboBox, QGroupBox, QGridLayout, QSpinBox,
-                             QWidget, QSplitter, QDialog, QApplication, QPushButton)
-from PyQt5.QtCore import Qt, QTimer, QUrl
-from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QPainter, QColor, QTransform
+                             QWidget, QSplitter, QDialog, QApplication, QPushButton, QShortcut,
+                             QListWidget)
+from PyQt5.QtCore import Qt, QTimer, QUrl, pyqtSignal
+from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QPainter, QColor, QTransform, QKeySequence
 from PyQt5.QtMultimedia import QMediaContent
 import qtawesome as qta
 
 from ui.widgets import IconButton, VideoPlayer
 from ui.dialogs import AboutDialog
 from ui.advanced_settings import AdvancedSettingsDialog
+from ui.thumbnail_strip import ThumbnailStrip
+from ui.waveform_lane import WaveformLane
+from ui.silence_dialog import SilenceDialog
 from core.settings_manager import SettingsManager
 from core.video_processor import VideoProcessor
+from core.export_job import ExportJob
+from core.segments import SegmentList
+from core.job_queue import ExportScheduler
 from core.video_transformer import VideoTransformer
+from core.media_probe import probe_media
+from core.keyframe_index import keyframe_indexer
+from core.scene_index import scene_detector
+from core.silence import silence_analyzer
+from core.thumbnails import thumbnail_cache
+from core.waveform import waveform_builder
+from core.proxy import proxy_manager
+from core.size_estimator import size_estimator
+from core.media_loader import media_loader
+from core.startup_profile import startup_profiler
 from core.utils import *
 
 APP_VERSION = "2026"
@@ -32,25 +49,53 @@ APP_NAME = "NamaCut"
 # Enhanced QSlider with time range visualization
 # --------------------------------------------------
 class CustomSlider(QSlider):
+    time_range_changed = pyqtSignal(float, float, float)
+
     def __init__(self, orientation, parent=None):
         super().__init__(orientation, parent)
         self.start_time = 0
         self.end_time = 0
         self.total_duration = 0
+        self.keyframes = []
+        self.scene_cuts = []
+        self.segments = []
 
     def set_time_range(self, start, end, total):
         self.start_time = start
         self.end_time = end
         self.total_duration = total
+        self.time_range_changed.emit(start, end, total)
         self.update()
 
     def reset(self):
         self.start_time = 0
         self.end_time = 0
         self.total_duration = 0
+        self.keyframes = []
+        self.scene_cuts = []
+        self.segments = []
         self.setValue(0)
         self.update()
 
+    def set_keyframes(self, keyframes_ms):
+        self.keyframes = list(keyframes_ms)
+        self.update()
+
+    def set_scene_cuts(self, cuts_ms):
+        self.scene_cuts = list(cuts_ms)
+        self.update()
+
+    def set_segments(self, segments_ms):
+        """Shade these (start, end) ranges, numbered in export order, instead of the in/out range"""
+        self.segments = list(segments_ms)
+        self.update()
+
+    def snap_distance(self, pixels=6):
+        """Duration in milliseconds covered by the given number of pixels"""
+        if self.width() <= 0:
+            return 0
+        return self.total_duration * pixels / self.width()
+
     def paintEvent(self, event):
         super().paintEvent(event)
 
@@ -66,17 +111,67 @@ class CustomSlider(QSlider):
         start_pos = (start_time / self.total_duration) * self.width()
         end_pos = (end_time / self.total_duration) * self.width()
 
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QColor(63, 142, 147, 100))
-        painter.drawRect(int(start_pos), 0, int(end_pos - start_pos), self.height())
+        if self.segments:
+            self.paint_segments(painter, start_pos, end_pos)
+        else:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(63, 142, 147, 100))
+            painter.drawRect(int(start_pos), 0, int(end_pos - start_pos), self.height())
+
+            painter.setBrush(QColor(255, 0, 0, 50))
+
+            if start_pos > 0:
+                painter.drawRect(0, 0, int(start_pos), self.height())
+
+            if end_pos < self.width():
+                painter.drawRect(int(end_pos), 0, int(self.width() - end_pos), self.height())
+
+        # Keyframe ticks, skipped when they would merge into a solid bar
+        if self.keyframes and len(self.keyframes) < self.width() / 2:
+            painter.setPen(QColor(255, 255, 255, 140))
+            tick_top = self.height() - 5
+            for keyframe in self.keyframes:
+                x = int((keyframe / self.total_duration) * self.width())
+                painter.drawLine(x, tick_top, x, self.height())
+
+        # Scene cuts hang from the top edge
+        if self.scene_cuts:
+            painter.setPen(QColor(255, 170, 0, 220))
+            for cut in self.scene_cuts:
+                x = int((cut / self.total_duration) * self.width())
+                painter.drawLine(x, 0, x, 6)
+
+    def paint_segments(self, painter, start_pos, end_pos):
+        """Shade every segment, dim the parts left out, and outline the current in/out range"""
+        spans = sorted(
+            (min(start, self.total_duration) / self.total_duration * self.width(),
+             min(end, self.total_duration) / self.total_duration * self.width())
+            for start, end in self.segments
+        )
 
+        painter.setPen(Qt.NoPen)
         painter.setBrush(QColor(255, 0, 0, 50))
+        covered = 0.0
+        for left, right in spans:
+            if left > covered:
+                painter.drawRect(int(covered), 0, int(left - covered), self.height())
+            covered = max(covered, right)
+        if covered < self.width():
+            painter.drawRect(int(covered), 0, int(self.width() - covered), self.height())
 
-        if start_pos > 0:
-            painter.drawRect(0, 0, int(start_pos), self.height())
+        painter.setBrush(QColor(63, 142, 147, 100))
+        for left, right in spans:
+            painter.drawRect(int(left), 0, max(1, int(right - left)), self.height())
+
+        # Export order, which may differ from the order on the timeline
+        painter.setPen(QColor(255, 255, 255, 220))
+        for number, (start, _) in enumerate(self.segments, 1):
+            x = int(min(start, self.total_duration) / self.total_duration * self.width())
+            painter.drawText(x + 3, 11, str(number))
 
-        if end_pos < self.width():
-            painter.drawRect(int(end_pos), 0, int(self.width() - end_pos), self.height())
+        painter.setPen(QColor(63, 142, 147))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(int(start_pos), 0, max(1, int(end_pos - start_pos)), self.height() - 1)
 
 # --------------------------------------------------
 # ExportCompleteDialog Class
@@ -436,13 +531,24 @@ class AbortConfirmationDialog(QDialog):
 # Main application window
 # --------------------------------------------------
 class VideoEditor(QMainWindow):
+    keyframe_index_ready = pyqtSignal(str)
+    scene_index_ready = pyqtSignal(str)
+    proxy_ready = pyqtSignal(str, object)
+    media_loaded = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.video_path = None
+        self.keyframe_index = None
+        self.frame_table = None
+        self.scene_index = None
+        self.duration_estimated = False
+        self.proxy_info = None
         self.is_playing = False
         self.video_duration = 0
         self.start_time = 0
         self.end_time = 0
+        self.segments = SegmentList()
         self.last_output_file = None
         self.is_exporting = False
         self.background_timer = None
@@ -452,21 +558,26 @@ class VideoEditor(QMainWindow):
         self.video_processor = VideoProcessor()
         self.video_transformer = VideoTransformer()
         self.settings = self.settings_manager.load_settings()
+        self.export_scheduler = ExportScheduler(self.settings.get("queue_max_concurrent", 1))
 
         self.playback_timer = QTimer()
         self.playback_timer.timeout.connect(self.update_playback_position)
         self.playback_timer.setInterval(50)
 
         self.export_start_time = None
+        self.last_progress_event = None
         self.export_timer = QTimer()
         self.export_timer.timeout.connect(self.update_export_time)
         self.export_timer.setInterval(1000)
 
         self.export_status = "idle"
-        self.init_ui()
+        with startup_profiler.phase("init_ui"):
+            self.init_ui()
         self.setup_core_connections()
 
         self.update_format_display()
+        with startup_profiler.phase("restore export queue"):
+            self.export_scheduler.restore()
         self.check_command_line_args()
 
         self._reset_crop_state()
@@ -541,11 +652,19 @@ class VideoEditor(QMainWindow):
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(3)
 
+        self.prev_frame_btn = IconButton('fa5s.caret-left', ' -1f')
         self.fine_minus_btn = IconButton('fa5s.backward', ' -0.1s')
         self.minus_btn = IconButton('fa5s.step-backward', ' -1s')
         self.play_btn = IconButton('fa5s.play', ' Play')
         self.plus_btn = IconButton('fa5s.step-forward', ' +1s')
         self.fine_plus_btn = IconButton('fa5s.forward', ' +0.1s')
+        self.next_frame_btn = IconButton('fa5s.caret-right', ' +1f')
+        self.prev_frame_btn.setToolTip("Previous frame (,)")
+        self.next_frame_btn.setToolTip("Next frame (.)")
+        self.prev_scene_btn = IconButton('fa5s.angle-double-left', ' Scene')
+        self.next_scene_btn = IconButton('fa5s.angle-double-right', ' Scene')
+        self.prev_scene_btn.setToolTip("Previous scene cut ([)")
+        self.next_scene_btn.setToolTip("Next scene cut (])")
         self.set_in_btn = IconButton('fa5s.map-marker-alt', ' In ')
         self.set_out_btn = IconButton('fa5s.map-marker-alt', ' Out')
 
@@ -554,16 +673,31 @@ class VideoEditor(QMainWindow):
         self.play_btn.clicked.connect(self.toggle_play)
         self.plus_btn.clicked.connect(lambda: self.seek_video(1))
         self.fine_plus_btn.clicked.connect(lambda: self.seek_video(0.1))
+        self.prev_frame_btn.clicked.connect(lambda: self.step_frame(-1))
+        self.next_frame_btn.clicked.connect(lambda: self.step_frame(1))
+        self.prev_scene_btn.clicked.connect(lambda: self.jump_to_scene(-1))
+        self.next_scene_btn.clicked.connect(lambda: self.jump_to_scene(1))
         self.set_in_btn.clicked.connect(self.set_in_point)
         self.set_out_btn.clicked.connect(self.set_out_point)
 
-        for btn in [self.fine_minus_btn, self.minus_btn, self.play_btn,
-                    self.plus_btn, self.fine_plus_btn, self.set_in_btn, self.set_out_btn]:
+        QShortcut(QKeySequence(","), self, activated=lambda: self.step_frame(-1))
+        QShortcut(QKeySequence("."), self, activated=lambda: self.step_frame(1))
+        QShortcut(QKeySequence("["), self, activated=lambda: self.jump_to_scene(-1))
+        QShortcut(QKeySequence("]"), self, activated=lambda: self.jump_to_scene(1))
+
+        for btn in [self.prev_scene_btn, self.prev_frame_btn, self.fine_minus_btn, self.minus_btn, self.play_btn,
+                    self.plus_btn, self.fine_plus_btn, self.next_frame_btn, self.next_scene_btn,
+                    self.set_in_btn, self.set_out_btn]:
             btn_layout.addWidget(btn)
 
         layout.addLayout(btn_layout)
 
         seek_layout = QVBoxLayout()
+        seek_layout.setSpacing(2)
+        self.thumbnail_strip = ThumbnailStrip()
+        self.thumbnail_strip.seek_requested.connect(self.seek_from_timeline)
+        seek_layout.addWidget(self.thumbnail_strip)
+
         self.seek_slider = CustomSlider(Qt.Horizontal)
         self.seek_slider.sliderMoved.connect(self.set_position)
         self.seek_slider.sliderPressed.connect(self.pause_video)
@@ -591,6 +725,11 @@ class VideoEditor(QMainWindow):
         
         seek_layout.addWidget(self.seek_slider)
 
+        self.waveform_lane = WaveformLane()
+        self.waveform_lane.seek_requested.connect(self.seek_from_timeline)
+        self.seek_slider.time_range_changed.connect(self.waveform_lane.set_time_range)
+        seek_layout.addWidget(self.waveform_lane)
+
         self.time_label = QLabel("00:00:00.000 / 00:00:00.000")
         self.time_label.setAlignment(Qt.AlignCenter)
         self.time_label.setStyleSheet("font-size: 11px; color: #666666;")
@@ -642,6 +781,43 @@ class VideoEditor(QMainWindow):
         edit_group.setLayout(edit_layout)
         layout.addWidget(edit_group)
 
+        segments_group = QGroupBox("Segments")
+        segments_layout = QVBoxLayout()
+        self.segment_list = QListWidget()
+        self.segment_list.setFixedHeight(90)
+        self.segment_list.setToolTip("Ranges joined into one file, top to bottom. Double-click to edit one.")
+        self.segment_list.itemDoubleClicked.connect(self.load_segment)
+        segments_layout.addWidget(self.segment_list)
+
+        segment_btn_layout = QHBoxLayout()
+        self.add_segment_btn = IconButton('fa5s.plus', '')
+        self.remove_segment_btn = IconButton('fa5s.minus', '')
+        self.segment_up_btn = IconButton('fa5s.arrow-up', '')
+        self.segment_down_btn = IconButton('fa5s.arrow-down', '')
+        self.clear_segments_btn = IconButton('fa5s.trash', '')
+        self.silence_segments_btn = IconButton('fa5s.volume-mute', '')
+        for button, tooltip in ((self.add_segment_btn, "Add the current In/Out range as a segment"),
+                                (self.remove_segment_btn, "Remove the selected segment"),
+                                (self.segment_up_btn, "Move the selected segment earlier in the output"),
+                                (self.segment_down_btn, "Move the selected segment later in the output"),
+                                (self.clear_segments_btn, "Remove all segments"),
+                                (self.silence_segments_btn, "Trim or split the recording on silence")):
+            button.setFixedSize(30, 30)
+            button.setToolTip(tooltip)
+            segment_btn_layout.addWidget(button)
+        segment_btn_layout.addStretch()
+
+        self.add_segment_btn.clicked.connect(self.add_segment)
+        self.remove_segment_btn.clicked.connect(self.remove_segment)
+        self.segment_up_btn.clicked.connect(lambda: self.move_segment(-1))
+        self.segment_down_btn.clicked.connect(lambda: self.move_segment(1))
+        self.clear_segments_btn.clicked.connect(self.clear_segments)
+        self.silence_segments_btn.clicked.connect(self.open_silence_dialog)
+
+        segments_layout.addLayout(segment_btn_layout)
+        segments_group.setLayout(segments_layout)
+        layout.addWidget(segments_group)
+
         output_group = QGroupBox("Output Settings")
         output_layout = QVBoxLayout()
         format_layout = QHBoxLayout()
@@ -730,6 +906,12 @@ class VideoEditor(QMainWindow):
         self.end_m.valueChanged.connect(self.on_time_spinboxes_changed)
         self.end_s.valueChanged.connect(self.on_time_spinboxes_changed)
         self.end_ms.valueChanged.connect(self.on_time_spinboxes_changed)
+
+        # Snap typed times to frame starts once editing is done, not on every keystroke
+        for spinbox in (self.start_h, self.start_m, self.start_s, self.start_ms):
+            spinbox.editingFinished.connect(lambda: self.snap_time_input_to_frame('start'))
+        for spinbox in (self.end_h, self.end_m, self.end_s, self.end_ms):
+            spinbox.editingFinished.connect(lambda: self.snap_time_input_to_frame('end'))
         
         return layout
 
@@ -819,6 +1001,14 @@ class VideoEditor(QMainWindow):
         self.video_processor.progress_updated.connect(self.update_progress)
         self.video_processor.export_finished.connect(self.export_complete)
         self.video_processor.export_started.connect(self.export_started)
+        self.video_processor.progress_event.connect(self.update_progress_event)
+        self.video_processor.output_finished.connect(self.export_output_finished)
+        self.keyframe_index_ready.connect(self.on_keyframe_index_ready)
+        self.scene_index_ready.connect(self.on_scene_index_ready)
+        self.proxy_ready.connect(self.on_proxy_ready)
+        self.media_loaded.connect(self.on_media_loaded)
+        self.export_scheduler.job_progress.connect(self.queue_job_progress)
+        self.export_scheduler.job_finished.connect(self.queue_job_finished)
 
     # --------------------------------------------------
     # Video Loading and Time Management
@@ -948,63 +1138,100 @@ class VideoEditor(QMainWindow):
     # File Operations
     # --------------------------------------------------
     def load_video_file(self, file_path):
-        if file_path and os.path.exists(file_path):
-            self._reset_crop_state()
+        if not file_path:
+            return
 
-            self.video_transformer = VideoTransformer()
-            self.video_path = file_path
+        self._reset_crop_state()
 
-            success = self.video_widget.load_video(file_path)
-            if not success:
-                self.show_notification("Error loading video file")
-                return
+        self.video_transformer = VideoTransformer()
+        self.video_path = file_path
 
-            cap = cv2.VideoCapture(file_path)
-            if cap.isOpened():
-                fps = cap.get(cv2.CAP_PROP_FPS)
-                frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        # The player opens the file asynchronously, so it shows up at once
+        success = self.video_widget.load_video(file_path)
+        if not success:
+            self.show_notification("Error loading video file")
+            return
 
-                if fps > 0:
-                    self.video_duration = frame_count / fps * 1000
-                else:
-                    self.video_duration = get_video_duration(file_path) * 1000
+        self.video_duration = 0
+        self.duration_estimated = False
+        self.keyframe_index = None
+        self.frame_table = None
+        self.scene_index = None
+        self.proxy_info = None
+        self.start_time = 0
+        self.end_time = 0
+        self.seek_slider.setRange(0, 0)
+        self.seek_slider.reset()
+        self.segments.clear()
+        self.refresh_segments()
+        self.thumbnail_strip.clear()
+        self.waveform_lane.clear()
+        self.video_info.setText(f"{os.path.basename(file_path)} - loading...")
+
+        # Work for the previous file is abandoned
+        keyframe_indexer.cancel(keep_path=file_path)
+        scene_detector.cancel(keep_path=file_path)
+        silence_analyzer.cancel(keep_path=file_path)
+        proxy_manager.cancel(keep_path=file_path)
+
+        # Size, probe and duration run on the loader thread, see on_media_loaded
+        media_loader.load(file_path, self.media_loaded.emit)
+
+    def on_media_loaded(self, media):
+        if media.path != self.video_path or not media_loader.is_current(media.generation):
+            return
+        if media.error:
+            self.video_info.setText("No video loaded")
+            self.show_notification(f"Error loading video file: {media.error}")
+            return
 
-                cap.release()
-            else:
-                self.video_duration = get_video_duration(file_path) * 1000
+        file_path = media.path
+        video_info = media.video_info
+        self.video_duration = media.duration * 1000
+        self.duration_estimated = media.duration_estimated
 
-            file_size = os.path.getsize(file_path)
-            size_str = format_file_size(file_size)
-            video_info = get_video_info(file_path)
+        size_str = format_file_size(media.size)
 
-            info_text = f"{os.path.basename(file_path)} ({size_str})"
-            if self.video_duration > 0:
-                duration_str = hmsms_str_from_ms(self.video_duration)
-                info_text += f" - {duration_str}"
-            if video_info.get('width') and video_info.get('height'):
-                info_text += f" - {video_info['width']}x{video_info['height']}"
-            
-            if video_info.get('codec'):
-                info_text += f" - {video_info['codec']}"
-            elif video_info.get('video_codec'):
-                info_text += f" - {video_info['video_codec']}"
+        info_text = f"{os.path.basename(file_path)} ({size_str})"
+        if self.video_duration > 0:
+            duration_str = hmsms_str_from_ms(self.video_duration)
+            info_text += f" - {duration_str}"
+        if video_info.get('width') and video_info.get('height'):
+            info_text += f" - {video_info['width']}x{video_info['height']}"
+        
+        if video_info.get('codec'):
+            info_text += f" - {video_info['codec']}"
+        elif video_info.get('video_codec'):
+            info_text += f" - {video_info['video_codec']}"
 
-            self.video_info.setText(info_text)
+        self.video_info.setText(info_text)
 
-            self.start_time = 0
-            self.end_time = self.video_duration
-            self.update_time_inputs(0, 'start')
-            self.update_time_inputs(self.video_duration, 'end')
+        self.start_time = 0
+        self.end_time = self.video_duration
+        self.update_time_inputs(0, 'start')
+        self.update_time_inputs(self.video_duration, 'end')
 
-            self.seek_slider.setRange(0, int(self.video_duration))
-            self.seek_slider.set_time_range(self.start_time, self.end_time, self.video_duration)
-            self.seek_slider.setValue(0)
+        self.seek_slider.setRange(0, int(self.video_duration))
+        self.seek_slider.set_time_range(self.start_time, self.end_time, self.video_duration)
+        self.thumbnail_strip.set_source(file_path, self.video_duration)
+        self.waveform_lane.set_source(file_path, self.video_duration)
 
-            QTimer.singleShot(500, lambda: self.video_widget.get_video_widget().fit_video_in_view())
+        # Index frames and keyframes in the background; the callback runs on the indexer thread
+        keyframe_indexer.request(file_path, lambda path, index: self.keyframe_index_ready.emit(path))
 
-            self.show_notification(f"Loaded: {os.path.basename(file_path)}")
-            self.update_crop_button_state()
-            self.update_time_spinboxes_sync()
+        if self.settings.get("detect_scenes", True):
+            # A full low-priority decode the first time, then read from the media cache
+            scene_detector.request(file_path, lambda path, index: self.scene_index_ready.emit(path))
+
+        if self.settings.get("use_proxies", True) and proxy_manager.needs_proxy(media.probe):
+            # An existing proxy is found on the proxy thread too; new ones are transcoded at low priority
+            proxy_manager.request(file_path, lambda path, info: self.proxy_ready.emit(path, info))
+
+        QTimer.singleShot(500, lambda: self.video_widget.get_video_widget().fit_video_in_view())
+
+        self.show_notification(f"Loaded: {os.path.basename(file_path)}")
+        self.update_crop_button_state()
+        self.update_time_spinboxes_sync()
 
     def open_file(self):
         if self.is_exporting:
@@ -1104,6 +1331,13 @@ class VideoEditor(QMainWindow):
         self.video_widget.set_position(position)
         self.update_time_display()
 
+    def seek_from_timeline(self, position):
+        if not self.video_path:
+            return
+        self.pause_video()
+        self.seek_slider.setValue(position)
+        self.set_position(position)
+
     def update_playback_position(self):
         if self.is_playing and self.video_path:
             current_time = self.video_widget.get_current_time() * 1000
@@ -1120,27 +1354,174 @@ class VideoEditor(QMainWindow):
         duration_str = hmsms_str_from_ms(self.video_duration)
         self.time_label.setText(f"{current_str} / {duration_str}")
 
+    def on_keyframe_index_ready(self, file_path):
+        if file_path != self.video_path:
+            return
+        self.frame_table = keyframe_indexer.cached_frames(file_path)
+        self.keyframe_index = self.frame_table.keyframes if self.frame_table else None
+        if self.keyframe_index:
+            self.seek_slider.set_keyframes(kf * 1000 for kf in self.keyframe_index.times)
+
+        if self.frame_table and self.duration_estimated and self.frame_table.duration > 0:
+            # frame_count / fps is wrong for variable frame rate files
+            self.duration_estimated = False
+            at_end = self.end_time >= self.video_duration
+            self.video_duration = self.frame_table.duration * 1000
+            self.seek_slider.setRange(0, int(self.video_duration))
+            if at_end or self.end_time > self.video_duration:
+                self.end_time = self.video_duration
+                self.update_time_inputs(self.end_time, 'end')
+            self.seek_slider.set_time_range(self.start_time, self.end_time, self.video_duration)
+            self.update_time_display()
+
+    def on_scene_index_ready(self, file_path):
+        if file_path != self.video_path:
+            return
+        self.scene_index = scene_detector.cached(file_path)
+        if self.scene_index:
+            self.seek_slider.set_scene_cuts(cut * 1000 for cut in self.scene_index.cuts())
+
+    def jump_to_scene(self, direction):
+        if not self.video_path:
+            return
+        if not self.scene_index:
+            self.show_notification("Scene cuts are not available yet")
+            return
+        self.pause_video()
+
+        current = self.seek_slider.value() / 1000
+        if direction > 0:
+            target = self.scene_index.after(current)
+        else:
+            target = self.scene_index.before(current)
+        if target is None:
+            self.show_notification("No further scene cuts")
+            return
+
+        position = max(0, min(self.frame_time_ms(target), int(self.video_duration)))
+        self.video_widget.set_position(position)
+        self.seek_slider.setValue(position)
+        self.current_playback_position = position
+        self.update_time_display()
+
+    def on_proxy_ready(self, file_path, proxy):
+        if file_path != self.video_path or proxy is None:
+            return
+        probe = probe_media(file_path)
+        stream = probe.video_stream if probe else None
+        source_size = (stream.width, stream.height) if stream and stream.width and stream.height else None
+        if self.video_widget.swap_source(proxy.proxy_path, source_size):
+            self.proxy_info = proxy
+            self.refresh_segments()
+            print(f"Playing preview proxy: {proxy.proxy_path}")
+            self.show_notification("Switched to preview proxy for smooth scrubbing")
+
+    def frame_time_ms(self, seconds):
+        """Milliseconds for a frame start, rounded down so an exact seek there lands on that frame"""
+        return int(math.floor(seconds * 1000 + 1e-6))
+
+    def snap_to_frame(self, position):
+        """Move a millisecond position to the start of the frame shown at it"""
+        if not self.frame_table or position >= self.video_duration:
+            # The end of the file is already a frame boundary
+            return position
+        return self.frame_time_ms(self.frame_table.snap(position / 1000))
+
+    def step_frame(self, direction):
+        if not self.video_path:
+            return
+        self.pause_video()
+
+        current = self.seek_slider.value() / 1000
+        if self.frame_table:
+            if direction > 0:
+                target = self.frame_table.next_frame(current)
+            else:
+                target = self.frame_table.previous_frame(current)
+            if target is None:
+                return
+        else:
+            # No frame table yet, step by the nominal frame rate
+            probe = probe_media(self.video_path)
+            rate = probe.video_stream.frame_rate if probe and probe.video_stream else 0
+            target = max(0.0, current + direction / (rate or 30.0))
+
+        # Round up for the player, which shows the frame that started at or before the position
+        position = min(int(math.ceil(target * 1000 - 1e-6)), int(self.video_duration))
+        self.video_widget.set_position(position)
+        self.seek_slider.setValue(position)
+        self.current_playback_position = position
+        self.update_time_display()
+
+    def snap_time_input_to_frame(self, time_type):
+        if not self.video_path or not self.frame_table:
+            return
+        position = self.start_time if time_type == 'start' else self.end_time
+        snapped = self.snap_to_frame(position)
+        if snapped != int(position):
+            self.update_time_inputs(snapped, time_type)
+
+    def snap_to_keyframe(self, position, time_type):
+        """Snap a marker position in milliseconds to a scene cut or the keyframe index.
+
+        In keyframe copy mode the in point moves to the keyframe the export
+        will actually start from. Otherwise markers snap to a scene cut, or
+        failing that a keyframe, when it is within a few pixels on the
+        timeline, and to the start of the current frame when neither is.
+
+        Returns:
+            tuple: (position in milliseconds, "scene cut", "keyframe" or "" for where it moved)
+        """
+        copy_mode = (self.settings.get("format_index", 0) == 0
+                     and self.settings.get("cut_mode", "keyframe") == "keyframe")
+        copy_start = time_type == 'start' and copy_mode
+
+        if self.scene_index and not copy_start:
+            cut = self.scene_index.nearest(position / 1000)
+            if cut is not None and abs(cut * 1000 - position) <= self.seek_slider.snap_distance():
+                return max(0, min(self.frame_time_ms(cut), int(self.video_duration))), "scene cut"
+
+        if not self.keyframe_index:
+            return self.snap_to_frame(position), ""
+
+        if copy_start:
+            keyframe = self.keyframe_index.at_or_before(position / 1000)
+        else:
+            keyframe = self.keyframe_index.nearest(position / 1000)
+            if keyframe is not None and abs(keyframe * 1000 - position) > self.seek_slider.snap_distance():
+                keyframe = None
+
+        if keyframe is None:
+            return self.snap_to_frame(position), ""
+        return max(0, min(self.frame_time_ms(keyframe), int(self.video_duration))), "keyframe"
+
     def set_in_point(self):
         if not self.video_path:
             self.show_notification("Please load a video file first")
             return
 
-        position = self.seek_slider.value()
+        position, snapped_to = self.snap_to_keyframe(self.seek_slider.value(), 'start')
         self.start_time = position
         self.update_time_inputs(position, 'start')
         self.seek_slider.set_time_range(self.start_time, self.end_time, self.video_duration)
-        self.show_notification(f"In point set to {hmsms_str_from_ms(position)}")
+        if snapped_to and abs(position - self.seek_slider.value()) > 1:
+            self.show_notification(f"In point snapped to {snapped_to} at {hmsms_str_from_ms(position)}")
+        else:
+            self.show_notification(f"In point set to {hmsms_str_from_ms(position)}")
 
     def set_out_point(self):
         if not self.video_path:
             self.show_notification("Please load a video file first")
             return
 
-        position = self.seek_slider.value()
+        position, snapped_to = self.snap_to_keyframe(self.seek_slider.value(), 'end')
         self.end_time = position
         self.update_time_inputs(position, 'end')
         self.seek_slider.set_time_range(self.start_time, self.end_time, self.video_duration)
-        self.show_notification(f"Out point set to {hmsms_str_from_ms(position)}")
+        if snapped_to and abs(position - self.seek_slider.value()) > 1:
+            self.show_notification(f"Out point snapped to {snapped_to} at {hmsms_str_from_ms(position)}")
+        else:
+            self.show_notification(f"Out point set to {hmsms_str_from_ms(position)}")
 
     def update_time_inputs(self, milliseconds, time_type):
         h, m, s, ms = milliseconds_to_hmsms(milliseconds)
@@ -1156,6 +1537,114 @@ class VideoEditor(QMainWindow):
             self.end_s.setValue(s)
             self.end_ms.setValue(ms)
 
+    # --------------------------------------------------
+    # Segments
+    # --------------------------------------------------
+    def add_segment(self):
+        if not self.video_path:
+            self.show_notification("Please load a video file first")
+            return
+
+        start_time, end_time = self.selected_range()
+        if end_time > self.video_duration / 1000:
+            self.show_notification("End time exceeds video duration")
+            return
+        try:
+            index = self.segments.add(start_time, end_time)
+        except ValueError:
+            self.show_notification("Start time must be before end time")
+            return
+        self.refresh_segments(index)
+        self.show_notification(f"Segment {index + 1} added ({end_time - start_time:.1f}s)")
+
+    def remove_segment(self):
+        index = self.segment_list.currentRow()
+        if index < 0:
+            return
+        self.segments.remove(index)
+        self.refresh_segments(min(index, len(self.segments) - 1))
+
+    def move_segment(self, offset):
+        index = self.segment_list.currentRow()
+        if index < 0:
+            return
+        self.refresh_segments(self.segments.move(index, index + offset))
+
+    def clear_segments(self):
+        self.segments.clear()
+        self.refresh_segments()
+
+    def load_segment(self, item):
+        """Make a segment the In/Out range again and seek to its start"""
+        segment = self.segments[self.segment_list.row(item)]
+        start_ms, end_ms = self.segment_player_range(segment)
+        self.start_time = start_ms
+        self.end_time = end_ms
+        self.update_time_inputs(start_ms, 'start')
+        self.update_time_inputs(end_ms, 'end')
+        self.seek_slider.set_time_range(self.start_time, self.end_time, self.video_duration)
+        self.pause_video()
+        self.seek_slider.setValue(int(start_ms))
+        self.set_position(int(start_ms))
+
+    def segment_player_range(self, segment):
+        """Segment bounds in player milliseconds, which are on the proxy while one plays"""
+        start_ms, end_ms = segment.start * 1000, segment.end * 1000
+        if self.proxy_info:
+            start_ms, end_ms = self.proxy_info.to_proxy(start_ms), self.proxy_info.to_proxy(end_ms)
+        return start_ms, end_ms
+
+    def refresh_segments(self, current=None):
+        self.segment_list.clear()
+        for number, segment in enumerate(self.segments, 1):
+            self.segment_list.addItem(f"{number}. {hmsms_str_from_ms(segment.start * 1000)} - "
+                                      f"{hmsms_str_from_ms(segment.end * 1000)}")
+        if current is not None and 0 <= current < len(self.segments):
+            self.segment_list.setCurrentRow(current)
+        self.seek_slider.set_segments([self.segment_player_range(segment) for segment in self.segments])
+
+    def open_silence_dialog(self):
+        """Turn the non-silent parts of the recording into segments, optionally exporting them right away"""
+        if not self.video_path:
+            self.show_notification("Please load a video file first")
+            return
+
+        dialog = SilenceDialog(self.video_path, self.settings, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        # Audio may run a little past the video; the last part ends with the file
+        duration = self.video_duration / 1000
+        parts = [(start, min(end, duration)) for start, end in dialog.parts() if start < duration]
+        if not parts:
+            return
+
+        self.settings.update(dialog.get_settings())
+        self.settings_manager.save_settings(self.settings)
+
+        if dialog.mode == "split":
+            # Only reachable through Export; a split never goes through the segment list
+            self.export_parts(parts)
+            return
+
+        self.segments.clear()
+        for start, end in parts:
+            self.segments.add(start, end)
+        self.refresh_segments()
+        if dialog.export_requested:
+            self.start_export()
+        else:
+            self.show_notification(f"{len(parts)} segment(s) from silence detection")
+
+    def export_parts(self, parts):
+        """Queue one export per part; the queue runs them in the background"""
+        for start, end in parts:
+            job = self.create_export_job((start, end))
+            if job is None:
+                return
+            # Added one by one, so every job reserves its output name before the next is named
+            self.export_scheduler.add_job(job)
+        self.show_notification(f"Queued {len(parts)} exports")
+
     # --------------------------------------------------
     # Video Transformation Operations
     # --------------------------------------------------
@@ -1301,7 +1790,16 @@ class VideoEditor(QMainWindow):
             self.show_notification("Cannot change settings during export")
             return
 
-        dialog = AdvancedSettingsDialog(self, self.settings)
+        input_path = time_range = video_filters = None
+        if self.video_path:
+            input_path = self.video_path
+            time_range = self.selected_range()
+            video_player = self.video_widget.get_video_widget()
+            if video_player.crop_mode:
+                video_player._update_crop_overlay_bounds()
+            self.video_transformer.sync_with_player(video_player)
+            video_filters = self.video_transformer.build_video_filter_for_ffmpeg()
+        dialog = AdvancedSettingsDialog(self, self.settings, input_path, time_range, video_filters)
         if dialog.exec_() == QDialog.Accepted:
             self.settings = dialog.get_updated_settings()
             if self.settings_manager.save_settings(self.settings):
@@ -1319,7 +1817,10 @@ class VideoEditor(QMainWindow):
         else:
             format_index = self.settings.get("format_index", 0)
             if format_index == 0:
-                self.format_label.setText("Original - Copy (fastest)")
+                if self.settings.get("cut_mode", "keyframe") == "smart":
+                    self.format_label.setText("Original - Smart Cut (frame accurate)")
+                else:
+                    self.format_label.setText("Original - Copy (fastest)")
                 self.format_label.setStyleSheet("font-weight: bold; color: #27ae60;")
             else:
                 formats = ["Original - Copy", "MP4", "MKV", "WEBM"]
@@ -1359,6 +1860,7 @@ class VideoEditor(QMainWindow):
         self.set_progress_bar_style(active=True)
         
         self.export_start_time = time.time()
+        self.last_progress_event = None
         self.export_timer.start()
         self.update_export_time()
 
@@ -1370,15 +1872,37 @@ class VideoEditor(QMainWindow):
         minutes = int((elapsed % 3600) // 60)
         seconds = int(elapsed % 60)
         time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        self.progress_time_label.setText(f"⏱ {time_str}")
+        
+        event = self.last_progress_event
+        eta = event.eta(self.video_processor.total_duration) if event else None
+        if eta is not None:
+            self.progress_time_label.setText(f"⏱ {time_str} · {event.speed:.1f}x · ETA {hmsms_str(eta).split('.')[0]}")
+        else:
+            self.progress_time_label.setText(f"⏱ {time_str}")
+
+    def update_progress_event(self, event):
+        self.last_progress_event = event
 
     def start_export(self):
         if not self.video_path:
             self.show_notification("Please select a video file first")
             return
 
+        if self.start_time == 0 and self.end_time == 0:
+            self.start_time = 0
+            self.end_time = self.video_duration
+            self.update_time_inputs(0, 'start')
+            self.update_time_inputs(self.video_duration, 'end')
+
+        job = self.create_export_job()
+        if job is None:
+            return
+
         if self.video_processor.is_processing:
-            self.show_notification("Export already in progress")
+            # Busy exporting: queue the job, it starts when a slot frees up
+            self.export_scheduler.add_job(job)
+            pending = len(self.export_scheduler.pending_jobs())
+            self.show_notification(f"Export queued ({pending} pending): {os.path.basename(job.output_path)}")
             return
 
         if self.is_playing:
@@ -1389,6 +1913,7 @@ class VideoEditor(QMainWindow):
             self.playback_timer.stop()
         
         self.is_exporting = True
+        self.export_scheduler.hold()
         self.export_btn.setIcon(qta.icon('fa5s.stop'))
         self.export_btn.setText(" Abort Export")
         self.export_btn.setStyleSheet("background-color: #e74c3c; color: white;")
@@ -1397,12 +1922,33 @@ class VideoEditor(QMainWindow):
 
         QApplication.processEvents()
 
-        if self.start_time == 0 and self.end_time == 0:
-            self.start_time = 0
-            self.end_time = self.video_duration
-            self.update_time_inputs(0, 'start')
-            self.update_time_inputs(self.video_duration, 'end')
+        self.last_output_file = job.output_path
+
+        if job.audio_only:
+            success = self.video_processor.export_audio(
+                job.input_path, job.output_path, job.settings, job.start_time, job.end_time, job.segments
+            )
+        elif job.extra_outputs:
+            success = self.video_processor.export_multi(
+                job.input_path, job.targets(), job.start_time, job.end_time, job.video_filters
+            )
+        else:
+            success = self.video_processor.export_video(
+                job.input_path, job.output_path, job.settings, job.start_time, job.end_time, job.video_filters,
+                job.segments
+            )
 
+        if not success:
+            self.show_notification("Failed to start audio export" if job.audio_only else "Failed to start video export")
+            self.is_exporting = False
+            self.export_scheduler.release()
+            self.export_btn.setIcon(qta.icon('fa5s.download'))
+            self.export_btn.setText(" Export Video")
+            self.export_btn.setStyleSheet("")
+            self.export_btn.setFixedSize(130, 40)
+
+    def selected_range(self):
+        """Start and end of the selection in seconds of the source file"""
         start_time = hmsms_to_seconds(
             self.start_h.value(), self.start_m.value(),
             self.start_s.value(), self.start_ms.value()
@@ -1412,23 +1958,33 @@ class VideoEditor(QMainWindow):
             self.end_s.value(), self.end_ms.value()
         )
 
+        if self.proxy_info:
+            # Positions were picked on the proxy; exports always read the original
+            start_time = self.proxy_info.to_source(start_time * 1000) / 1000
+            end_time = self.proxy_info.to_source(end_time * 1000) / 1000
+        return start_time, end_time
+
+    def create_export_job(self, time_range=None):
+        """Snapshot the current file, range, settings and transforms as an ExportJob"""
+        start_time, end_time = self.selected_range()
+        segments = []
+        if time_range is not None:
+            start_time, end_time = time_range
+        elif self.segments:
+            # The segment list replaces the In/Out range; a single segment is a plain cut
+            start_time, end_time = self.segments.start, self.segments.end
+            if len(self.segments) > 1:
+                segments = self.segments.to_list()
+            else:
+                start_time, end_time = self.segments[0].start, self.segments[0].end
+
         if start_time >= end_time:
             self.show_notification("Start time must be before end time")
-            self.is_exporting = False
-            self.export_btn.setIcon(qta.icon('fa5s.download'))
-            self.export_btn.setText(" Export Video")
-            self.export_btn.setStyleSheet("")
-            self.export_btn.setFixedSize(130, 40)
-            return
+            return None
 
         if end_time > self.video_duration / 1000:
             self.show_notification("End time exceeds video duration")
-            self.is_exporting = False
-            self.export_btn.setIcon(qta.icon('fa5s.download'))
-            self.export_btn.setText(" Export Video")
-            self.export_btn.setStyleSheet("")
-            self.export_btn.setFixedSize(130, 40)
-            return
+            return None
 
         input_name = os.path.splitext(os.path.basename(self.video_path))[0]
         input_name = sanitize_filename(input_name)
@@ -1452,6 +2008,13 @@ class VideoEditor(QMainWindow):
         print(f"Video filters: {video_filters}")
         print(f"========================")
 
+        # Outputs of queued and running exports do not exist on disk yet
+        reserved = self.export_scheduler.reserved_outputs()
+        if self.video_processor.is_processing and self.last_output_file:
+            reserved.add(self.last_output_file)
+
+        settings = dict(self.settings)
+
         if audio_output != "none":
             if audio_output == "flac":
                 ext = ".flac"
@@ -1460,52 +2023,47 @@ class VideoEditor(QMainWindow):
             else:
                 ext = ".mp3"
 
-            output_file = unique_output_path(input_name, ext, audio_output)
-            self.last_output_file = output_file
-
-            success = self.video_processor.export_audio(
-                self.video_path, output_file, self.settings, start_time, end_time
-            )
-
-            if not success:
-                self.show_notification("Failed to start audio export")
-                self.is_exporting = False
-                self.export_btn.setIcon(qta.icon('fa5s.download'))
-                self.export_btn.setText(" Export Video")
-                self.export_btn.setStyleSheet("")
-                self.export_btn.setFixedSize(130, 40)
+            output_file = unique_output_path(input_name, ext, audio_output, reserved)
         else:
             format_index = self.settings.get("format_index", 0)
 
             if format_index == 0:
                 original_ext = os.path.splitext(self.video_path)[1]
                 base_name = input_name
-                output_file = unique_output_path(base_name, original_ext, "original")
-                self.last_output_file = output_file
-                self.settings["input_path"] = self.video_path
+                output_file = unique_output_path(base_name, original_ext, "original", reserved)
+                settings["input_path"] = self.video_path
             else:
-                video_codec = self.settings.get("video_codec", "H264")
-                quality = self.settings.get("quality", "1080p")
-
                 formats = ["Original - Copy", "MP4", "MKV", "WEBM"]
                 format_text = formats[format_index] if format_index < len(formats) else "MP4"
                 format_type = format_text.split(" - ")[0].lower()
                 ext = f".{format_type}"
                 base_name = input_name
-                output_file = unique_output_path(base_name, ext, format_type)
-                self.last_output_file = output_file
-
-            success = self.video_processor.export_video(
-                self.video_path, output_file, self.settings, start_time, end_time, video_filters
-            )
-
-            if not success:
-                self.show_notification("Failed to start video export")
-                self.is_exporting = False
-                self.export_btn.setIcon(qta.icon('fa5s.download'))
-                self.export_btn.setText(" Export Video")
-                self.export_btn.setStyleSheet("")
-                self.export_btn.setFixedSize(130, 40)
+                output_file = unique_output_path(base_name, ext, format_type, reserved)
+
+        extra_outputs = []
+        companion_audio = self.settings.get("companion_audio_format", "none")
+        smart_cut = self.settings.get("format_index", 0) == 0 and self.settings.get("cut_mode", "keyframe") == "smart"
+        if segments and audio_output == "none" and companion_audio != "none":
+            print("Companion audio is not written for multi-segment exports")
+        elif audio_output == "none" and companion_audio != "none" and not smart_cut:
+            # Written from the same decode as the video, see VideoProcessor.export_multi
+            companion_ext = {"flac": ".flac", "aac": ".m4a"}.get(companion_audio, ".mp3")
+            reserved.add(output_file)
+            companion_file = unique_output_path(input_name, companion_ext, companion_audio, reserved)
+            companion_settings = dict(self.settings, audio_output_format=companion_audio)
+            extra_outputs.append([companion_file, companion_settings])
+
+        return ExportJob(
+            input_path=self.video_path,
+            output_path=output_file,
+            start_time=start_time,
+            end_time=end_time,
+            settings=settings,
+            video_filters=None if audio_output != "none" else video_filters,
+            audio_only=audio_output != "none",
+            extra_outputs=extra_outputs,
+            segments=segments
+        )
 
     def show_abort_confirmation(self):
         dialog = AbortConfirmationDialog(self)
@@ -1533,6 +2091,7 @@ class VideoEditor(QMainWindow):
             QTimer.singleShot(100, self._check_abort_status)
         else:
             self.is_exporting = False
+            self.export_scheduler.release()
             self.progress_bar.setValue(0)
             self.progress_percent.setText("Ready")
             self.progress_status.setText("Export aborted")
@@ -1549,10 +2108,44 @@ class VideoEditor(QMainWindow):
         self.progress_bar.setValue(percent)
         self.progress_percent.setText(f"{percent}%")
 
+    def queue_job_progress(self, job_id, percent):
+        # The progress bar follows queued jobs only while nothing runs in the foreground
+        if self.is_exporting:
+            return
+        job = self.export_scheduler.get_job(job_id)
+        self.progress_bar.setValue(percent)
+        self.progress_percent.setText(f"{percent}%")
+        self.progress_status.setText(f"Queue: {os.path.basename(job.output_path)}")
+        self.progress_status.setStyleSheet("color: #3f8e93; font-weight: bold;")
+
+    def queue_job_finished(self, job_id, success):
+        job = self.export_scheduler.get_job(job_id)
+        name = os.path.basename(job.output_path) if job else ""
+        pending = len(self.export_scheduler.pending_jobs())
+        if success:
+            self.show_notification(f"Queued export done: {name} ({pending} pending)")
+        else:
+            self.show_notification(f"Queued export failed: {name} ({pending} pending)")
+        if not self.is_exporting and pending == 0:
+            self.progress_bar.setValue(0)
+            self.progress_percent.setText("Ready")
+            self.progress_status.setText("Queue finished")
+
+    def export_output_finished(self, output_file, success):
+        # The main output is reported by export_complete
+        if output_file == self.last_output_file:
+            return
+        name = os.path.basename(output_file)
+        if success:
+            self.show_notification(f"Also saved: {name}")
+        else:
+            self.show_notification(f"Failed to save: {name}")
+
     def export_complete(self, output_file, success):
         print(f"Export complete: {output_file}, success: {success}")
 
         self.is_exporting = False
+        self.export_scheduler.release()
         self.export_timer.stop()
 
         self.progress_bar.setValue(0)
@@ -1776,6 +2369,18 @@ class VideoEditor(QMainWindow):
                 self.background_timer.stop()
             self.close()
 
+    def shutdown_background_services(self):
+        """Stop loading, indexing and preview work; only called once the window really closes"""
+        media_loader.shutdown()
+        keyframe_indexer.shutdown()
+        scene_detector.shutdown()
+        silence_analyzer.shutdown()
+        thumbnail_cache.shutdown()
+        waveform_builder.shutdown()
+        proxy_manager.shutdown()
+        size_estimator.shutdown()
+        self.export_scheduler.shutdown()
+
     def closeEvent(self, event):
         print("closeEvent called")
 
@@ -1819,6 +2424,7 @@ class VideoEditor(QMainWindow):
                     print("Warning: Export still in progress after waiting")
 
                 print("Closing window...")
+                self.shutdown_background_services()
                 event.accept()
 
             elif reply == QDialog.No:
@@ -1838,6 +2444,7 @@ class VideoEditor(QMainWindow):
 
         else:
             print("No export in progress, closing normally")
+            self.shutdown_background_services()
             event.accept()
 
     # --------------------------------------------------
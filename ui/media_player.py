@@ -3,7 +3,7 @@
 # Custom media player widget with video transformation and cropping capabilities
 # --------------------------------------------------
 
-from PyQt5.QtCore import Qt, QRect, QPoint, pyqtSignal, QTimer, QUrl
+from PyQt5.QtCore import Qt, QRect, QPoint, QSize, pyqtSignal, QTimer, QUrl
 from PyQt5.QtGui import QTransform, QPainter
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene
 from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
@@ -32,6 +32,9 @@ class MediaPlayer(QWidget):
         self.crop_rect = None
         self.crop_mode = False
 
+        # Frame size of the file being edited; set while a smaller proxy is playing
+        self.source_size = None
+
         # UI components
         self.crop_overlay = None
         self.video_item = None
@@ -97,12 +100,33 @@ class MediaPlayer(QWidget):
         self.flip_vertical = False
         self.crop_rect = None
         self.crop_mode = False
+        self.source_size = None
         self.video_item.setTransform(QTransform())
         self.crop_overlay.hide()
 
         QTimer.singleShot(200, self.fit_video_in_view)
         return True
 
+    def swap_source(self, video_path: str, source_size=None):
+        """Play another rendition of the same video, keeping position, playback state and transforms"""
+        position = self.media_player.position()
+        was_playing = self.media_player.state() == QMediaPlayer.PlayingState
+
+        self.media_player.setMedia(QMediaContent(QUrl.fromLocalFile(video_path)))
+        self.source_size = QSize(*source_size) if source_size else None
+        self.media_player.setPosition(position)
+        if was_playing:
+            self.media_player.play()
+
+        QTimer.singleShot(200, self.apply_transformations)
+        return True
+
+    def frame_size(self):
+        """Size crop rectangles are expressed in: the source, even when a proxy is shown"""
+        if self.source_size is not None and self.source_size.isValid():
+            return self.source_size
+        return self.video_item.nativeSize()
+
     def fit_video_in_view(self):
         if self.video_item and self.video_item.nativeSize().isValid():
             self.view.fitInView(self.video_item, Qt.KeepAspectRatio)
@@ -250,7 +274,7 @@ class MediaPlayer(QWidget):
         w_rel = (brx - tlx) / video_bounds.width()
         h_rel = (bry - tly) / video_bounds.height()
 
-        native_size = self.video_item.nativeSize()
+        native_size = self.frame_size()
         if native_size.isValid() and native_size.width() > 0 and native_size.height() > 0:
             x_scaled = max(0, int(round(x_rel * native_size.width())))
             y_scaled = max(0, int(round(y_rel * native_size.height())))
@@ -295,7 +319,7 @@ class MediaPlayer(QWidget):
         w_rel = (brx - tlx) / video_bounds.width()
         h_rel = (bry - tly) / video_bounds.height()
 
-        native_size = self.video_item.nativeSize()
+        native_size = self.frame_size()
         if native_size.isValid() and native_size.width() > 0 and native_size.height() > 0:
             x_scaled = max(0, int(round(x_rel * native_size.width())))
             y_scaled = max(0, int(round(y_rel * native_size.height())))
@@ -0,0 +1,176 @@
+# --------------------------------------------------
+# Silence Dialog
+# Auto-trim and auto-split of long recordings on silence
+# --------------------------------------------------
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QGridLayout, QLabel, QComboBox,
+    QSpinBox, QDoubleSpinBox, QDialogButtonBox
+)
+from PyQt5.QtCore import pyqtSignal
+
+from core.silence import (silence_analyzer, NOISE_LEVELS, DEFAULT_NOISE_DB,
+                          DEFAULT_MIN_SILENCE, DEFAULT_PADDING)
+from core.utils import hmsms_str
+
+SILENCE_MODES = [
+    ("remove", "Remove silences (one file)"),
+    ("split", "Split at silences (one file per part)"),
+    ("trim", "Trim leading and trailing silence"),
+]
+
+
+# --------------------------------------------------
+# SilenceDialog Class
+# Finds silences in the background and turns them into segments
+# --------------------------------------------------
+class SilenceDialog(QDialog):
+    analysis_ready = pyqtSignal(object)
+
+    def __init__(self, file_path, settings, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.settings = settings
+        self.silence_map = None
+        self.export_requested = False
+        self.setWindowTitle("Silence Detection")
+        self.setModal(True)
+        self.setMinimumWidth(420)
+        self.init_ui()
+
+        self.analysis_ready.connect(self.on_analysis_ready)
+        silence_map = silence_analyzer.cached(file_path)
+        if silence_map is not None:
+            self.on_analysis_ready(silence_map)
+        else:
+            silence_analyzer.request(file_path, lambda path, result: self.analysis_ready.emit(result))
+
+    # --------------------------------------------------
+    # UI Initialization
+    # --------------------------------------------------
+    def init_ui(self):
+        layout = QVBoxLayout()
+        grid = QGridLayout()
+
+        grid.addWidget(QLabel("Mode:"), 0, 0)
+        self.mode_combo = QComboBox()
+        for _, label in SILENCE_MODES:
+            self.mode_combo.addItem(label)
+        modes = [mode for mode, _ in SILENCE_MODES]
+        mode = self.settings.get("silence_mode", "remove")
+        self.mode_combo.setCurrentIndex(modes.index(mode) if mode in modes else 0)
+        grid.addWidget(self.mode_combo, 0, 1)
+
+        grid.addWidget(QLabel("Silence below:"), 1, 0)
+        self.noise_spin = QSpinBox()
+        self.noise_spin.setRange(min(NOISE_LEVELS), max(NOISE_LEVELS))
+        self.noise_spin.setSingleStep(NOISE_LEVELS[1] - NOISE_LEVELS[0])
+        self.noise_spin.setSuffix(" dB")
+        self.noise_spin.setValue(self.settings.get("silence_noise_db", DEFAULT_NOISE_DB))
+        self.noise_spin.setToolTip("Audio quieter than this counts as silence; raise it for noisy recordings")
+        grid.addWidget(self.noise_spin, 1, 1)
+
+        grid.addWidget(QLabel("Shortest silence:"), 2, 0)
+        self.min_silence_spin = QDoubleSpinBox()
+        self.min_silence_spin.setRange(0.1, 60.0)
+        self.min_silence_spin.setSingleStep(0.1)
+        self.min_silence_spin.setDecimals(1)
+        self.min_silence_spin.setSuffix(" s")
+        self.min_silence_spin.setValue(self.settings.get("silence_min_duration", DEFAULT_MIN_SILENCE))
+        self.min_silence_spin.setToolTip("Shorter pauses are kept, so speech is not chopped between words")
+        grid.addWidget(self.min_silence_spin, 2, 1)
+
+        grid.addWidget(QLabel("Padding:"), 3, 0)
+        self.padding_spin = QDoubleSpinBox()
+        self.padding_spin.setRange(0.0, 5.0)
+        self.padding_spin.setSingleStep(0.05)
+        self.padding_spin.setDecimals(2)
+        self.padding_spin.setSuffix(" s")
+        self.padding_spin.setValue(self.settings.get("silence_padding", DEFAULT_PADDING))
+        self.padding_spin.setToolTip("Silence kept before and after every part")
+        grid.addWidget(self.padding_spin, 3, 1)
+
+        layout.addLayout(grid)
+
+        self.summary_label = QLabel("Analyzing audio...")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        # Every change is answered from the cached scan, no FFmpeg run
+        self.mode_combo.currentIndexChanged.connect(self.update_summary)
+        self.noise_spin.valueChanged.connect(self.update_summary)
+        self.min_silence_spin.valueChanged.connect(self.update_summary)
+        self.padding_spin.valueChanged.connect(self.update_summary)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Cancel)
+        self.segments_button = self.button_box.addButton("Use as Segments", QDialogButtonBox.AcceptRole)
+        self.export_button = self.button_box.addButton("Export", QDialogButtonBox.AcceptRole)
+        self.segments_button.clicked.connect(lambda: self.finish(False))
+        self.export_button.clicked.connect(lambda: self.finish(True))
+        self.button_box.rejected.connect(self.reject)
+        self.segments_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        layout.addWidget(self.button_box)
+
+        self.setLayout(layout)
+
+    # --------------------------------------------------
+    # Analysis results
+    # --------------------------------------------------
+    def on_analysis_ready(self, silence_map):
+        self.silence_map = silence_map
+        if silence_map is None:
+            self.summary_label.setText("No audio could be analyzed in this file.")
+            return
+        self.update_summary()
+
+    def update_summary(self):
+        if self.silence_map is None:
+            return
+        parts = self.parts()
+        # The segment list always exports as one joined file, so a split is only done by Export
+        self.segments_button.setEnabled(bool(parts) and self.mode != "split")
+        self.segments_button.setToolTip("Split parts are exported as separate files; use Export"
+                                        if self.mode == "split" else "Load the parts into the segment list")
+        self.export_button.setEnabled(bool(parts))
+        if not parts:
+            self.summary_label.setText("Everything is below the threshold; nothing would be kept.")
+            return
+
+        kept = sum(end - start for start, end in parts)
+        removed = self.silence_map.duration - kept
+        noun = "part" if len(parts) == 1 else "parts"
+        self.summary_label.setText(
+            f"{len(parts)} {noun}, {hmsms_str(kept).split('.')[0]} kept, "
+            f"{hmsms_str(removed).split('.')[0]} removed "
+            f"({removed / self.silence_map.duration * 100 if self.silence_map.duration else 0:.0f}%)"
+        )
+
+    # --------------------------------------------------
+    # Results
+    # --------------------------------------------------
+    @property
+    def mode(self):
+        return SILENCE_MODES[self.mode_combo.currentIndex()][0]
+
+    def parts(self):
+        """Ranges to keep in seconds of the source, for the current mode and thresholds"""
+        if self.silence_map is None:
+            return []
+        tuning = (self.noise_spin.value(), self.min_silence_spin.value(), self.padding_spin.value())
+        if self.mode == "trim":
+            trimmed = self.silence_map.trimmed(*tuning)
+            return [trimmed] if trimmed else []
+        return self.silence_map.parts(*tuning)
+
+    def get_settings(self):
+        return {
+            "silence_mode": self.mode,
+            "silence_noise_db": self.noise_spin.value(),
+            "silence_min_duration": self.min_silence_spin.value(),
+            "silence_padding": self.padding_spin.value(),
+        }
+
+    def finish(self, export):
+        self.export_requested = export
+        self.accept()
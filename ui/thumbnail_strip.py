@@ -0,0 +1,125 @@
+# --------------------------------------------------
+# Thumbnail Strip Module
+# Filmstrip of keyframe thumbnails shown above the seek slider
+# --------------------------------------------------
+
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect, pyqtSignal
+from PyQt5.QtGui import QPainter, QPixmap, QColor
+from PyQt5.QtWidgets import QWidget
+
+from core.thumbnails import (thumbnail_cache, thumbnail_count, tile_count, level_for_width,
+                             THUMB_HEIGHT, TILE_THUMBS)
+
+# --------------------------------------------------
+# ThumbnailStrip Class
+# Paints the best loaded zoom level, coarser levels fill the gaps
+# --------------------------------------------------
+class ThumbnailStrip(QWidget):
+    tile_ready = pyqtSignal(str, int, int, list)
+    seek_requested = pyqtSignal(int)
+
+    def __init__(self, parent=None, max_tiles=64):
+        super().__init__(parent)
+        self.setFixedHeight(THUMB_HEIGHT)
+        self.file_path = None
+        self.duration = 0.0
+        self.max_tiles = max_tiles
+        self.thumb_width = THUMB_HEIGHT * 16 // 9
+        self._pixmaps = OrderedDict()
+        self.tile_ready.connect(self._store_tile)
+
+    def set_source(self, file_path, duration_ms):
+        self.file_path = file_path
+        self.duration = duration_ms / 1000
+        self._pixmaps.clear()
+        thumbnail_cache.cancel(keep_path=file_path)
+        self.request_tiles()
+        self.update()
+
+    def clear(self):
+        self.file_path = None
+        self.duration = 0.0
+        self._pixmaps.clear()
+        self.update()
+
+    def current_level(self):
+        return level_for_width(self.width(), self.thumb_width)
+
+    def request_tiles(self):
+        """Request the coarse level first so something shows at once, then the sharp one"""
+        if not self.file_path or self.duration <= 0:
+            return
+        for level in sorted({0, self.current_level()}):
+            for tile in range(tile_count(level)):
+                if (level, tile) not in self._pixmaps:
+                    thumbnail_cache.request_tile(self.file_path, self.duration, level, tile, self._tile_callback)
+
+    def _tile_callback(self, file_path, level, tile, images):
+        # Called on a worker thread; the signal hands the images to the GUI thread
+        self.tile_ready.emit(file_path, level, tile, images)
+
+    def _store_tile(self, file_path, level, tile, images):
+        if file_path != self.file_path:
+            return
+        pixmaps = []
+        for image in images:
+            pixmap = QPixmap()
+            if image:
+                pixmap.loadFromData(image, "JPG")
+            pixmaps.append(pixmap)
+            if not pixmap.isNull():
+                self.thumb_width = pixmap.width()
+        self._pixmaps[(level, tile)] = pixmaps
+        self._pixmaps.move_to_end((level, tile))
+        while len(self._pixmaps) > self.max_tiles:
+            self._pixmaps.popitem(last=False)
+        if level == 0:
+            # The real thumbnail width is known now and may call for a finer level
+            self.request_tiles()
+        self.update()
+
+    # --------------------------------------------------
+    # Events
+    # --------------------------------------------------
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.request_tiles()
+
+    def mousePressEvent(self, event):
+        if self.duration > 0 and event.button() == Qt.LeftButton and self.width() > 0:
+            fraction = max(0.0, min(event.pos().x() / self.width(), 1.0))
+            self.seek_requested.emit(int(fraction * self.duration * 1000))
+        super().mousePressEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(40, 40, 40))
+        if not self.file_path or self.width() <= 0:
+            return
+
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        width = self.width()
+        current = self.current_level()
+        for level in range(current + 1):
+            count = thumbnail_count(level)
+            for tile in range(tile_count(level)):
+                pixmaps = self._pixmaps.get((level, tile))
+                if not pixmaps:
+                    continue
+                for slot, pixmap in enumerate(pixmaps):
+                    if pixmap.isNull():
+                        continue
+                    index = tile * TILE_THUMBS + slot
+                    x0 = int(width * index / count)
+                    x1 = int(width * (index + 1) / count)
+                    self._draw_cropped(painter, QRect(x0, 0, max(1, x1 - x0), self.height()), pixmap)
+
+    def _draw_cropped(self, painter, target, pixmap):
+        """Fill target with the middle of pixmap, keeping its aspect ratio"""
+        scale = max(target.width() / pixmap.width(), target.height() / pixmap.height())
+        source_width = target.width() / scale
+        source_height = target.height() / scale
+        source = QRect(int((pixmap.width() - source_width) / 2), int((pixmap.height() - source_height) / 2),
+                       int(source_width), int(source_height))
+        painter.drawPixmap(target, pixmap, source)
@@ -0,0 +1,110 @@
+# --------------------------------------------------
+# Waveform Lane Module
+# Audio peak overview shown under the seek slider
+# --------------------------------------------------
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor
+from PyQt5.QtWidgets import QWidget
+
+from core.waveform import waveform_builder
+
+# --------------------------------------------------
+# WaveformLane Class
+# Draws one min/max line per pixel column; the in/out range is highlighted
+# --------------------------------------------------
+class WaveformLane(QWidget):
+    peaks_ready = pyqtSignal(str, object)
+    seek_requested = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(36)
+        self.file_path = None
+        self.duration = 0.0
+        self.peaks = None
+        self.loading = False
+        self.start_time = 0
+        self.end_time = 0
+        self._columns = None
+        self.peaks_ready.connect(self._store_peaks)
+
+    def set_source(self, file_path, duration_ms):
+        self.file_path = file_path
+        self.duration = duration_ms / 1000
+        self.peaks = None
+        self._columns = None
+        self.loading = True
+        waveform_builder.cancel(keep_path=file_path)
+        waveform_builder.request(file_path, self._peaks_callback)
+        self.update()
+
+    def clear(self):
+        self.file_path = None
+        self.duration = 0.0
+        self.peaks = None
+        self._columns = None
+        self.loading = False
+        self.start_time = 0
+        self.end_time = 0
+        self.update()
+
+    def set_time_range(self, start, end, total):
+        self.start_time = start
+        self.end_time = end
+        self.update()
+
+    def _peaks_callback(self, file_path, peaks):
+        # Called on the builder thread; the signal hands the peaks to the GUI thread
+        self.peaks_ready.emit(file_path, peaks)
+
+    def _store_peaks(self, file_path, peaks):
+        if file_path != self.file_path:
+            return
+        self.peaks = peaks
+        self.loading = False
+        self._columns = None
+        self.update()
+
+    # --------------------------------------------------
+    # Events
+    # --------------------------------------------------
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._columns = None
+
+    def mousePressEvent(self, event):
+        if self.duration > 0 and event.button() == Qt.LeftButton and self.width() > 0:
+            fraction = max(0.0, min(event.pos().x() / self.width(), 1.0))
+            self.seek_requested.emit(int(fraction * self.duration * 1000))
+        super().mousePressEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(245, 245, 245))
+        width = self.width()
+        middle = self.height() / 2
+
+        if not self.peaks or self.duration <= 0 or width <= 0:
+            painter.setPen(QColor(150, 150, 150))
+            if self.loading:
+                painter.drawText(self.rect(), Qt.AlignCenter, "Computing waveform...")
+            elif self.file_path:
+                painter.drawText(self.rect(), Qt.AlignCenter, "No audio")
+            return
+
+        if self._columns is None or len(self._columns[0]) != width:
+            self._columns = self.peaks.columns(0, self.duration, width)
+        col_min, col_max = self._columns
+
+        start_x = self.start_time / 1000 / self.duration * width
+        end_x = self.end_time / 1000 / self.duration * width
+        inside = QColor(63, 142, 147)
+        outside = QColor(170, 170, 170)
+        scale = middle - 1
+
+        for x in range(len(col_min)):
+            painter.setPen(inside if start_x <= x <= end_x else outside)
+            top = int(middle - col_max[x] * scale)
+            bottom = int(middle - col_min[x] * scale)
+            painter.drawLine(x, top, x, max(top, bottom))
@@ -120,6 +120,11 @@ class VideoPlayer(QWidget):
         
         return self.video_widget.load_video(file_path)
     
+    def swap_source(self, file_path, source_size=None):
+        if self.video_widget:
+            return self.video_widget.swap_source(file_path, source_size)
+        return False
+    
     def get_video_widget(self):
         return self.video_widget
     